@@ -0,0 +1,92 @@
+"""
+Memory benchmark of the data model: 100k feed links (and the articles built from them) held with the legacy
+dict-backed classes and "%Y-%m-%d %H:%M:%S" date strings, against the slotted classes with epoch dates and interned
+source / language strings.
+
+The titles, URLs and descriptions are allocated beforehand and shared by both runs, only the memory added by the
+objects themselves (and their dates) is measured, with tracemalloc.
+
+Usage: python benchmarks/bench_data_model.py [number of links]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss007d0675444aa13fc.ArticleClass import Article  # noqa: E402
+from rss007d0675444aa13fc.LinkClass import Link  # noqa: E402
+
+
+class LegacyLink:
+
+    def __init__(self, _title, _link, _publish_date=None, _description=None):
+        self.title = _title
+        self.link = _link
+        self.publish_date = _publish_date
+        self.description = _description
+
+
+class LegacyArticle:
+
+    def __init__(self, _rss_source, _rss_description, _rss_language, _article_title, _article_url,
+                 _article_publish_date, _article_description):
+        self.rss_source = _rss_source
+        self.rss_description = _rss_description
+        self.language = _rss_language
+        self.title = _article_title
+        self.url = _article_url
+        self.publish_date = _article_publish_date
+        self.description = _article_description
+        self.content = None
+
+
+def make_fields(_n_links):
+    now = int(time.time())
+    fields = []
+    for i in range(_n_links):
+        fields.append(("Title of article {}".format(i), "https://news.example/{}/article-{}".format(i % 500, i),
+                       now - 60 * i, "Summary of article {}".format(i)))
+    return fields
+
+
+def measure(_build):
+    tracemalloc.start()
+    objects = _build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objects, size
+
+
+def build_legacy(_fields):
+    links = [LegacyLink(title, link, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(date)), description)
+             for title, link, date, description in _fields]
+    # the feed fields are read from the decoded JSON of every feed: a new string per article
+    articles = [LegacyArticle("".join(["Source ", str(i % 500)]), "news", "".join(["e", "n"]), link.title, link.link,
+                              link.publish_date, link.description) for i, link in enumerate(links)]
+    return links, articles
+
+
+def build_slotted(_fields):
+    links = [Link(title, link, date, description) for title, link, date, description in _fields]
+    articles = [Article("".join(["Source ", str(i % 500)]), "news", "".join(["e", "n"]), link.title, link.link,
+                        link.publish_date, link.description) for i, link in enumerate(links)]
+    return links, articles
+
+
+def main(_n_links):
+    fields = make_fields(_n_links)
+    print("{} links + {} articles".format(_n_links, _n_links))
+    sizes = {}
+    for name, build in (("legacy (dict, date strings)", build_legacy), ("slotted (epochs, interned)", build_slotted)):
+        objects, sizes[name] = measure(lambda: build(fields))
+        print("  {:<28} {:8.1f} MB  ({:.0f} bytes per link + article)".format(name, sizes[name] / 2 ** 20,
+                                                                            sizes[name] / _n_links))
+        del objects
+    legacy, slotted = sizes.values()
+    print("  saved {:.1f} MB ({:.0%})".format((legacy - slotted) / 2 ** 20, 1 - slotted / legacy))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
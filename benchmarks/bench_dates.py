@@ -0,0 +1,71 @@
+"""
+Benchmark of the per-entry date handling of a large feed: the legacy chain (dateutil parse -> pytz -> string, strptime
+in is_within_max_age, strptime/strftime in convert_to_iso8601_utc and cap_date_to_now) against DateNormalizer.
+
+Usage: python benchmarks/bench_dates.py [number of entries]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytz
+from dateutil import parser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss007d0675444aa13fc.DateNormalizer import (  # noqa: E402
+    parse_date_to_epoch,
+    epoch_to_iso8601_utc,
+    cap_epoch_to_now
+)
+
+
+def make_dates(_n_entries):
+    now = datetime.now(timezone.utc)
+    dates = []
+    for i in range(_n_entries):
+        dt = now - timedelta(minutes=7 * i)
+        if i % 3 == 0:
+            dates.append(dt.isoformat(timespec="seconds").replace("+00:00", "Z"))
+        else:
+            dates.append(dt.astimezone(timezone(timedelta(hours=2))).strftime("%a, %d %b %Y %H:%M:%S %z"))
+    return dates
+
+
+def legacy_chain(_date, _now_time, _max_age):
+    dt = parser.parse(_date).astimezone(pytz.timezone('UTC'))
+    formatted = dt.strftime("%Y-%m-%d %H:%M:%S")
+    d1 = datetime.strptime(_now_time, "%Y-%m-%d %H:%M:%S")
+    d2 = datetime.strptime(formatted, "%Y-%m-%d %H:%M:%S")
+    if (d1 - d2).total_seconds() > _max_age:
+        return None
+    iso = datetime.strptime(formatted, "%Y-%m-%d %H:%M:%S").strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    capped = datetime.strptime(iso, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+    return capped.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def new_chain(_date, _now_time, _max_age):
+    epoch = parse_date_to_epoch(_date)
+    if _now_time - epoch > _max_age:
+        return None
+    return epoch_to_iso8601_utc(cap_epoch_to_now(epoch, _now_time))
+
+
+def run(_label, _chain, _dates, _now_time, _max_age=10 ** 9):
+    start = time.perf_counter()
+    for date in _dates:
+        _chain(date, _now_time, _max_age)
+    elapsed = time.perf_counter() - start
+    print("{:<28} {:>10.2f} us/entry".format(_label, elapsed / len(_dates) * 1e6))
+
+
+if __name__ == "__main__":
+    n_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    dates = make_dates(n_entries)
+    now = datetime.now(timezone.utc)
+    print("{} entries".format(n_entries))
+    run("legacy (dateutil + strptime)", legacy_chain, dates, now.strftime("%Y-%m-%d %H:%M:%S"))
+    parse_date_to_epoch.cache_clear()
+    run("DateNormalizer (cold memo)", new_chain, dates, int(now.timestamp()))
+    run("DateNormalizer (warm memo)", new_chain, dates, int(now.timestamp()))
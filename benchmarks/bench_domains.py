@@ -0,0 +1,75 @@
+"""
+Micro-benchmark of the domain extraction: the default tldextract.extract (as extract_domain_name used to call it)
+against DomainResolver, for the cold start (first call, suffix list loading included) and the per-call cost over the
+article URLs of a few hundred hosts.
+
+The cold start (first extraction, modules already imported) is measured in a fresh interpreter. tldextract.extract
+reads its disk cache, or downloads the public suffix list when the cache is empty (e.g. on a fresh node), while
+DomainResolver parses the snapshot bundled with tldextract.
+
+Usage: python benchmarks/bench_domains.py [number of URLs]
+"""
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss007d0675444aa13fc.DomainResolver import DomainResolver  # noqa: E402
+
+COLD_START = """
+import time
+{imports}
+start = time.perf_counter()
+extract = {extract}
+extract("https://www.bbc.co.uk/news/world-1")
+print(time.perf_counter() - start)
+"""
+SETUPS = {  # name -> (imports, not timed, extract function)
+    "tldextract.extract": ("import tldextract", "tldextract.extract"),
+    "DomainResolver": ("import tldextract\nfrom rss007d0675444aa13fc.DomainResolver import DomainResolver",
+                       "DomainResolver().domain_of"),
+}
+SUFFIXES = ["com", "co.uk", "fr", "com.au", "de", "org", "news", "co.jp"]
+
+
+def make_urls(_n_urls):
+    return ["https://{}.site{}.{}/2023/06/07/article-{}".format(("www", "news", "edition")[i % 3], i % 300,
+                                                                  SUFFIXES[i % len(SUFFIXES)], i)
+            for i in range(_n_urls)]
+
+
+def cold_start(_imports, _extract):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = COLD_START.format(imports=_imports, extract=_extract)
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True,
+                            check=True).stdout
+    return float(output.split()[-1])
+
+
+def per_call(_extract, _urls):
+    _extract(_urls[0])  # warm
+    start = time.perf_counter()
+    for url in _urls:
+        _extract(url)
+    return (time.perf_counter() - start) / len(_urls)
+
+
+def main(_n_urls):
+    import tldextract
+
+    urls = make_urls(_n_urls)
+    print("{} URLs over 300 hosts".format(_n_urls))
+    for name, (imports, extract) in SETUPS.items():
+        print("  {:<20} cold start {:8.1f} ms".format(name, cold_start(imports, extract) * 1000))
+    extract_calls = {
+        "tldextract.extract": lambda url: tldextract.extract(url),
+        "DomainResolver": DomainResolver().domain_of,
+    }
+    for name, extract in extract_calls.items():
+        print("  {:<20} per call   {:8.2f} us".format(name, per_call(extract, urls) * 1e6))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,186 @@
+"""
+Offline end-to-end benchmark of the collector against the local stand-in server (see stand_in_server.py).
+
+Measured for every scenario:
+- query(): items per second, time to first item and total time, then peak Python memory (tracemalloc) in a separate
+  run: tracing slows the collector down many times over, it would skew the timings,
+- extract_latest_items: p50 / p99 latency per feed (download + parse),
+- extract_content: p50 / p99 latency per article (download + parse),
+- the per-stage timings and counters of every query() run (see Metrics).
+
+Results are written as JSON (--output) so that runs of different versions can be compared.
+
+Usage: python benchmarks/bench_end_to_end.py [--output bench_output.json] [--scenario name] [--repeat 3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import rss007d0675444aa13fc as collector  # noqa: E402
+from stand_in_server import StandInServer  # noqa: E402
+
+SCENARIOS = {
+    "baseline": {
+        "server": {},
+        "parameters": {"maximum_items_to_collect": 25, "max_oldness_seconds": 3600, "max_extraction_trials": 500},
+    },
+    "short_window": {
+        "server": {"_entry_interval": 600},
+        "parameters": {"maximum_items_to_collect": 10, "max_oldness_seconds": 360, "max_extraction_trials": 500},
+    },
+    "slow_and_flaky": {
+        "server": {"_feed_latency": 0.3, "_article_latency": 0.5, "_jitter": 0.3, "_feed_error_rate": 0.2,
+                   "_article_error_rate": 0.1},
+        "parameters": {"maximum_items_to_collect": 25, "max_oldness_seconds": 3600, "max_extraction_trials": 500},
+    },
+    "large_feeds": {
+        "server": {"_entries_per_feed": 500, "_entry_interval": 30},
+        "parameters": {"maximum_items_to_collect": 25, "max_oldness_seconds": 3600, "max_extraction_trials": 500},
+    },
+}
+STAGE_SAMPLES = 20
+
+
+def percentile(_values, _percent):
+    if not _values:
+        return None
+    values = sorted(_values)
+    index = min(len(values) - 1, max(0, int(round(_percent / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def latency_summary(_values):
+    return {"count": len(_values), "p50": percentile(_values, 50), "p99": percentile(_values, 99),
+            "mean": sum(_values) / len(_values) if _values else None}
+
+
+def reset_collector_state():
+    # every run starts cold: no article seen or cached, no learned statistics, no cached registry
+    collector.get_seen_urls().clear()
+    collector.get_content_cache().clear()
+    collector.get_feed_scheduler().stats.clear()
+    collector.get_validator_store().clear()
+    collector.get_feed_registry().clear()
+    collector.configure_metrics(True).reset()
+
+
+async def run_query(_parameters):
+    reset_collector_state()
+    start = time.perf_counter()
+    first_item = None
+    n_items = 0
+    async for _ in collector.query(_parameters):
+        n_items += 1
+        if first_item is None:
+            first_item = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return {"items": n_items, "total_seconds": total, "time_to_first_item": first_item,
+            "items_per_second": n_items / total if total > 0 else None,
+            "metrics": collector.get_metrics().snapshot()}
+
+
+async def measure_peak_memory(_parameters):
+    """
+    :return: The peak Python memory (bytes) of one query() run, traced on its own, see run_query
+    """
+    reset_collector_state()
+    tracemalloc.start()
+    try:
+        async for _ in collector.query(_parameters):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def run_stages(_server):
+    feed_latencies = []
+    article_urls = []
+    for feed in range(min(STAGE_SAMPLES, _server.n_feeds)):
+        rss = collector.RSS(collector.RssID("bench", "news", "en", "{}/feed/{}".format(_server.base_url, feed)))
+        start = time.perf_counter()
+        try:
+            await collector.extract_latest_items(rss)
+        except Exception:
+            continue
+        feed_latencies.append(time.perf_counter() - start)
+        article_urls.extend(link.link for link in rss.link_array[:1])
+
+    article_latencies = []
+    for url in article_urls:
+        start = time.perf_counter()
+        await collector.extract_content([(url, "en")])
+        article_latencies.append(time.perf_counter() - start)
+    return {"extract_latest_items": latency_summary(feed_latencies),
+            "extract_content": latency_summary(article_latencies)}
+
+
+async def run_scenario(_name, _scenario, _repeat):
+    server = await StandInServer(**_scenario["server"]).start()
+    try:
+        # every feed and article is served by the same host: the per-domain limits would measure the limiter only
+        parameters = dict(_scenario["parameters"], feed_sources_url=server.registry_url, registry_snapshot_path="",
+                          domain_rate=0, domain_max_in_flight=0)
+        queries = [await run_query(parameters) for _ in range(_repeat)]
+        peak_memory = await measure_peak_memory(parameters)
+        stages = await run_stages(server)
+    finally:
+        await server.stop()
+
+    def summary(_key):
+        return latency_summary([run[_key] for run in queries if run[_key] is not None])
+
+    return {
+        "server": {key.lstrip("_"): value for key, value in _scenario["server"].items()},
+        "parameters": _scenario["parameters"],
+        "query": {
+            "runs": queries,
+            "items_per_second": summary("items_per_second"),
+            "time_to_first_item": summary("time_to_first_item"),
+            "total_seconds": summary("total_seconds"),
+            "peak_memory_bytes": peak_memory,
+        },
+        "stages": stages,
+        "requests": server.requests,
+    }
+
+
+async def main(_arguments):
+    names = _arguments.scenario or list(SCENARIOS)
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": {},
+    }
+    try:
+        for name in names:
+            print("running {}...".format(name))
+            results["scenarios"][name] = await run_scenario(name, SCENARIOS[name], _arguments.repeat)
+            query = results["scenarios"][name]["query"]
+            print("  {:.1f} items/s, first item after {:.3f} s, peak memory {:.1f} MB".format(
+                query["items_per_second"]["mean"] or 0, query["time_to_first_item"]["p50"] or 0,
+                query["peak_memory_bytes"] / 2 ** 20))
+    finally:
+        await collector.close_session()
+        collector.shutdown_parser_executors()
+
+    with open(_arguments.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print("results written to {}".format(_arguments.output))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,190 @@
+"""
+Benchmark of the content extraction engines (see ContentExtractor) on a fixed local HTML corpus: speed (ms per page)
+and quality against the known text of every article:
+- recall: share of the words of the article found in the extracted text,
+- precision: share of the extracted words that belong to the article (boilerplate leaking in lowers it).
+
+The corpus is generated from a fixed seed, in the layouts met in the registry: blog with sidebar widgets and comments,
+news site with related stories, ads and share bars, div-based paragraphs, page whose comments outweigh the article,
+page without telling class names, body split in two containers, bare <article>, and a teaser page shorter than the
+usual min_post_length.
+
+Usage: python benchmarks/bench_extraction.py [number of pages per layout] [engines, comma separated]
+"""
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss007d0675444aa13fc.ContentExtractor import extract_text  # noqa: E402
+
+ENGINES = ("newspaper", "fast", "auto")
+MIN_POST_LENGTH = 200  # for "auto"
+SENTENCES = (
+    "The city council approved the new transit plan on Tuesday after months of heated debate.",
+    "Officials said the first trains would run before the end of next year, pending the final budget vote.",
+    "Critics argued that the project was too expensive and that the money should go to road repairs instead.",
+    "Supporters, however, pointed to the growing traffic jams and the rising cost of fuel for commuters.",
+    "The mayor told reporters that the decision was the most important one of her term in office.",
+    "Residents of the eastern districts, who have waited years for a direct line, welcomed the vote.",
+    "According to the latest estimates, the line will carry about forty thousand passengers every day.",
+    "Construction is expected to create several hundred jobs, most of them filled by local companies.",
+    "Environmental groups said they would watch closely how the works affect the river banks.",
+    "The opposition announced that it would ask for an independent review of the cost estimates.",
+    "Analysts noted that similar projects in other cities had often run over budget and behind schedule.",
+    "A spokesperson for the transport agency said the timetable was realistic and fully funded.",
+)
+BOILERPLATE = (
+    "Sign up for our newsletter and get the best stories delivered to your inbox every morning.",
+    "We use cookies to improve your experience, by continuing to browse you accept their use.",
+    "This comment was written by a reader and does not reflect the opinion of the editorial team.",
+    "Great article, thanks for sharing, I have been waiting for this line for such a long time.",
+)
+
+
+def article_paragraphs(_random, _n):
+    return [" ".join(_random.sample(SENTENCES, _random.randint(2, 4))) for _ in range(_n)]
+
+
+def links(_random, _n, _prefix="Read"):
+    return "".join('<li><a href="/story/{0}">{1} story {0} about the transit plan</a></li>'.format(
+        _random.randint(1, 9999), _prefix) for _ in range(_n))
+
+
+def page_blog(_random):
+    paragraphs = article_paragraphs(_random, _random.randint(5, 9))
+    body = "".join('<p>{}</p>'.format(p.replace("transit plan", '<a href="/tag/transit">transit plan</a>', 1))
+                   for p in paragraphs)
+    comments = "".join('<div class="comment"><p>{}</p></div>'.format(_random.choice(BOILERPLATE)) for _ in range(4))
+    html = ('<html><head><title>Blog</title><script>var x = 1;</script></head><body>'
+            '<header><nav><ul>{menu}</ul></nav></header><div id="page"><div class="entry-content">{body}</div>'
+            '<div id="sidebar"><div class="widget"><h3>Recent posts</h3><ul>{recent}</ul></div>'
+            '<div class="widget"><p>{newsletter}</p></div></div><section id="comments">{comments}</section></div>'
+            '<footer><p>Copyright 2024, all rights reserved. Powered by a blog engine.</p></footer></body></html>')
+    return html.format(menu=links(_random, 6, "Menu"), body=body, recent=links(_random, 8), comments=comments,
+                       newsletter=BOILERPLATE[0]), paragraphs
+
+
+def page_news(_random):
+    paragraphs = article_paragraphs(_random, _random.randint(6, 12))
+    parts = []
+    for i, p in enumerate(paragraphs):
+        parts.append("<p>{}</p>".format(p))
+        if i == 2:
+            parts.append('<div class="ad-slot"><p>Advertisement: the best deals on cars this week</p></div>')
+        if i == 4:
+            parts.append('<div class="related-stories"><h4>Related</h4><ul>{}</ul></div>'.format(links(_random, 3)))
+    html = ('<html><head><title>News</title><style>p {{ margin: 0 }}</style></head><body>'
+            '<div class="cookie-banner"><p>{cookie}</p></div><div class="top-menu"><ul>{menu}</ul></div>'
+            '<div class="container"><div class="story"><h1>Council approves transit plan</h1>'
+            '<div class="byline">By A Reporter, 12 June</div><div class="share-bar"><a href="#">Share</a></div>'
+            '<div class="story-body">{body}</div></div><div class="more-news"><h3>More news</h3><ul>{more}</ul></div>'
+            '</div><div class="footer-links"><ul>{footer}</ul></div></body></html>')
+    return html.format(cookie=BOILERPLATE[1], menu=links(_random, 10, "Section"), body="".join(parts),
+                       more=links(_random, 12), footer=links(_random, 8, "About")), paragraphs
+
+
+def page_divs(_random):
+    paragraphs = article_paragraphs(_random, _random.randint(4, 8))
+    body = "".join('<div class="para">{}</div>'.format(p) for p in paragraphs)
+    html = ('<html><body><div class="menu"><a href="/">Home</a> <a href="/world">World</a></div>'
+            '<div class="main-text">{body}</div><div class="tags"><a href="/t/1">transit</a> '
+            '<a href="/t/2">city</a></div></body></html>')
+    return html.format(body=body), paragraphs
+
+
+def page_discussion(_random):
+    paragraphs = article_paragraphs(_random, 3)
+    comments = "".join('<li class="reply"><p>{}</p></li>'.format(" ".join(_random.sample(BOILERPLATE, 2)))
+                       for _ in range(15))
+    html = ('<html><body><main><article><p>{body}</p></article></main>'
+            '<div id="discussion"><ol class="comment-list">{comments}</ol></div></body></html>')
+    return html.format(body="</p><p>".join(paragraphs), comments=comments), paragraphs
+
+
+def page_unlabelled(_random):
+    # no telling class names: the reader comments and the teasers are only told apart by their scores
+    paragraphs = article_paragraphs(_random, _random.randint(5, 8))
+    teasers = "".join('<div class="b7"><p><a href="/story/{}">Another story</a> {}</p></div>'.format(
+        _random.randint(1, 9999), _random.choice(SENTENCES)) for _ in range(4))
+    comments = "".join('<div class="c3"><p>{}</p></div>'.format(" ".join(_random.sample(BOILERPLATE, 2)))
+                       for _ in range(_random.randint(2, 6)))
+    html = ('<html><body><div class="a1"><h1>Transit</h1><div class="a2">{body}</div></div>'
+            '<div class="b1">{teasers}</div><div class="c1">{comments}</div></body></html>')
+    return html.format(body="".join("<p>{}</p>".format(p) for p in paragraphs), teasers=teasers,
+                       comments=comments), paragraphs
+
+
+def page_split(_random):
+    # the body is split in two containers around a pull quote
+    paragraphs = article_paragraphs(_random, _random.randint(6, 10))
+    middle = len(paragraphs) // 2
+    html = ('<html><body><div class="post"><div class="part">{first}</div><blockquote>"It is a historic day"'
+            '</blockquote><div class="part">{second}</div></div></body></html>')
+    return html.format(first="".join("<p>{}</p>".format(p) for p in paragraphs[:middle]),
+                       second="".join("<p>{}</p>".format(p) for p in paragraphs[middle:])), paragraphs
+
+
+def page_bare(_random):
+    paragraphs = article_paragraphs(_random, _random.randint(3, 6))
+    return "<html><body><article>{}</article></body></html>".format(
+        "".join("<p>{}</p>".format(p) for p in paragraphs)), paragraphs
+
+
+def page_teaser(_random):
+    paragraphs = [_random.choice(SENTENCES)]
+    html = ('<html><body><div class="content"><h1>Breaking</h1><p>{}</p><p><a href="/live">Follow our live '
+            'coverage</a></p></div></body></html>')
+    return html.format(paragraphs[0]), paragraphs
+
+
+LAYOUTS = (page_blog, page_news, page_divs, page_discussion, page_unlabelled, page_split, page_bare, page_teaser)
+
+
+def make_corpus(_pages_per_layout, _seed=0):
+    rng = random.Random(_seed)
+    return [(layout.__name__[len("page_"):],) + layout(rng) for _ in range(_pages_per_layout) for layout in LAYOUTS]
+
+
+def words(_text):
+    return Counter(word.strip(".,;:!?\"'()").lower() for word in _text.split())
+
+
+def quality(_extracted, _paragraphs):
+    expected = words(" ".join(_paragraphs))
+    extracted = words(_extracted)
+    common = sum((expected & extracted).values())
+    recall = common / max(sum(expected.values()), 1)
+    precision = common / sum(extracted.values()) if extracted else 0.0
+    return recall, precision
+
+
+def main(_pages_per_layout, _engines):
+    corpus = make_corpus(_pages_per_layout)
+    extract_text("newspaper", "https://news.example/warm-up", "en", corpus[0][1])  # imports out of the measure
+    extract_text("fast", "https://news.example/warm-up", "en", corpus[0][1])
+    print("{} pages ({} layouts)".format(len(corpus), len(LAYOUTS)))
+    print("{:<10} {:>12} {:>8} {:>10}   per layout recall / precision".format(
+        "engine", "ms per page", "recall", "precision"))
+    for engine in _engines:
+        start = time.perf_counter()
+        texts = [extract_text(engine, "https://news.example/{}".format(i), "en", html, MIN_POST_LENGTH)
+                 for i, (_, html, _) in enumerate(corpus)]
+        elapsed = time.perf_counter() - start
+        by_layout = {}
+        for (layout, _, paragraphs), text in zip(corpus, texts):
+            by_layout.setdefault(layout, []).append(quality(text, paragraphs))
+        scores = [score for layout_scores in by_layout.values() for score in layout_scores]
+        details = "  ".join("{} {:.2f}/{:.2f}".format(layout, sum(r for r, _ in layout_scores) / len(layout_scores),
+                                                       sum(p for _, p in layout_scores) / len(layout_scores))
+                            for layout, layout_scores in by_layout.items())
+        print("{:<10} {:>12.2f} {:>8.3f} {:>10.3f}   {}".format(
+            engine, elapsed / len(corpus) * 1000, sum(r for r, _ in scores) / len(scores),
+            sum(p for _, p in scores) / len(scores), details))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20, sys.argv[2].split(",") if len(sys.argv) > 2 else ENGINES)
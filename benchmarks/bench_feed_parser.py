@@ -0,0 +1,74 @@
+"""
+Benchmark of the feed parsing engines on large synthetic feeds (newest entries first): feedparser + date filtering, as
+done by extract_latest_items, against the incremental lxml parser (FastFeedParser) with and without a time window.
+
+Usage: python benchmarks/bench_feed_parser.py [number of entries]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from io import BytesIO
+
+import feedparser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss007d0675444aa13fc.DateNormalizer import parse_date_to_epoch  # noqa: E402
+from rss007d0675444aa13fc.FastFeedParser import parse_feed  # noqa: E402
+
+DESCRIPTION = "<p>" + "Some summary of the article with a few sentences of text. " * 8 + "</p>"
+
+
+def make_rss(_n_entries, _now):
+    items = []
+    for i in range(_n_entries):
+        items.append("<item><title>Article {i}</title><link>https://news.example/{i}</link>"
+                     "<guid>https://news.example/{i}</guid><pubDate>{date}</pubDate>"
+                     "<description><![CDATA[{description}]]></description></item>".format(
+                         i=i, date=format_datetime(_now - timedelta(minutes=5 * i)), description=DESCRIPTION))
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Feed</title>'
+            '<link>https://news.example</link>' + "".join(items) + "</channel></rss>").encode("utf-8")
+
+
+def make_atom(_n_entries, _now):
+    entries = []
+    for i in range(_n_entries):
+        entries.append('<entry><title>Article {i}</title><link href="https://news.example/{i}"/>'
+                       "<id>https://news.example/{i}</id><updated>{date}</updated>"
+                       "<summary type=\"html\">{description}</summary></entry>".format(
+                           i=i, date=(_now - timedelta(minutes=5 * i)).isoformat(timespec="seconds"),
+                           description=DESCRIPTION.replace("<", "&lt;")))
+    return ('<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom"><title>Feed</title>'
+            + "".join(entries) + "</feed>").encode("utf-8")
+
+
+def with_feedparser(_data, _start_date):
+    links = []
+    for item in feedparser.parse(BytesIO(_data)).entries:
+        s_publish_date = item.get("published") or item.get("pubDate") or item.get("updated")
+        if s_publish_date:
+            publish_date = parse_date_to_epoch(s_publish_date)
+            if publish_date >= _start_date:
+                links.append((item.title, item.link, publish_date, item.get("description")))
+    return links
+
+
+def run(_label, _function, _repeat=5):
+    start = time.perf_counter()
+    for _ in range(_repeat):
+        result = _function()
+    elapsed = (time.perf_counter() - start) / _repeat
+    print("  {:<34} {:>9.2f} ms  ({} links)".format(_label, elapsed * 1000, len(result)))
+
+
+if __name__ == "__main__":
+    n_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    now = datetime.now(timezone.utc)
+    start_date = int(now.timestamp()) - 360  # default max_oldness_seconds
+    for name, data in (("RSS 2.0", make_rss(n_entries, now)), ("Atom", make_atom(n_entries, now))):
+        print("{}: {} entries, {} KB".format(name, n_entries, len(data) // 1024))
+        run("feedparser + date filter", lambda: with_feedparser(data, start_date))
+        run("lxml incremental, full feed", lambda: parse_feed(data))
+        run("lxml incremental, last 360 s", lambda: parse_feed(data, start_date))
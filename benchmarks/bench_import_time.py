@@ -0,0 +1,55 @@
+"""
+Benchmark of the cold import of the package, from `python -X importtime` in fresh interpreters: the total time of
+`import rss007d0675444aa13fc` (median of the runs) and the modules with the largest cumulative import time below it.
+Heavy dependencies (aiohttp, feedparser, newspaper, tldextract, lxml) should not show up: they are imported on first
+use, tests/test_import_time.py checks it. The median is compared to IMPORT_TIME_BUDGET.
+
+Usage: python benchmarks/bench_import_time.py [number of runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+PACKAGE = "rss007d0675444aa13fc"
+TOP = 15
+IMPORT_TIME_BUDGET = 0.3  # seconds, importing the package on top of exorde_data and the standard library
+
+
+def import_time():
+    """
+    :return: A dict {module: (self time, cumulative time)} in microseconds, for the modules imported by the package
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # exorde_data is imported first, so that its own dependencies are not accounted to the package
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import exorde_data; import " + PACKAGE],
+                            cwd=root, capture_output=True, text=True, check=True).stderr
+    times = {}
+    package_started = False  # importtime lists a module after its dependencies: all after exorde_data is ours
+    for line in stderr.splitlines():
+        fields = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        self_time, cumulative, name = int(fields[0]), int(fields[1]), fields[2].strip()
+        if package_started:
+            times[name] = (self_time, cumulative)
+        elif fields[2] == " exorde_data":
+            package_started = True
+    return times
+
+
+def main(_runs):
+    runs = [import_time() for _ in range(_runs)]
+    totals = [run[PACKAGE][1] for run in runs]
+    print("import {}: median {:.1f} ms (min {:.1f} ms, {} runs)".format(
+        PACKAGE, statistics.median(totals) / 1000, min(totals) / 1000, _runs))
+    print("budget of {:.0f} ms: {}".format(IMPORT_TIME_BUDGET * 1000,
+                                           "ok" if statistics.median(totals) / 1e6 < IMPORT_TIME_BUDGET else "EXCEEDED"))
+    last = runs[-1]
+    print("largest cumulative import times:")
+    for name, (self_time, cumulative) in sorted(last.items(), key=lambda item: -item[1][1])[1:TOP + 1]:
+        print("  {:<45} {:8.1f} ms (self {:.1f} ms)".format(name, cumulative / 1000, self_time / 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
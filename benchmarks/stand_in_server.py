@@ -0,0 +1,120 @@
+"""
+Local stand-in for the internet the collector talks to, so that benchmarks are reproducible and offline. It serves:
+- /FeedSources.json: the feed registry, listing every synthetic feed,
+- /feed/{feed}: an RSS 2.0 or Atom feed (alternately) of `entries_per_feed` entries, newest first, one entry every
+  `entry_interval` seconds up to now,
+- /article/{feed}/{entry}: the HTML page of an article.
+
+Latency (base + uniform jitter, in seconds) and errors (a share of the requests answered with a 500, or with a broken
+body for the feeds) can be injected separately for feeds and articles.
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from aiohttp import web
+
+PARAGRAPH = ("The quick brown fox jumps over the lazy dog while the committee debates the new budget proposal, "
+             "and analysts expect the decision to weigh on markets for the rest of the quarter. ")
+
+
+class StandInServer:
+
+    def __init__(self, _n_feeds=50, _entries_per_feed=100, _entry_interval=120, _feed_latency=0.05,
+                 _article_latency=0.1, _jitter=0.05, _feed_error_rate=0.0, _article_error_rate=0.0,
+                 _paragraphs_per_article=12, _seed=0):
+        self.n_feeds = _n_feeds
+        self.entries_per_feed = _entries_per_feed
+        self.entry_interval = _entry_interval
+        self.feed_latency = _feed_latency
+        self.article_latency = _article_latency
+        self.jitter = _jitter
+        self.feed_error_rate = _feed_error_rate
+        self.article_error_rate = _article_error_rate
+        self.paragraphs_per_article = _paragraphs_per_article
+        self.random = random.Random(_seed)
+        self.runner = None
+        self.base_url = None
+        self.requests = {"registry": 0, "feed": 0, "article": 0}
+
+    @property
+    def registry_url(self):
+        return self.base_url + "/FeedSources.json"
+
+    async def start(self, _host="127.0.0.1", _port=0):
+        app = web.Application()
+        app.router.add_get("/FeedSources.json", self.registry)
+        app.router.add_get("/feed/{feed}", self.feed)
+        app.router.add_get("/article/{feed}/{entry}", self.article)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, _host, _port).start()
+        port = self.runner.addresses[0][1]
+        self.base_url = "http://{}:{}".format(_host, port)
+        return self
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def delay(self, _latency):
+        await asyncio.sleep(_latency + self.random.uniform(0, self.jitter))
+
+    async def registry(self, _request):
+        self.requests["registry"] += 1
+        return web.json_response([{
+            "Source": "Stand-in feed {}".format(feed),
+            "Description": "news",
+            "Language": "en",
+            "URL": "{}/feed/{}".format(self.base_url, feed)
+        } for feed in range(self.n_feeds)])
+
+    async def feed(self, _request):
+        self.requests["feed"] += 1
+        await self.delay(self.feed_latency)
+        if self.random.random() < self.feed_error_rate:
+            if self.random.random() < 0.5:
+                raise web.HTTPInternalServerError()
+            return web.Response(body=b"<rss><channel><item><title>broken", content_type="application/rss+xml")
+        feed = int(_request.match_info["feed"])
+        if feed % 2 == 0:
+            return web.Response(body=self.make_rss(feed), content_type="application/rss+xml")
+        return web.Response(body=self.make_atom(feed), content_type="application/atom+xml")
+
+    async def article(self, _request):
+        self.requests["article"] += 1
+        await self.delay(self.article_latency)
+        if self.random.random() < self.article_error_rate:
+            raise web.HTTPInternalServerError()
+        title = "Article {} of feed {}".format(_request.match_info["entry"], _request.match_info["feed"])
+        body = "".join("<p>{}</p>".format(PARAGRAPH * 2) for _ in range(self.paragraphs_per_article))
+        html = ("<html><head><title>{title}</title></head><body><nav><a href='/'>Home</a> | <a href='/news'>News</a>"
+                "</nav><article><h1>{title}</h1>{body}</article><footer>Copyright Stand-in</footer></body></html>")
+        return web.Response(text=html.format(title=title, body=body), content_type="text/html")
+
+    def entries(self, _feed):
+        now = datetime.now(timezone.utc)
+        for entry in range(self.entries_per_feed):
+            # feeds are shifted so that they do not all publish at the same second
+            published = now - timedelta(seconds=entry * self.entry_interval + _feed % max(self.entry_interval, 1))
+            yield entry, published, "{}/article/{}/{}".format(self.base_url, _feed, entry)
+
+    def make_rss(self, _feed):
+        items = "".join(
+            "<item><title>Article {entry} of feed {feed}</title><link>{link}</link><guid>{link}</guid>"
+            "<pubDate>{date}</pubDate><description>Summary of article {entry}</description></item>".format(
+                entry=entry, feed=_feed, link=link, date=format_datetime(published))
+            for entry, published, link in self.entries(_feed))
+        return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Feed {}</title>{}'
+                '</channel></rss>').format(_feed, items).encode("utf-8")
+
+    def make_atom(self, _feed):
+        entries = "".join(
+            '<entry><title>Article {entry} of feed {feed}</title><link href="{link}"/><id>{link}</id>'
+            "<updated>{date}</updated><summary>Summary of article {entry}</summary></entry>".format(
+                entry=entry, feed=_feed, link=link, date=published.isoformat(timespec="seconds"))
+            for entry, published, link in self.entries(_feed))
+        return ('<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                "<title>Feed {}</title>{}</feed>").format(_feed, entries).encode("utf-8")
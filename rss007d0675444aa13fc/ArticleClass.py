@@ -1,23 +1,30 @@
+import sys
+
 """
 The Article Class is used to fully describe an article so it can be passed as a standalone element. This is used
 when extracting content from an article for example. Essentially, it combines the RSS ID class and the Link class together.
+The publish date is a UTC epoch (int), the source and language strings are interned as they are shared by every article
+of a feed.
 """
 
 
 class Article:
 
+    __slots__ = ("rss_source", "rss_description", "language", "title", "url", "publish_date", "description", "content",
+                 "embedded_content")
+
     def __init__(self, _rss_source, _rss_description, _rss_language, _article_title, _article_url,
-                 _article_publish_date, _article_description):
+                 _article_publish_date, _article_description, _article_embedded_content=None):
 
-        self.rss_source = _rss_source
+        self.rss_source = sys.intern(_rss_source) if type(_rss_source) is str else _rss_source
         self.rss_description = _rss_description
-        self.language = _rss_language
+        self.language = sys.intern(_rss_language) if type(_rss_language) is str else _rss_language
         self.title = _article_title
         self.url = _article_url
         self.publish_date = _article_publish_date
         self.description = _article_description
         self.content = None
+        self.embedded_content = _article_embedded_content  # full content (HTML) carried by the feed, see Link
 
     def update_content(self, _content):
         self.content = _content
-
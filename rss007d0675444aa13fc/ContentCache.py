@@ -0,0 +1,262 @@
+"""
+The ContentCache Class keeps the extracted content of the articles, so that an article selected again (by a later
+query(), another worker process, or after its URL was forgotten by SeenUrls) is not downloaded and parsed again.
+
+Entries are keyed by the canonical URL of the article (see canonicalize_url) and hold its content, language and fetch
+time. They expire after `ttl` seconds.
+- memory tier: an LRU of `capacity` entries,
+- disk tier (optional, `path`): a SQLite database, with the contents compressed. It is opened in WAL mode with a busy
+  timeout, so that several worker processes can share it: readers never block, writers wait for each other. Every
+  process opens its own connection (reopened after a fork). Expired rows are purged periodically, and the oldest rows
+  above `disk_capacity`.
+
+The event loop uses lookup() and store(): only the memory tier is read on the loop, the disk tier (SQLite queries that
+can wait for the lock of another process, and zlib) runs in a dedicated thread of the cache.
+
+Failed extractions (empty contents) are not cached.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_CONTENT_CACHE_CAPACITY = 1000  # entries kept in memory
+DEFAULT_CONTENT_CACHE_DISK_CAPACITY = 100000  # rows kept on disk
+DEFAULT_CONTENT_CACHE_TTL = 24 * 3600  # seconds
+PURGE_EVERY = 1000  # writes between two purges of the disk tier
+SQLITE_BUSY_TIMEOUT = 5  # seconds a writer waits for the lock held by another process
+
+# query parameters that do not change the article, only track where the reader came from
+TRACKING_PARAMETERS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ocid", "cmpid")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(_url):
+    """
+    :return: _url with its scheme and host lowercased, without default port, fragment and tracking parameters, and
+    with its query parameters sorted
+    """
+    try:
+        parts = urlsplit(_url.strip())
+        port = parts.port
+    except ValueError:
+        return _url
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        netloc = "{}:{}".format(netloc, port)
+    query = ""
+    if parts.query:
+        parameters = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                      if not key.lower().startswith(TRACKING_PARAMETERS)]
+        query = urlencode(sorted(parameters))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+class ContentCache:
+
+    def __init__(self, _capacity=DEFAULT_CONTENT_CACHE_CAPACITY, _ttl=DEFAULT_CONTENT_CACHE_TTL, _path=None,
+                 _disk_capacity=DEFAULT_CONTENT_CACHE_DISK_CAPACITY):
+        self.capacity = _capacity
+        self.ttl = _ttl
+        self.path = _path
+        self.disk_capacity = _disk_capacity
+        self.memory = OrderedDict()  # canonical url -> (content, language, fetched_at), least recently used first
+        self.connection = None
+        self.connection_pid = None
+        self.writes = 0
+        self.executor = None  # the thread of the disk tier, see lookup() and store()
+        self.executor_pid = None
+
+    def __len__(self):
+        return len(self.memory)
+
+    def get(self, _url, _now=None):
+        """
+        :return: A (content, language, fetch time) tuple, None if _url is not cached or expired
+        """
+        now = time.time() if _now is None else _now
+        key = canonicalize_url(_url)
+        entry = self.get_memory(key, now)
+        if entry is not None or self.path is None:
+            return entry
+        entry = self.read_disk(key, now)
+        if entry is not None:
+            self.put_memory(key, entry)
+        return entry
+
+    async def lookup(self, _url):
+        """
+        Same as get(), for the event loop: the disk tier is read in the thread of the cache
+        """
+        now = time.time()
+        key = canonicalize_url(_url)
+        entry = self.get_memory(key, now)
+        if entry is not None or self.path is None:
+            return entry
+        entry = await asyncio.get_running_loop().run_in_executor(self.disk_executor(), self.read_disk, key, now)
+        if entry is not None:
+            self.put_memory(key, entry)
+        return entry
+
+    def get_memory(self, _key, _now):
+        entry = self.memory.get(_key)
+        if entry is not None:
+            if _now - entry[2] <= self.ttl:
+                self.memory.move_to_end(_key)
+                return entry
+            del self.memory[_key]
+        return None
+
+    def put(self, _url, _content, _language, _now=None):
+        if not _content:
+            return
+        entry = (_content, _language, time.time() if _now is None else _now)
+        key = canonicalize_url(_url)
+        self.put_memory(key, entry)
+        if self.path is not None:
+            self.write_disk(key, entry)
+
+    def store(self, _url, _content, _language):
+        """
+        Same as put(), for the event loop: returns at once, the disk tier is written in the thread of the cache
+        :return: The future of the disk write, None if there is none
+        """
+        if not _content:
+            return None
+        entry = (_content, _language, time.time())
+        key = canonicalize_url(_url)
+        self.put_memory(key, entry)
+        if self.path is None:
+            return None
+        return self.disk_executor().submit(self.write_disk, key, entry)
+
+    def disk_executor(self):
+        """
+        :return: The single thread running the disk tier of this process (a connection is used by one thread at a time)
+        """
+        if self.executor is None or self.executor_pid != os.getpid():  # threads do not survive a fork
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rss-content-cache")
+            self.executor_pid = os.getpid()
+        return self.executor
+
+    def put_memory(self, _key, _entry):
+        if self.capacity <= 0:
+            return
+        self.memory[_key] = _entry
+        self.memory.move_to_end(_key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def clear(self):
+        self.memory.clear()
+        connection = self.connect()
+        if connection is not None:
+            with connection:
+                connection.execute("DELETE FROM content_cache")
+
+    def connect(self):
+        """
+        :return: The SQLite connection of this process, None if the disk tier is disabled or cannot be opened
+        """
+        if self.path is None:
+            return None
+        if self.connection is None or self.connection_pid != os.getpid():  # connections must not cross a fork
+            try:
+                connection = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                with connection:
+                    connection.execute("CREATE TABLE IF NOT EXISTS content_cache (url TEXT PRIMARY KEY, "
+                                       "content BLOB NOT NULL, language TEXT, fetched_at REAL NOT NULL)")
+                    connection.execute("CREATE INDEX IF NOT EXISTS content_cache_fetched_at "
+                                       "ON content_cache (fetched_at)")
+            except sqlite3.Error as e:
+                logging.info(f"[RSS newsfeed] Could not open the content cache {self.path}: {e}")
+                return None
+            self.connection = connection
+            self.connection_pid = os.getpid()
+        return self.connection
+
+    def read_disk(self, _key, _now):
+        connection = self.connect()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute("SELECT content, language, fetched_at FROM content_cache WHERE url = ?",
+                                     (_key,)).fetchone()
+        except sqlite3.Error as e:
+            logging.info(f"[RSS newsfeed] Could not read the content cache {self.path}: {e}")
+            return None
+        if row is None or _now - row[2] > self.ttl:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8"), row[1], row[2]
+
+    def write_disk(self, _key, _entry):
+        connection = self.connect()
+        if connection is None:
+            return
+        content, language, fetched_at = _entry
+        try:
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO content_cache VALUES (?, ?, ?, ?)",
+                                   (_key, zlib.compress(content.encode("utf-8")), language, fetched_at))
+            self.writes += 1
+            if self.writes % PURGE_EVERY == 0:
+                self.purge(fetched_at)
+        except sqlite3.Error as e:
+            logging.info(f"[RSS newsfeed] Could not write the content cache {self.path}: {e}")
+
+    def purge(self, _now=None):
+        """
+        Deletes the expired rows of the disk tier, then the oldest rows above disk_capacity
+        """
+        connection = self.connect()
+        if connection is None:
+            return
+        now = time.time() if _now is None else _now
+        with connection:
+            connection.execute("DELETE FROM content_cache WHERE fetched_at < ?", (now - self.ttl,))
+            connection.execute("DELETE FROM content_cache WHERE url IN (SELECT url FROM content_cache "
+                               "ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)", (self.disk_capacity,))
+
+    def close(self):
+        if self.executor is not None and self.executor_pid == os.getpid():
+            self.executor.shutdown(wait=True)  # the pending writes first
+        self.executor = None
+        self.executor_pid = None
+        if self.connection is not None and self.connection_pid == os.getpid():
+            self.connection.close()
+        self.connection = None
+        self.connection_pid = None
+
+
+# module-level cache used by extract_article_content
+_content_cache = ContentCache()
+_content_cache_settings = (DEFAULT_CONTENT_CACHE_CAPACITY, DEFAULT_CONTENT_CACHE_TTL, None)
+
+
+def get_content_cache():
+    return _content_cache
+
+
+def configure_content_cache(_capacity=DEFAULT_CONTENT_CACHE_CAPACITY, _ttl=DEFAULT_CONTENT_CACHE_TTL, _path=None):
+    """
+    Replaces the module-level cache if its settings changed (the memory tier of the previous cache is then forgotten)
+    :param _capacity: The number of entries kept in memory, 0 to keep none
+    :param _ttl: The number of seconds an entry is valid
+    :param _path: A local SQLite file holding the disk tier, shared by the worker processes, None for memory only
+    :return: The module-level cache
+    """
+    global _content_cache, _content_cache_settings
+    settings = (_capacity, _ttl, _path)
+    if settings != _content_cache_settings:
+        _content_cache.close()
+        _content_cache = ContentCache(_capacity, _ttl, _path)
+        _content_cache_settings = settings
+    return _content_cache
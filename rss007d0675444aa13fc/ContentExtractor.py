@@ -0,0 +1,180 @@
+"""
+Extraction engines, turning the HTML of an article into its main text (see parse_article_html):
+- "newspaper": Newspaper4k, thorough but the most CPU-expensive step of the collector (it also runs its NLP hooks,
+  image / video discovery and many passes over the DOM),
+- "fast": a lightweight main-text extractor on lxml. Boilerplate elements (navigation, scripts, asides, comments,
+  share and cookie banners...) are dropped, the paragraphs are scored by length and link density, the scores are
+  propagated to their parent and grand-parent, and the paragraphs of the best scoring container (and of its siblings
+  scoring close to it) are kept, in document order,
+- "auto": "fast", falling back to "newspaper" when its text is shorter than the minimum post length.
+
+html_to_text() reads the full content some feeds embed in their entries (content:encoded, Atom <content>): a clean
+fragment of the article, its text is kept as is, without any scoring.
+
+An engine is a function (url, language, html) -> text registered in EXTRACTION_ENGINES. Engines are referenced by name
+so that they can run in a process pool: custom engines must be registered when their module is imported, in every
+process.
+"""
+import re
+
+from .ContentSanitizer import is_long_enough
+
+AUTO = "auto"
+DEFAULT_EXTRACTION_ENGINE = "newspaper"
+
+MIN_PARAGRAPH_LENGTH = 25  # characters, shorter paragraphs are not scored (captions, bylines, "Read more")
+MAX_LINK_DENSITY = 0.5  # share of the text of a paragraph in links above which it is navigation
+SIBLING_SCORE_RATIO = 0.2  # siblings of the best container scoring above this share of its score are kept too
+
+_BOILERPLATE_TAGS = ("script", "style", "noscript", "nav", "header", "footer", "aside", "form", "iframe", "svg",
+                     "button", "select", "template", "figure")
+_CONTAINER_TAGS = ("div", "section", "ul", "ol", "table", "span", "p")
+_PARAGRAPH_TAGS = ("p", "pre", "div")
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "ul", "ol", "table", "pre", "blockquote", "h1", "h2", "h3",
+               "h4", "h5", "h6", "header", "footer", "form"}
+_UNLIKELY_RE = re.compile(r"comment|footer|sidebar|side-bar|\bnav|menu|share|social|related|promo|advert|\bads?\b|"
+                          r"cookie|consent|subscribe|newsletter|breadcrumb|popup|modal|banner|widget|disclaimer|"
+                          r"recommend|outbrain|taboola", re.I)
+# characters XML does not allow (lxml refuses them in the text of an element), feeds do carry them
+_INVALID_XML_CHARS_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+_LIKELY_RE = re.compile(r"article|body|content|entry|main|post|story|text", re.I)
+
+
+def extract_with_newspaper(_url, _language, _html):
+    from newspaper import Article as Newspaper  # heavy (NLP stack), only imported once an article is parsed
+
+    a = Newspaper(_url, language=_language)
+    a.download(input_html=_html)
+    a.parse()
+    return a.text
+
+
+def _text_of(_element):
+    return " ".join(_element.text_content().split())
+
+
+def _link_density(_element, _text_length):
+    if not _text_length:
+        return 1.0
+    return sum(len(_text_of(link)) for link in _element.iter("a")) / _text_length
+
+
+def _drop_boilerplate(_root):
+    boilerplate = list(_root.iter(*_BOILERPLATE_TAGS))
+    for element in _root.iter(*_CONTAINER_TAGS):
+        attributes = "{} {}".format(element.get("class", ""), element.get("id", ""))
+        if _UNLIKELY_RE.search(attributes) and not _LIKELY_RE.search(attributes):
+            boilerplate.append(element)
+    for element in boilerplate:
+        if element.getparent() is not None:
+            element.drop_tree()  # keeps the tail text
+
+
+def _paragraphs(_root):
+    """
+    :return: The (element, text) of the paragraphs of the document, in document order: <p>, <pre> and the <div> holding
+    text but no block element (sites laying out their paragraphs with divs)
+    """
+    paragraphs = []
+    for element in _root.iter(*_PARAGRAPH_TAGS):
+        if element.tag == "div" and any(child.tag in _BLOCK_TAGS for child in element.iterdescendants()):
+            continue
+        text = _text_of(element)
+        if text and _link_density(element, len(text)) <= MAX_LINK_DENSITY:
+            paragraphs.append((element, text))
+    return paragraphs
+
+
+def extract_with_lxml(_url, _language, _html):
+    from lxml import etree, html as lxml_html  # imported on first use
+
+    try:
+        root = lxml_html.document_fromstring(_html)
+    except (etree.ParserError, ValueError):  # empty or unreadable document
+        return ""
+    _drop_boilerplate(root)
+    paragraphs = _paragraphs(root)
+
+    # readability-like scoring: every paragraph votes for its parent, and for its grand-parent at half weight
+    scores = {}
+    for element, text in paragraphs:
+        if len(text) < MIN_PARAGRAPH_LENGTH:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = element.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + score / 2
+    if not scores:
+        return ""
+    for container in scores:
+        text_length = len(_text_of(container))
+        scores[container] *= 1 - min(_link_density(container, text_length), 1.0)
+    best = max(scores, key=scores.get)
+    threshold = max(10.0, scores[best] * SIBLING_SCORE_RATIO)
+    selected = {best}
+    parent = best.getparent()
+    if parent is not None:
+        selected.update(sibling for sibling in parent if sibling is not best and scores.get(sibling, 0) >= threshold)
+
+    texts = []
+    for element, text in paragraphs:
+        for ancestor in element.iterancestors():
+            if ancestor in selected:
+                texts.append(text)
+                break
+    return "\n\n".join(texts)
+
+
+def html_to_text(_html):
+    """
+    :param _html: An HTML fragment, such as the full content embedded in a feed entry
+    :return: Its text, one paragraph per block element, "" if it cannot be read
+    """
+    from lxml import etree, html as lxml_html  # imported on first use
+
+    try:
+        root = lxml_html.fragment_fromstring(_INVALID_XML_CHARS_RE.sub(" ", _html), create_parent="div")
+    except (etree.ParserError, ValueError):
+        return ""
+    for element in list(root.iter(*_BOILERPLATE_TAGS)):
+        if element is not root and element.getparent() is not None:
+            element.drop_tree()
+    for element in root.iter(*_BLOCK_TAGS, "li", "br"):
+        element.tail = "\n\n" + (element.tail or "")
+        if element.tag != "br":
+            element.text = "\n\n" + (element.text or "")
+    paragraphs = (" ".join(paragraph.split()) for paragraph in re.split(r"\n\s*\n", root.text_content()))
+    return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+
+
+EXTRACTION_ENGINES = {
+    "newspaper": extract_with_newspaper,
+    "fast": extract_with_lxml,
+}
+
+
+def check_extraction_engine(_engine):
+    """
+    :raise ValueError: if _engine is neither a registered engine nor "auto"
+    """
+    if _engine != AUTO and _engine not in EXTRACTION_ENGINES:
+        raise ValueError("Unknown extraction engine: {}".format(_engine))
+
+
+def extract_text(_engine, _url, _language, _html, _min_length=0):
+    """
+    :param _engine: The name of a registered engine, or "auto"
+    :param _min_length: With "auto", the text of the fast engine is only kept if it is at least this long
+    :return: The text of the article
+    """
+    if _engine == AUTO:
+        text = extract_with_lxml(_url, _language, _html)
+        if text and is_long_enough(text, _min_length):
+            return text
+        return extract_with_newspaper(_url, _language, _html)
+    check_extraction_engine(_engine)
+    return EXTRACTION_ENGINES[_engine](_url, _language, _html)
@@ -0,0 +1,47 @@
+"""
+Sanitization of the article contents before they are yielded: quotes, double quotes, slashes, backslashes and line
+breaks are replaced by spaces in a single str.translate pass (instead of a chain of str.replace, one pass each), and
+runs of whitespace can optionally be collapsed into a single space.
+"""
+
+# characters replaced by a space
+SANITIZED_CHARACTERS = "\"'\\/\n\r"
+SANITIZE_TABLE = str.maketrans(dict.fromkeys(SANITIZED_CHARACTERS, " "))
+
+
+def content_text(_content):
+    """
+    :param _content: The content of an Article: a string, a list of strings (see Article.update_content) or None
+    :return: The content as a single string
+    """
+    if _content is None:
+        return ""
+    if isinstance(_content, str):
+        return _content
+    if isinstance(_content, (list, tuple)):
+        return " ".join(str(part) for part in _content if part)
+    return str(_content)
+
+
+def sanitize_content(_content, _collapse_whitespace=False):
+    """
+    :param _content: The content of an Article (see content_text)
+    :param _collapse_whitespace: True to also replace every run of whitespace by a single space and strip the result
+    :return: The sanitized content
+    """
+    text = content_text(_content).translate(SANITIZE_TABLE)
+    if _collapse_whitespace:
+        return " ".join(text.split())
+    return text
+
+
+def is_long_enough(_text, _min_post_length):
+    """
+    :return: True if _text (None counting as empty) holds at least _min_post_length characters, spaces excluded at both
+    ends
+    """
+    if not _min_post_length:
+        return True
+    if not _text or len(_text) < _min_post_length:  # cheap bound first, stripping can only shorten the text
+        return False
+    return len(_text.strip()) >= _min_post_length
@@ -0,0 +1,123 @@
+"""
+Date normalization of the feed entries. Dates are carried internally as UTC epoch integers (seconds), and only
+formatted to strings when an Item is built.
+
+parse_date_to_epoch recognizes the two formats used by nearly every feed with hand written parsers:
+- RFC 822 / RFC 2822 (RSS pubDate), e.g. "Wed, 07 Jun 2023 19:30:00 +0200" or "7 Jun 2023 19:30 GMT"
+- ISO 8601 / RFC 3339 (Atom updated/published), e.g. "2023-06-07T19:30:00.000Z" or "2023-06-07 19:30:00+02:00"
+and falls back to dateutil for anything else. Results are memoized, as the same dates come back on every poll.
+Naive dates are interpreted in the local timezone, as dateutil + astimezone did.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+STANDARD_FORMAT = "%Y-%m-%d %H:%M:%S"
+ISO8601_UTC_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+MAX_SECONDS_AHEAD = 12 * 3600  # dates further in the future than this are capped to now
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_MONTHS = {"jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+           "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12}
+
+# offsets in minutes of the RFC 822 zone names
+_ZONES = {"UT": 0, "UTC": 0, "GMT": 0, "Z": 0,
+          "EST": -300, "EDT": -240, "CST": -360, "CDT": -300,
+          "MST": -420, "MDT": -360, "PST": -480, "PDT": -420}
+
+_RFC822_RE = re.compile(
+    r"^\s*(?:[A-Za-z]{3,9},?\s+)?(\d{1,2})\s+([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{2,4})\s+"
+    r"(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([+-]\d{4}|[A-Za-z]{1,3})?\s*$")
+
+
+def _rfc822_to_datetime(_date):
+    match = _RFC822_RE.match(_date)
+    if match is None:
+        return None
+    day, month, year, hour, minute, second, zone = match.groups()
+    month = _MONTHS.get(month.lower())
+    if month is None:
+        return None
+    year = int(year)
+    if year < 100:  # two digits years, as in RFC 822
+        year += 2000 if year < 50 else 1900
+    if zone is None:
+        tz = None
+    elif zone[0] in "+-":
+        offset = int(zone[1:3]) * 60 + int(zone[3:5])
+        tz = timezone(timedelta(minutes=offset if zone[0] == "+" else -offset))
+    elif zone.upper() in _ZONES:
+        tz = timezone(timedelta(minutes=_ZONES[zone.upper()]))
+    else:
+        return None
+    return datetime(year, month, int(day), int(hour), int(minute), int(second or 0), tzinfo=tz)
+
+
+def _iso8601_to_datetime(_date):
+    _date = _date.strip()
+    if len(_date) < 10 or _date[4] != "-" or _date[7] != "-":
+        return None
+    try:
+        return datetime.fromisoformat(_date)  # python >= 3.11 also accepts the "Z" suffix
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def parse_date_to_epoch(_date):
+    """
+    Takes an unparsed date and returns it as a UTC epoch
+    :param _date: Unparsed date (string)
+    :return: The number of seconds since 1970-01-01 00:00:00 UTC
+    """
+    dt = _rfc822_to_datetime(_date) or _iso8601_to_datetime(_date)
+    if dt is None:
+        from dateutil import parser
+        dt = parser.parse(_date)  # can't use fuzzy param here to avoid false negatives
+    if dt.tzinfo is None:
+        dt = dt.astimezone()  # naive dates are local dates
+    return datetime_to_epoch(dt)
+
+
+def datetime_to_epoch(_dt):
+    return int((_dt - _EPOCH) // timedelta(seconds=1))
+
+
+def epoch_to_datetime(_epoch):
+    return _EPOCH + timedelta(seconds=_epoch)
+
+
+def to_epoch(_value):
+    """
+    Coerces a date to a UTC epoch
+    :param _value: An epoch, an aware datetime, or a string (standard "%Y-%m-%d %H:%M:%S" UTC format or any date)
+    :return: The number of seconds since 1970-01-01 00:00:00 UTC
+    """
+    if isinstance(_value, int):
+        return _value
+    if isinstance(_value, float):
+        return int(_value)
+    if isinstance(_value, datetime):
+        return datetime_to_epoch(_value if _value.tzinfo is not None else _value.astimezone())
+    if len(_value) == 19 and _value[10] == " ":  # standard format, always UTC
+        return datetime_to_epoch(datetime.strptime(_value, STANDARD_FORMAT).replace(tzinfo=timezone.utc))
+    return parse_date_to_epoch(_value)
+
+
+def epoch_to_standard(_epoch):
+    return epoch_to_datetime(_epoch).strftime(STANDARD_FORMAT)
+
+
+def epoch_to_iso8601_utc(_epoch):
+    return epoch_to_datetime(_epoch).strftime(ISO8601_UTC_FORMAT)
+
+
+def cap_epoch_to_now(_epoch, _now=None):
+    """
+    Caps a date to now if it is more than MAX_SECONDS_AHEAD in the future (some feeds are days ahead)
+    """
+    now = _now if _now is not None else datetime_to_epoch(datetime.now(timezone.utc))
+    if _epoch - now > MAX_SECONDS_AHEAD:
+        return now
+    return _epoch
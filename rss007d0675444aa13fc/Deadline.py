@@ -0,0 +1,61 @@
+"""
+The Deadline Class bounds the wall-clock time of query(), for orchestrators running the collector in fixed time slots.
+
+A deadline expires `seconds` after its creation, minus a small margin (5%, at most MAX_MARGIN seconds) left for
+tearing down the work in flight and handing over the items already complete. Stage budgets bound single stages within
+the deadline, e.g. so that a slow content extraction does not run until the very end:
+- registry: loading FeedSources.json,
+- discovery: fetching the feeds and selecting their articles,
+- extraction: downloading and parsing the articles (items are only yielded until it expires).
+Stages start when stage() is called, and never outlive the whole deadline.
+"""
+import asyncio
+import time
+
+MARGIN_RATIO = 0.05
+MAX_MARGIN = 1.0  # seconds
+
+
+class Deadline:
+
+    def __init__(self, _seconds=None, _budgets=None, _now=None):
+        """
+        :param _seconds: The number of seconds before the deadline expires, None for no deadline
+        :param _budgets: Optional dict {stage: seconds}, see stage()
+        """
+        now = time.monotonic() if _now is None else _now
+        self.expires_at = None
+        if _seconds is not None:
+            self.expires_at = now + _seconds - min(_seconds * MARGIN_RATIO, MAX_MARGIN)
+        self.budgets = {stage: budget for stage, budget in (_budgets or {}).items() if budget is not None}
+
+    def remaining(self, _now=None):
+        """
+        :return: The number of seconds left (0 once expired), None for no deadline
+        """
+        if self.expires_at is None:
+            return None
+        now = time.monotonic() if _now is None else _now
+        return max(0.0, self.expires_at - now)
+
+    def expired(self, _now=None):
+        return self.expires_at is not None and self.remaining(_now) == 0
+
+    def stage(self, _stage, _now=None):
+        """
+        :return: The Deadline of the stage _stage starting now: its budget, within this deadline
+        """
+        now = time.monotonic() if _now is None else _now
+        stage = Deadline()
+        stage.expires_at = self.expires_at
+        budget = self.budgets.get(_stage)
+        if budget is not None and (stage.expires_at is None or now + budget < stage.expires_at):
+            stage.expires_at = now + budget
+        return stage
+
+    async def run(self, _awaitable):
+        """
+        Awaits _awaitable, cancelled if the deadline expires first
+        :raise asyncio.TimeoutError: if the deadline expired
+        """
+        return await asyncio.wait_for(_awaitable, self.remaining())
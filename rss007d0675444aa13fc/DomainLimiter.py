@@ -0,0 +1,210 @@
+"""
+The DomainLimiter Class spaces out the requests sent to the same registered domain, so that fetching many feeds and
+articles in parallel does not hammer a single publisher (and get the collector throttled or banned). It is shared by
+the feed fetches and the article downloads. For every domain:
+- a token bucket allows `rate` requests per second on average, with bursts of up to `burst` requests,
+- at most `max_in_flight` requests are running at the same time,
+- a 429 (or a 503 with a Retry-After header) blocks the domain, and only this domain, for the time asked by the server.
+
+Requests to other domains are never held back by a busy domain; interleave_by_domain orders a batch of URLs so that
+consecutive ones go to different domains.
+"""
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+
+from .DateNormalizer import parse_date_to_epoch
+
+DEFAULT_DOMAIN_RATE = 5.0  # requests per second and per domain, 0 or None for no rate limit
+DEFAULT_DOMAIN_BURST = 10
+DEFAULT_DOMAIN_MAX_IN_FLIGHT = 4
+DEFAULT_BACKOFF = 30  # seconds a domain is blocked after a 429 without Retry-After
+MAX_BACKOFF = 600  # seconds, cap of the Retry-After honored
+
+
+def parse_retry_after(_value, _now=None):
+    """
+    :param _value: The value of a Retry-After header: a number of seconds or an HTTP date
+    :return: The number of seconds to wait, None if the value cannot be read
+    """
+    if not _value:
+        return None
+    _value = _value.strip()
+    if _value.isdigit():
+        return int(_value)
+    try:
+        return max(0.0, parse_date_to_epoch(_value) - (time.time() if _now is None else _now))
+    except Exception:
+        return None
+
+
+class DomainState:
+
+    __slots__ = ("tokens", "updated_at", "in_flight", "blocked_until", "waiters")
+
+    def __init__(self, _tokens, _now):
+        self.tokens = _tokens
+        self.updated_at = _now
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.waiters = deque()  # futures of the requests waiting for this domain
+
+
+class DomainLimiter:
+
+    def __init__(self, _domain_of, _rate=DEFAULT_DOMAIN_RATE, _burst=DEFAULT_DOMAIN_BURST,
+                 _max_in_flight=DEFAULT_DOMAIN_MAX_IN_FLIGHT):
+        """
+        :param _domain_of: Function returning the registered domain of a URL
+        :param _rate: Requests per second allowed per domain, 0 or None for no rate limit
+        :param _burst: Number of requests a domain idle for a while can receive at once
+        :param _max_in_flight: Maximum number of simultaneous requests per domain, 0 or None for no limit
+        """
+        self.domain_of = _domain_of
+        self.rate = _rate
+        self.burst = _burst
+        self.max_in_flight = _max_in_flight
+        self.domains = {}  # domain -> DomainState
+
+    def configure(self, _rate=None, _burst=None, _max_in_flight=None):
+        """
+        Updates the limits, None keeps the current value
+        """
+        if _rate is not None:
+            self.rate = _rate
+        if _burst is not None:
+            self.burst = _burst
+        if _max_in_flight is not None:
+            self.max_in_flight = _max_in_flight
+
+    def domain_state(self, _domain):
+        state = self.domains.get(_domain)
+        if state is None:
+            state = self.domains[_domain] = DomainState(self.burst, time.monotonic())
+        return state
+
+    def key(self, _url):
+        try:
+            return self.domain_of(_url) or _url
+        except Exception:
+            return _url
+
+    def delay(self, _state, _now):
+        """
+        Refills the bucket of the domain
+        :return: 0 if a request can be sent now, else the number of seconds to wait (None: until a request ends)
+        """
+        if self.rate:
+            _state.tokens = min(self.burst, _state.tokens + (_now - _state.updated_at) * self.rate)
+        _state.updated_at = _now
+        if _state.blocked_until > _now:
+            return _state.blocked_until - _now
+        if self.max_in_flight and _state.in_flight >= self.max_in_flight:
+            return None
+        if self.rate and _state.tokens < 1:
+            return (1 - _state.tokens) / self.rate
+        return 0
+
+    async def acquire(self, _url):
+        """
+        Waits until a request can be sent to the domain of _url
+        :return: The domain, to give back to release
+        """
+        domain = self.key(_url)
+        state = self.domain_state(domain)
+        while True:
+            delay = self.delay(state, time.monotonic())
+            if delay == 0:
+                if self.rate:
+                    state.tokens -= 1
+                state.in_flight += 1
+                return domain
+            await self.wait(state, delay)
+
+    async def wait(self, _state, _delay):
+        waiter = asyncio.get_running_loop().create_future()
+        _state.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, _delay)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.wake(_state)  # hand the wake up we got over to the next request
+            raise
+        finally:
+            with contextlib.suppress(ValueError):
+                _state.waiters.remove(waiter)
+
+    @staticmethod
+    def wake(_state):
+        while _state.waiters:
+            waiter = _state.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def release(self, _domain):
+        state = self.domains.get(_domain)
+        if state is not None:
+            state.in_flight -= 1
+            self.wake(state)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, _url):
+        """
+        Async context manager holding a request slot of the domain of _url
+        """
+        domain = await self.acquire(_url)
+        try:
+            yield
+        finally:
+            self.release(domain)
+
+    def backoff(self, _url, _seconds):
+        """
+        Blocks the domain of _url for _seconds
+        """
+        state = self.domain_state(self.key(_url))
+        state.blocked_until = max(state.blocked_until, time.monotonic() + min(_seconds, MAX_BACKOFF))
+
+    def record_response(self, _url, _status, _headers):
+        """
+        Backs the domain of _url off if the server asked us to slow down (429, or 503 with a Retry-After header)
+        """
+        if _status != 429 and _status != 503:
+            return
+        retry_after = parse_retry_after(_headers.get("Retry-After"))
+        if retry_after is None:
+            if _status == 503:
+                return  # a plain server error, not a request to slow down
+            retry_after = DEFAULT_BACKOFF
+        logging.info(f"[RSS newsfeed] {self.key(_url)} answered {_status}, backing off for {retry_after:.0f} seconds")
+        self.backoff(_url, retry_after)
+
+
+def interleave_by_domain(_items, _domain_of):
+    """
+    Reorders _items so that consecutive items belong to different domains where possible (round-robin over the
+    domains, in their order of first appearance). The relative order of the items of a domain is kept.
+    :param _items: The items (URLs, RssID...)
+    :param _domain_of: Function returning the domain of an item
+    :return: A new list
+    """
+    groups = {}
+    for item in _items:
+        try:
+            domain = _domain_of(item)
+        except Exception:
+            domain = None
+        groups.setdefault(domain, deque()).append(item)
+    queues = deque(groups.values())
+    interleaved = []
+    while queues:
+        queue = queues.popleft()
+        interleaved.append(queue.popleft())
+        if queue:
+            queues.append(queue)
+    return interleaved
@@ -0,0 +1,69 @@
+"""
+The DomainResolver Class turns URLs into registered domains ("news.bbc.co.uk" -> "bbc.co.uk"), the keys used to
+label the items, index the feeds and rate-limit the requests (see FeedRegistry and DomainLimiter).
+
+The default tldextract extractor may download the public suffix list on first use, which delays the startup and fails
+on network-isolated nodes. The resolver reads the suffix list snapshot bundled with tldextract instead, and never
+touches the network unless suffix list URLs are given. tldextract is imported and the extractor built on first use,
+and the domains are memoized (LRU) by hostname, so the articles of a feed share a single lookup.
+"""
+import re
+from functools import lru_cache
+
+DEFAULT_MEMO_SIZE = 65536  # hostnames
+
+# scheme://[userinfo@]hostname, several times faster than urllib.parse.urlsplit (IPv6 literals are left to tldextract)
+_HOSTNAME_RE = re.compile(r"[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^@/?#]*@)?([^:/?#\[\]@]+)")
+
+
+class DomainResolver:
+
+    def __init__(self, _suffix_list_urls=(), _cache_dir=None, _memo_size=DEFAULT_MEMO_SIZE):
+        """
+        :param _suffix_list_urls: URLs the public suffix list is downloaded from, () to only use the bundled snapshot
+        :param _cache_dir: Directory caching the suffix list, None for no cache
+        :param _memo_size: The number of hostnames whose domain is memoized
+        """
+        self.suffix_list_urls = tuple(_suffix_list_urls)
+        self.cache_dir = _cache_dir
+        self.extractor = None
+        self.domain_of_hostname = lru_cache(maxsize=_memo_size)(self.resolve_hostname)
+
+    def get_extractor(self):
+        if self.extractor is None:
+            import tldextract  # imported on first use, it is heavy to import
+
+            self.extractor = tldextract.TLDExtract(cache_dir=self.cache_dir, suffix_list_urls=self.suffix_list_urls,
+                                                   fallback_to_snapshot=True)
+        return self.extractor
+
+    def resolve_hostname(self, _hostname):
+        domain_parts = self.get_extractor()(_hostname)
+        return domain_parts.domain + '.' + domain_parts.suffix
+
+    def domain_of(self, _url):
+        """
+        :param _url: A URL, with or without its scheme
+        :return: The registered domain of the URL, lowercased, as "domain.suffix"
+        """
+        match = _HOSTNAME_RE.match(_url)
+        if match is None:  # no scheme, IPv6...: let tldextract find the hostname
+            return self.resolve_hostname(_url.lower())
+        return self.domain_of_hostname(match.group(1).lower())
+
+
+# module-level resolver used by extract_domain_name
+_domain_resolver = DomainResolver()
+
+
+def get_domain_resolver():
+    return _domain_resolver
+
+
+def configure_domain_resolver(_suffix_list_urls=(), _cache_dir=None, _memo_size=DEFAULT_MEMO_SIZE):
+    """
+    Replaces the module-level resolver, e.g. to let it refresh the suffix list from the network
+    """
+    global _domain_resolver
+    _domain_resolver = DomainResolver(_suffix_list_urls, _cache_dir, _memo_size)
+    return _domain_resolver
@@ -0,0 +1,199 @@
+"""
+Incremental feed parser for RSS 2.0, RSS 1.0 (RDF) and Atom, built on lxml's pull parser. Unlike feedparser, it only
+extracts what the collector needs (title, link, publish date, description and optionally the full content embedded in
+the entry) and stops reading the feed once its
+entries fall behind the requested start date: most feeds are sorted newest first, so when we only look for the last
+few minutes, nearly the whole document can be skipped.
+
+Anything it does not understand (malformed XML, undeclared HTML entities, unknown root element...) raises
+FeedFormatError, the caller is then expected to fall back to feedparser.
+"""
+from .DateNormalizer import parse_date_to_epoch
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+RSS1_NS = "{http://purl.org/rss/1.0/}"
+RDF_NS = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+
+EARLY_STOP_OLD_ENTRIES = 3  # consecutive entries older than the start date before we stop reading
+CHUNK_SIZE = 16384
+
+_ENTRY_TAGS = {"item", RSS1_NS + "item", ATOM_NS + "entry"}
+_ROOT_TAGS = {"rss", RDF_NS + "RDF", ATOM_NS + "feed"}
+_DATE_TAGS = ("pubDate", DC_NS + "date", ATOM_NS + "published", ATOM_NS + "updated", "published", "updated")
+_TITLE_TAGS = ("title", RSS1_NS + "title", ATOM_NS + "title")
+_DESCRIPTION_TAGS = ("description", RSS1_NS + "description", ATOM_NS + "summary", ATOM_NS + "content")
+_CONTENT_TAGS = (CONTENT_NS + "encoded", ATOM_NS + "content")
+
+
+class FeedFormatError(Exception):
+    pass
+
+
+def _find_text(_entry, _tags):
+    for tag in _tags:
+        child = _entry.find(tag)
+        if child is not None and child.text:
+            return child.text.strip()
+    return None
+
+
+def _find_link(_entry):
+    link = _entry.find("link")
+    if link is None:
+        link = _entry.find(RSS1_NS + "link")
+    if link is not None and link.text and link.text.strip():
+        return link.text.strip()
+    # Atom: <link rel="alternate" href="..."/>, rel defaults to alternate
+    for link in _entry.iterfind(ATOM_NS + "link"):
+        if link.get("rel", "alternate") == "alternate" and link.get("href"):
+            return link.get("href").strip()
+    return None
+
+
+def _find_content(_entry):
+    """
+    :return: The full content embedded in the entry (RSS content:encoded or Atom <content>) as HTML, or None
+    """
+    for tag in _CONTENT_TAGS:
+        child = _entry.find(tag)
+        if child is None:
+            continue
+        if len(child):  # Atom type="xhtml": the content is inline markup
+            from lxml import etree
+
+            content = (child.text or "") + "".join(etree.tostring(element, encoding="unicode") for element in child)
+        else:
+            content = child.text
+        if content and content.strip():
+            return content.strip()
+    return None
+
+
+def _read_entry(_entry):
+    """
+    :return: A (title, link, publish date as UTC epoch or None, description) tuple
+    """
+    s_publish_date = _find_text(_entry, _DATE_TAGS)
+    publish_date = None
+    if s_publish_date:
+        try:
+            publish_date = parse_date_to_epoch(s_publish_date)
+        except Exception:
+            publish_date = None
+    return _find_text(_entry, _TITLE_TAGS), _find_link(_entry), publish_date, _find_text(_entry, _DESCRIPTION_TAGS)
+
+
+class IncrementalFeedParser:
+    """
+    Parses a feed fed by chunks (see feed()), entries are read as soon as they are complete.
+    """
+
+    def __init__(self, _start_date=None, _end_date=None, _with_content=False):
+        """
+        :param _with_content: If True, the entries get a fifth item, the full content embedded in the entry (see
+        _find_content)
+        """
+        from lxml import etree  # imported on first use, only needed with feed_parser="lxml"
+
+        self.syntax_error = etree.XMLSyntaxError
+        self.start_date = _start_date
+        self.end_date = _end_date
+        self.with_content = _with_content
+        self.parser = etree.XMLPullParser(events=("start", "end"), resolve_entities=False, no_network=True,
+                                          remove_comments=True, remove_pis=True)
+        self.entries = []  # (title, link, publish date, description) within the time window
+        self.root_checked = False
+        self.consecutive_old_entries = 0
+        self.n_entries = 0  # entries read
+        self.n_old_entries = 0  # entries dropped for being older than the start date
+        self.done = False  # True once the entries fell behind the start date
+
+    def feed(self, _chunk):
+        """
+        Feeds a chunk of the document
+        :return: True once the rest of the document can be skipped
+        """
+        if self.done:
+            return True
+        try:
+            self.parser.feed(_chunk)
+            self.read_events()
+        except self.syntax_error as e:
+            raise FeedFormatError(str(e)) from e
+        return self.done
+
+    def close(self, _truncated=False):
+        """
+        Ends the parsing
+        :param _truncated: True if the document was cut short (see FeedReader), the entries complete so far are kept
+        :return: The entries within the time window
+        """
+        if _truncated and not self.done:
+            if not self.root_checked:
+                raise FeedFormatError("truncated document")
+        elif not self.done:
+            try:
+                self.parser.close()
+                self.read_events()
+            except self.syntax_error as e:
+                raise FeedFormatError(str(e)) from e
+            if not self.root_checked:
+                raise FeedFormatError("empty document")
+        return self.entries
+
+    def read_events(self):
+        for event, element in self.parser.read_events():
+            if not self.root_checked:
+                if element.tag not in _ROOT_TAGS:
+                    raise FeedFormatError("unsupported root element {}".format(element.tag))
+                self.root_checked = True
+            if event != "end" or element.tag not in _ENTRY_TAGS:
+                continue
+            title, link, publish_date, description = _read_entry(element)
+            content = _find_content(element) if self.with_content else None
+            self.n_entries += 1
+            # free the entries already read, memory stays flat on large feeds
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+            if publish_date is None:
+                continue  # don't keep links with no associated date as we will not parse the article for a date
+            if self.start_date is not None and publish_date < self.start_date:
+                self.n_old_entries += 1
+                self.consecutive_old_entries += 1
+                if self.consecutive_old_entries >= EARLY_STOP_OLD_ENTRIES:
+                    self.done = True
+                    return
+                continue
+            self.consecutive_old_entries = 0
+            if self.end_date is not None and publish_date > self.end_date:
+                continue
+            if title is not None and link is not None:
+                if self.with_content:
+                    self.entries.append((title, link, publish_date, description, content))
+                else:
+                    self.entries.append((title, link, publish_date, description))
+
+
+def parse_feed(_data, _start_date=None, _end_date=None, _counts=None):
+    """
+    Parses a whole feed document, stopping early once its entries are older than _start_date
+    :param _data: The feed document (bytes)
+    :param _start_date: UTC epoch, entries published before are dropped, None to keep them all
+    :param _end_date: UTC epoch, entries published after are dropped, None to keep them all
+    :param _counts: Optional dict, its "entries" and "old_entries" keys are set to the number of entries read and
+    dropped for being older than _start_date
+    :return: A list of (title, link, publish date, description) tuples
+    """
+    parser = IncrementalFeedParser(_start_date, _end_date)
+    try:
+        for offset in range(0, len(_data), CHUNK_SIZE):
+            if parser.feed(_data[offset:offset + CHUNK_SIZE]):
+                break
+        return parser.close()
+    finally:
+        if _counts is not None:
+            _counts["entries"] = parser.n_entries
+            _counts["old_entries"] = parser.n_old_entries
@@ -0,0 +1,201 @@
+"""
+The FeedHealthTracker Class keeps the health of every feed (successes, failures, latency EWMA, last error) and a
+circuit breaker per feed, so that dead feeds stop eating the time budget of query(): a feed that times out costs up to
+the whole request timeout, every time it is picked.
+
+Circuit breaker of a feed:
+- closed: the feed is fetched normally,
+- open: after a failure, the feed is left out of the selection for `base_backoff` seconds, doubled on every
+  consecutive failure (up to `max_backoff`),
+- half-open: once the backoff is over, a single probe fetch is let through. Its success closes the circuit, its failure
+  opens it again for twice as long. A probe that never reports back (cancelled fetch) expires after PROBE_TIMEOUT.
+
+The health can be persisted to a local JSON file, and read through stats() and summary().
+"""
+import json
+import logging
+import os
+import time
+
+DEFAULT_BASE_BACKOFF = 60  # seconds
+DEFAULT_MAX_BACKOFF = 6 * 3600  # seconds
+DEFAULT_EWMA_ALPHA = 0.3
+PROBE_TIMEOUT = 60  # seconds after which a half-open probe that did not report back can be retried
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class FeedHealth:
+
+    def __init__(self, _successes=0, _failures=0, _consecutive_failures=0, _latency=None, _last_error=None,
+                 _last_failure_time=None, _open_until=None):
+        self.successes = _successes
+        self.failures = _failures
+        self.consecutive_failures = _consecutive_failures
+        self.latency = _latency  # EWMA of the fetch duration, seconds
+        self.last_error = _last_error
+        self.last_failure_time = _last_failure_time
+        self.open_until = _open_until  # epoch at which the circuit becomes half-open, None when closed
+        self.probe_started = None  # epoch of the half-open probe in flight (not persisted)
+
+    def state(self, _now):
+        if self.open_until is None:
+            return CLOSED
+        return OPEN if _now < self.open_until else HALF_OPEN
+
+    def to_json(self):
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "latency": self.latency,
+            "last_error": self.last_error,
+            "last_failure_time": self.last_failure_time,
+            "open_until": self.open_until
+        }
+
+    @classmethod
+    def from_json(cls, json_data):
+        return cls(json_data["successes"], json_data["failures"], json_data["consecutive_failures"],
+                   json_data["latency"], json_data["last_error"], json_data["last_failure_time"],
+                   json_data["open_until"])
+
+
+class FeedHealthTracker:
+
+    def __init__(self, _base_backoff=DEFAULT_BASE_BACKOFF, _max_backoff=DEFAULT_MAX_BACKOFF, _path=None,
+                 _alpha=DEFAULT_EWMA_ALPHA):
+        self.base_backoff = _base_backoff
+        self.max_backoff = _max_backoff
+        self.path = _path
+        self.alpha = _alpha
+        self.feeds = {}  # feed url -> FeedHealth
+        if self.path is not None:
+            self.load()
+
+    def health(self, _rss_url):
+        health = self.feeds.get(_rss_url)
+        if health is None:
+            health = self.feeds[_rss_url] = FeedHealth()
+        return health
+
+    def is_available(self, _rss_url, _now=None):
+        """
+        :return: True if the feed can be selected: its circuit is closed, or half-open with no probe in flight
+        """
+        health = self.feeds.get(_rss_url)
+        if health is None or health.open_until is None:
+            return True
+        now = time.time() if _now is None else _now
+        if now < health.open_until:
+            return False
+        return health.probe_started is None or now - health.probe_started > PROBE_TIMEOUT
+
+    def allow(self, _rss_url, _now=None):
+        """
+        To call right before fetching the feed: like is_available, but a half-open feed is marked as being probed
+        :return: True if the feed can be fetched
+        """
+        now = time.time() if _now is None else _now
+        if not self.is_available(_rss_url, now):
+            return False
+        health = self.feeds.get(_rss_url)
+        if health is not None and health.open_until is not None:
+            health.probe_started = now
+        return True
+
+    def available(self, _rss_ids, _now=None):
+        """
+        :return: The RssID of _rss_ids whose feed can be selected
+        """
+        now = time.time() if _now is None else _now
+        return [rss_id for rss_id in _rss_ids if self.is_available(rss_id.rss_url, now)]
+
+    def update_latency(self, _health, _latency):
+        if _latency is not None:
+            _health.latency = _latency if _health.latency is None else \
+                _health.latency + self.alpha * (_latency - _health.latency)
+
+    def record_success(self, _rss_url, _latency=None):
+        health = self.health(_rss_url)
+        health.successes += 1
+        health.consecutive_failures = 0
+        health.open_until = None
+        health.probe_started = None
+        self.update_latency(health, _latency)
+
+    def record_failure(self, _rss_url, _error, _latency=None, _now=None):
+        """
+        Opens the circuit of the feed, for a backoff doubled on every consecutive failure
+        """
+        now = time.time() if _now is None else _now
+        health = self.health(_rss_url)
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.last_error = repr(_error) if isinstance(_error, BaseException) else str(_error)
+        health.last_failure_time = now
+        backoff = min(self.base_backoff * 2 ** min(health.consecutive_failures - 1, 32), self.max_backoff)
+        health.open_until = now + backoff
+        health.probe_started = None
+        self.update_latency(health, _latency)
+
+    def stats(self):
+        """
+        :return: A dict {feed url: health (see FeedHealth.to_json) and "state"}
+        """
+        now = time.time()
+        return {url: dict(health.to_json(), state=health.state(now)) for url, health in self.feeds.items()}
+
+    def summary(self):
+        """
+        :return: The number of tracked feeds in each state, {"closed": n, "open": n, "half_open": n}
+        """
+        now = time.time()
+        counts = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+        for health in self.feeds.values():
+            counts[health.state(now)] += 1
+        return counts
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.feeds = {url: FeedHealth.from_json(health) for url, health in data.items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logging.info(f"[RSS newsfeed] Could not load the feed health from {self.path}: {e}")
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({url: health.to_json() for url, health in self.feeds.items()}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.info(f"[RSS newsfeed] Could not save the feed health to {self.path}: {e}")
+
+
+# module-level tracker used by query()
+_feed_health = FeedHealthTracker()
+
+
+def get_feed_health():
+    return _feed_health
+
+
+def configure_feed_health(_base_backoff=DEFAULT_BASE_BACKOFF, _max_backoff=DEFAULT_MAX_BACKOFF, _path=None):
+    """
+    Updates the module-level tracker, the health of the feeds is reloaded from _path when it changes
+    """
+    global _feed_health
+    if _path != _feed_health.path:
+        _feed_health.save()
+        _feed_health = FeedHealthTracker(_base_backoff, _max_backoff, _path)
+    _feed_health.base_backoff = _base_backoff
+    _feed_health.max_backoff = _max_backoff
+    return _feed_health
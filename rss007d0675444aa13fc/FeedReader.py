@@ -0,0 +1,107 @@
+"""
+The FeedReader Class streams the body of the feed responses by chunks, instead of reading it whole: a broken or
+malicious source serving a multi-megabyte (or endless) body cannot blow up the memory and latency of the collector.
+
+- The body is capped to `max_size` bytes (after decompression, so gzip bombs are capped too). An oversized feed is
+  either truncated (`on_oversize="truncate"`, the entries complete so far are kept) or aborted (`"abort"`, the fetch
+  fails with FeedTooLargeError). A declared Content-Length above the cap is aborted before reading anything.
+- Responses whose Content-Type cannot be a feed (images, audio, video, archives...) are rejected before reading.
+- The chunks can be handed to a consumer as they arrive (the incremental parser, see FastFeedParser), which can stop
+  the download once it has read what it needs. They are joined once at the end, for the fallback parser.
+"""
+from .FastFeedParser import FeedFormatError
+
+DEFAULT_MAX_FEED_SIZE = 4 * 1024 * 1024  # bytes
+READ_CHUNK_SIZE = 65536
+TRUNCATE = "truncate"
+ABORT = "abort"
+
+# Content-Type prefixes that cannot be a feed, anything else is given a chance (feeds are often served as text/html,
+# text/plain or application/octet-stream)
+NON_FEED_CONTENT_TYPES = ("image/", "audio/", "video/", "font/", "application/pdf", "application/zip",
+                          "application/gzip", "application/x-gzip", "application/x-tar", "application/vnd.")
+
+
+class FeedTooLargeError(FeedFormatError):
+    pass
+
+
+class FeedContentTypeError(FeedFormatError):
+    pass
+
+
+class FeedReader:
+
+    def __init__(self, _max_size=DEFAULT_MAX_FEED_SIZE, _on_oversize=TRUNCATE, _chunk_size=READ_CHUNK_SIZE):
+        self.max_size = _max_size
+        self.on_oversize = _on_oversize
+        self.chunk_size = _chunk_size
+
+    def configure(self, _max_size=None, _on_oversize=None):
+        """
+        Updates the limits, None keeps the current value
+        :param _max_size: Maximum size of a feed body in bytes, 0 for no limit
+        :param _on_oversize: "truncate" or "abort"
+        """
+        if _on_oversize is not None and _on_oversize not in (TRUNCATE, ABORT):
+            raise ValueError("Unknown oversize policy: {}".format(_on_oversize))
+        if _max_size is not None:
+            self.max_size = _max_size
+        if _on_oversize is not None:
+            self.on_oversize = _on_oversize
+
+    def check_content_type(self, _content_type):
+        """
+        :raise FeedContentTypeError: if _content_type (the Content-Type header, can be None) cannot be a feed
+        """
+        if _content_type and _content_type.strip().lower().startswith(NON_FEED_CONTENT_TYPES):
+            raise FeedContentTypeError("unexpected content type {}".format(_content_type))
+
+    async def read(self, _response, _consumer=None):
+        """
+        Reads the body of an aiohttp response, up to max_size bytes
+        :param _response: The response, its headers checked (see check_content_type) before reading
+        :param _consumer: Optional callable receiving every chunk, returning True once it does not need the rest of
+        the body. A consumer raising FeedFormatError is dropped and the body is still read whole.
+        :return: A (body, truncated, consumer error or None) tuple
+        :raise FeedTooLargeError: if the body exceeds max_size and on_oversize is "abort"
+        """
+        self.check_content_type(_response.headers.get("Content-Type"))
+        max_size = self.max_size
+        if max_size and self.on_oversize == ABORT and (_response.content_length or 0) > max_size:
+            raise FeedTooLargeError("Content-Length {} above {} bytes".format(_response.content_length, max_size))
+        chunks = []
+        size = 0
+        truncated = False
+        consumer_error = None
+        async for chunk in _response.content.iter_chunked(self.chunk_size):
+            if max_size and size + len(chunk) > max_size:
+                if self.on_oversize == ABORT:
+                    raise FeedTooLargeError("body above {} bytes".format(max_size))
+                chunk = chunk[:max_size - size]
+                truncated = True
+            size += len(chunk)
+            chunks.append(chunk)
+            if _consumer is not None:
+                try:
+                    if _consumer(chunk):
+                        break
+                except FeedFormatError as e:
+                    consumer_error = e
+                    _consumer = None
+            if truncated:
+                break
+        return b"".join(chunks), truncated, consumer_error
+
+
+# module-level reader used by extract_latest_items
+_feed_reader = FeedReader()
+
+
+def get_feed_reader():
+    return _feed_reader
+
+
+def configure_feed_reader(_max_size=None, _on_oversize=None):
+    _feed_reader.configure(_max_size, _on_oversize)
+    return _feed_reader
@@ -0,0 +1,190 @@
+"""
+The FeedRegistry Class caches the curated list of RSS feeds (FeedSources.json) and the RssID objects parsed from it, so
+that query() does not download and parse the whole registry on every call.
+
+- the registry is considered fresh for `ttl` seconds, after which it is refreshed in the background while the cached
+  feeds keep being served,
+- the last successfully downloaded registry is saved to a local snapshot, used on cold starts (instant startup) and
+  when GitHub cannot be reached. It lives in the cache directory of the user, and a snapshot owned by another user or
+  saved from another registry URL is ignored. A snapshot is validated as a downloaded registry is (see
+  validate_registry): the invalid feeds are skipped,
+- the feeds are also indexed by language and by domain.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+
+DEFAULT_REGISTRY_TTL = 3600  # seconds
+# in the cache directory of the user, not in the shared temporary directory where anybody could plant a registry
+_CACHE_DIRECTORY = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+DEFAULT_SNAPSHOT_PATH = os.path.join(_CACHE_DIRECTORY, "rss007d0675444aa13fc", "FeedSources.json")
+REQUIRED_FIELDS = ("Source", "Language", "URL")
+
+
+def is_valid_feed(_item):
+    """
+    :return: True if _item is a feed with a Source, a Description (or null), a Language and an http(s) URL
+    """
+    return isinstance(_item, dict) and "Description" in _item \
+        and all(isinstance(_item.get(field), str) for field in REQUIRED_FIELDS) \
+        and _item["URL"].startswith(("http://", "https://"))
+
+
+def validate_registry(_json_data):
+    """
+    Checks the structure of the registry data before it is parsed, the invalid feeds are skipped and logged
+    :return: The list of the valid feeds of _json_data
+    :raise ValueError: if _json_data is not a list, or has no valid feed
+    """
+    if not isinstance(_json_data, list):
+        raise ValueError("the registry is not a list of feeds")
+    feeds = [item for item in _json_data if is_valid_feed(item)]
+    if not feeds:
+        raise ValueError("the registry has no valid feed")
+    if len(feeds) < len(_json_data):
+        invalid = next(item for item in _json_data if not is_valid_feed(item))
+        logging.info(f"[RSS newsfeed] Skipped {len(_json_data) - len(feeds)} invalid feed(s) of the FeedSources, "
+                     f"such as {invalid!r:.200}")
+    return feeds
+
+
+class FeedRegistry:
+
+    def __init__(self, _url, _fetch_json, _parse, _domain_of, _ttl=DEFAULT_REGISTRY_TTL,
+                 _snapshot_path=DEFAULT_SNAPSHOT_PATH):
+        """
+        :param _url: The URL of the registry (FeedSources.json)
+        :param _fetch_json: Coroutine function downloading a URL and returning its JSON data
+        :param _parse: Function turning the JSON data into a list of RssID
+        :param _domain_of: Function returning the domain of a URL, used to build the domain index
+        :param _ttl: Number of seconds during which the registry is not refreshed
+        :param _snapshot_path: Local file holding the last known good registry, None or "" to disable the snapshot
+        """
+        self.url = _url
+        self.fetch_json = _fetch_json
+        self.parse = _parse
+        self.domain_of = _domain_of
+        self.ttl = _ttl
+        self.snapshot_path = _snapshot_path
+        self.rss_ids = []
+        self.by_language = {}
+        self.by_domain = {}
+        self.loaded_at = None  # time.time() of the registry data currently held
+        self.refresh_task = None
+
+    def configure(self, _url=None, _ttl=None, _snapshot_path=None):
+        """
+        Updates the settings of the registry, the cached feeds are dropped if they came from another source
+        """
+        if _ttl is not None:
+            self.ttl = _ttl
+        url_changed = _url is not None and _url != self.url
+        snapshot_changed = _snapshot_path is not None and _snapshot_path != self.snapshot_path
+        if url_changed or snapshot_changed:
+            self.url = _url if _url is not None else self.url
+            self.snapshot_path = _snapshot_path if _snapshot_path is not None else self.snapshot_path
+            self.clear()
+
+    def clear(self):
+        """
+        Drops the cached feeds, the next get_rss_ids will load them again
+        """
+        self.rss_ids, self.by_language, self.by_domain = [], {}, {}
+        self.loaded_at = None
+
+    def is_stale(self):
+        return self.loaded_at is None or time.time() - self.loaded_at > self.ttl
+
+    def set_data(self, _json_data, _loaded_at=None):
+        """
+        Validates and parses the registry data, and rebuilds the indexes
+        :return: The valid feeds of the registry data
+        :raise ValueError: if the data is not a valid registry, see validate_registry
+        """
+        feeds = validate_registry(_json_data)
+        rss_ids = self.parse(feeds)
+        by_language = {}
+        by_domain = {}
+        for rss_id in rss_ids:
+            by_language.setdefault(rss_id.language, []).append(rss_id)
+            by_domain.setdefault(self.domain_of(rss_id.rss_url), []).append(rss_id)
+        # swap everything at once so that readers never see a half-built registry
+        self.rss_ids, self.by_language, self.by_domain = rss_ids, by_language, by_domain
+        self.loaded_at = _loaded_at if _loaded_at is not None else time.time()
+        return feeds
+
+    async def refresh(self):
+        """
+        Downloads the registry, and saves it as the new snapshot
+        """
+        data = await self.fetch_json(self.url)
+        self.save_snapshot(self.set_data(data))
+
+    def load_snapshot(self):
+        """
+        Loads the local snapshot
+        :return: True if the snapshot could be loaded
+        """
+        if not self.snapshot_path:
+            return False
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                status = os.fstat(f.fileno())
+                if hasattr(os, "getuid") and status.st_uid != os.getuid():
+                    raise PermissionError("the snapshot is owned by another user")
+                snapshot = json.load(f)
+            if not isinstance(snapshot, dict) or snapshot.get("url") != self.url:
+                raise ValueError("the snapshot was not saved from {}".format(self.url))
+            self.set_data(snapshot.get("registry"), status.st_mtime)
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logging.info(f"[RSS newsfeed] Could not load the FeedSources snapshot {self.snapshot_path}: {e}")
+            return False
+
+    def save_snapshot(self, _json_data):
+        if not self.snapshot_path:
+            return
+        tmp_path = "{}.{}.tmp".format(self.snapshot_path, os.getpid())  # processes sharing the snapshot never collide
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), mode=0o700, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"url": self.url, "registry": _json_data}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logging.info(f"[RSS newsfeed] Could not save the FeedSources snapshot {self.snapshot_path}: {e}")
+
+    async def background_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logging.info(f"[RSS newsfeed] Error when refreshing the FeedSource.json, keeping the cached one: {e}")
+
+    def schedule_refresh(self):
+        """
+        Starts a background refresh, unless one is already running on the current loop
+        """
+        loop = asyncio.get_running_loop()
+        if self.refresh_task is None or self.refresh_task.done() or self.refresh_task.get_loop() is not loop:
+            self.refresh_task = loop.create_task(self.background_refresh())
+
+    async def get_rss_ids(self):
+        """
+        Returns the feeds of the registry. The registry is only awaited when nothing is cached nor snapshotted,
+        otherwise a stale registry is refreshed in the background.
+        :return: A list of RssID
+        """
+        if not self.rss_ids and not self.load_snapshot():
+            await self.refresh()  # cold start without snapshot: nothing to serve until the download is done
+        elif self.is_stale():
+            self.schedule_refresh()
+        return self.rss_ids
+
+    def get_feeds_by_language(self, _language):
+        return self.by_language.get(_language, [])
+
+    def get_feeds_by_domain(self, _domain):
+        return self.by_domain.get(_domain, [])
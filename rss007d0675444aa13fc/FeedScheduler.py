@@ -0,0 +1,163 @@
+"""
+The FeedScheduler Class learns, for every feed, how often it publishes and how often fetching it yields fresh items,
+and uses these statistics to pick the feeds to fetch: feeds are sampled in proportion to the number of fresh items
+they are expected to carry, instead of uniformly. With short freshness windows (max_oldness_seconds), most feeds have
+published nothing recently and uniform picks mostly burn fetches and extraction trials.
+
+Statistics kept per feed (learned from the links returned by extract_latest_items):
+- publish_rate: items per second, an EWMA of (number of items in the feed / time since its oldest item),
+- last_item_time: the publish date (epoch) of its newest item,
+- hit_ratio: an EWMA of "the fetch returned at least one fresh item".
+
+The weight of a feed is the mean of its expected number of fresh items (publish_rate * max_age, capped) and its
+hit_ratio. Feeds never fetched get an optimistic weight so that they are explored, and a share `exploration` of the
+weight is spread uniformly so that no feed is starved. The statistics can be persisted to a local JSON file.
+"""
+import json
+import logging
+import math
+import os
+import random
+
+DEFAULT_EXPLORATION = 0.1
+DEFAULT_EWMA_ALPHA = 0.3
+UNKNOWN_FEED_WEIGHT = 1.0  # optimistic, feeds never fetched are tried first
+MAX_EXPECTED_FRESH_ITEMS = 10.0
+MIN_OBSERVATION_SPAN = 60  # seconds
+
+
+class FeedStats:
+
+    def __init__(self, _fetches=0, _publish_rate=0.0, _last_item_time=None, _hit_ratio=0.0):
+        self.fetches = _fetches
+        self.publish_rate = _publish_rate
+        self.last_item_time = _last_item_time
+        self.hit_ratio = _hit_ratio
+
+    def to_json(self):
+        return {
+            "fetches": self.fetches,
+            "publish_rate": self.publish_rate,
+            "last_item_time": self.last_item_time,
+            "hit_ratio": self.hit_ratio
+        }
+
+    @classmethod
+    def from_json(cls, json_data):
+        return cls(json_data["fetches"], json_data["publish_rate"], json_data["last_item_time"],
+                   json_data["hit_ratio"])
+
+
+class FeedScheduler:
+
+    def __init__(self, _exploration=DEFAULT_EXPLORATION, _path=None, _alpha=DEFAULT_EWMA_ALPHA):
+        self.exploration = _exploration
+        self.path = _path
+        self.alpha = _alpha
+        self.stats = {}  # feed url -> FeedStats
+        if self.path is not None:
+            self.load()
+
+    def record_fetch(self, _rss_url, _publish_dates, _fresh_count, _now, _window=None):
+        """
+        Updates the statistics of a feed after a successful fetch
+        :param _rss_url: The URL of the feed
+        :param _publish_dates: The publish dates (epochs) of the items of the feed
+        :param _fresh_count: The number of these items that were fresh enough
+        :param _now: The current time (epoch)
+        :param _window: If the feed was only read over its last _window seconds (early terminated parsing), the span
+        over which _publish_dates were observed
+        """
+        stats = self.stats.get(_rss_url)
+        if stats is None:
+            stats = self.stats[_rss_url] = FeedStats()
+        if _window is not None:
+            rate = len(_publish_dates) / max(_window, MIN_OBSERVATION_SPAN)
+        elif _publish_dates:
+            rate = len(_publish_dates) / max(_now - min(_publish_dates), MIN_OBSERVATION_SPAN)
+        else:
+            rate = 0.0
+        if _publish_dates:
+            newest = max(_publish_dates)
+            stats.last_item_time = newest if stats.last_item_time is None else max(stats.last_item_time, newest)
+        hit = 1.0 if _fresh_count > 0 else 0.0
+        if stats.fetches == 0:
+            stats.publish_rate, stats.hit_ratio = rate, hit
+        else:
+            stats.publish_rate += self.alpha * (rate - stats.publish_rate)
+            stats.hit_ratio += self.alpha * (hit - stats.hit_ratio)
+        stats.fetches += 1
+
+    def weight(self, _rss_url, _max_age):
+        """
+        :return: The expected value of fetching the feed for a freshness window of _max_age seconds
+        """
+        stats = self.stats.get(_rss_url)
+        if stats is None or stats.fetches == 0:
+            return UNKNOWN_FEED_WEIGHT
+        expected_fresh_items = min(stats.publish_rate * _max_age, MAX_EXPECTED_FRESH_ITEMS)
+        return (expected_fresh_items + stats.hit_ratio) / 2
+
+    def weights(self, _rss_ids, _max_age):
+        weights = [self.weight(rss_id.rss_url, _max_age) for rss_id in _rss_ids]
+        total = sum(weights)
+        if total <= 0:
+            return [1.0] * len(_rss_ids)
+        # spread a share of the total weight uniformly so that every feed keeps being explored
+        floor = self.exploration * total / len(_rss_ids)
+        return [(1 - self.exploration) * w + floor for w in weights]
+
+    def choose(self, _rss_ids, _max_age):
+        """
+        Picks one feed, with a probability proportional to its weight
+        """
+        return random.choices(_rss_ids, weights=self.weights(_rss_ids, _max_age))[0]
+
+    def order(self, _rss_ids, _max_age):
+        """
+        Returns all the feeds in a random order where heavier feeds tend to come first (weighted sampling without
+        replacement, Efraimidis-Spirakis)
+        """
+        keys = [math.log(1.0 - random.random()) / max(w, 1e-12) for w in self.weights(_rss_ids, _max_age)]
+        return [rss_id for _, rss_id in sorted(zip(keys, _rss_ids), key=lambda pair: pair[0], reverse=True)]
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.stats = {url: FeedStats.from_json(stats) for url, stats in data.items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logging.info(f"[RSS newsfeed] Could not load the feed statistics from {self.path}: {e}")
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({url: stats.to_json() for url, stats in self.stats.items()}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.info(f"[RSS newsfeed] Could not save the feed statistics to {self.path}: {e}")
+
+
+# module-level scheduler used by query()
+_feed_scheduler = FeedScheduler()
+
+
+def get_feed_scheduler():
+    return _feed_scheduler
+
+
+def configure_feed_scheduler(_exploration=DEFAULT_EXPLORATION, _path=None):
+    """
+    Updates the module-level scheduler, its statistics are reloaded from _path when it changes
+    """
+    global _feed_scheduler
+    if _path != _feed_scheduler.path:
+        _feed_scheduler.save()
+        _feed_scheduler = FeedScheduler(_exploration, _path)
+    _feed_scheduler.exploration = _exploration
+    return _feed_scheduler
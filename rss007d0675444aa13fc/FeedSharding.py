@@ -0,0 +1,51 @@
+"""
+Consistent-hash sharding of the feeds: every feed URL is assigned to one of N shards, so that parallel collectors
+(worker processes, nodes) each fetch their own part of the registry instead of overlapping on the same feeds.
+
+Shards are computed with the jump consistent hash (Lamping & Veach, 2014): feeds are spread evenly, and going from N to
+N+1 shards only moves 1/(N+1) of the feeds (to the new shard), so the statistics, health and validators learned by a
+collector for its feeds stay mostly valid when the pool is resized. No ring nor coordination is needed, any process
+computes the same assignment from the feed URL alone.
+
+See ShardRunner for the multi-process runner.
+"""
+import hashlib
+from functools import lru_cache
+
+DEFAULT_MEMO_SIZE = 65536  # (feed url, number of shards) pairs
+
+
+def jump_hash(_key, _n_buckets):
+    """
+    :param _key: A 64 bits unsigned integer
+    :return: The bucket of _key, in [0, _n_buckets)
+    """
+    bucket, j = -1, 0
+    while j < _n_buckets:
+        bucket = j
+        _key = (_key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((bucket + 1) * ((1 << 31) / ((_key >> 33) + 1)))
+    return bucket
+
+
+@lru_cache(maxsize=DEFAULT_MEMO_SIZE)
+def shard_of(_url, _n_shards):
+    """
+    :return: The shard of the feed _url, in [0, _n_shards)
+    """
+    digest = hashlib.blake2b(_url.strip().encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return jump_hash(int.from_bytes(digest, "little"), _n_shards)
+
+
+def select_shard(_rss_ids, _shard, _n_shards):
+    """
+    :param _rss_ids: The RssID of the registry
+    :param _shard: The shard to keep, in [0, _n_shards)
+    :param _n_shards: The total number of shards, 1 keeps every feed
+    :return: The RssID of _rss_ids whose feed belongs to _shard
+    """
+    if not 0 <= _shard < _n_shards:
+        raise ValueError("Shard {} out of [0, {})".format(_shard, _n_shards))
+    if _n_shards == 1:
+        return _rss_ids
+    return [rss_id for rss_id in _rss_ids if shard_of(rss_id.rss_url, _n_shards) == _shard]
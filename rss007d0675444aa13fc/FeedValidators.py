@@ -0,0 +1,127 @@
+"""
+The FeedValidatorStore Class remembers the cache validators (ETag and Last-Modified headers) returned by every RSS feed,
+so that the next request to the same feed can be made conditional (If-None-Match / If-Modified-Since). A feed that did
+not change since the last poll then answers 304 Not Modified with an empty body, and its parsing is skipped entirely.
+The entries parsed from the last 200 of the feed are kept along with its validators and served again on a 304: a query
+may have used only some of its fresh entries, the next ones must still find the others.
+
+The validators are kept in memory and can optionally be persisted to a local JSON file so that they survive restarts.
+The parsed entries are kept in memory only, a 304 to validators loaded from the file gives no entry.
+"""
+import json
+import logging
+import os
+
+
+class FeedValidatorStore:
+
+    def __init__(self, _path=None):
+        self.path = _path
+        self.validators = {}  # feed url -> {"etag": ..., "last_modified": ...}
+        self.links = {}  # feed url -> the list of Link parsed from its last 200, for the feeds with validators
+        self.dirty = False
+        if self.path is not None:
+            self.load()
+
+    def get_request_headers(self, _url):
+        """
+        Returns the conditional request headers to send to the feed
+        :param _url: The URL of the feed
+        :return: A dict with If-None-Match and/or If-Modified-Since, empty if the feed was never seen
+        """
+        headers = {}
+        validators = self.validators.get(_url)
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def get_last_modified(self, _url):
+        validators = self.validators.get(_url)
+        return validators.get("last_modified") if validators else None
+
+    def get_links(self, _url):
+        """
+        :return: The list of Link parsed from the last 200 of the feed, to serve again on a 304, empty if unknown
+        """
+        return self.links.get(_url, [])
+
+    def update(self, _url, _response_headers, _links=None):
+        """
+        Stores the validators of a (200) response
+        :param _url: The URL of the feed
+        :param _response_headers: The headers of the response
+        :param _links: The list of Link parsed from the response
+        """
+        etag = _response_headers.get("ETag")
+        last_modified = _response_headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            self.links.pop(_url, None)
+            if self.validators.pop(_url, None) is not None:
+                self.dirty = True
+            return
+        self.links[_url] = list(_links) if _links is not None else []
+        validators = {"etag": etag, "last_modified": last_modified}
+        if self.validators.get(_url) != validators:
+            self.validators[_url] = validators
+            self.dirty = True
+
+    def clear(self):
+        """
+        Forgets the validators and the parsed entries of every feed
+        """
+        self.validators.clear()
+        self.links.clear()
+        self.dirty = True
+
+    def load(self):
+        """
+        Loads the validators persisted in self.path, a missing or corrupted file is ignored
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.validators = data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.info(f"[RSS newsfeed] Could not load the feed validators from {self.path}: {e}")
+        self.dirty = False
+
+    def save(self):
+        """
+        Persists the validators to self.path (if any) when they changed since the last save
+        """
+        if self.path is None or not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.validators, f)
+            os.replace(tmp_path, self.path)  # atomic, a concurrent reader never sees a partial file
+            self.dirty = False
+        except OSError as e:
+            logging.info(f"[RSS newsfeed] Could not save the feed validators to {self.path}: {e}")
+
+
+# module-level store used by extract_latest_items
+_validator_store = FeedValidatorStore()
+
+
+def get_validator_store():
+    return _validator_store
+
+
+def configure_validator_store(_path):
+    """
+    Makes the module-level store persist its validators to _path (loading the ones already saved there)
+    :param _path: A local file path, or None to keep the validators in memory only
+    """
+    global _validator_store
+    if _path != _validator_store.path:
+        _validator_store.save()
+        _validator_store = FeedValidatorStore(_path)
+    return _validator_store
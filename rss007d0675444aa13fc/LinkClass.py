@@ -1,13 +1,18 @@
 """
 The Link Class defines all the underlying links' parameters within an RSS feed. This is used with RssID Class within the
 Rss Class to fully define articles within an existing RSS feed.
+Feeds can hold hundreds of links, so the class is slotted (no per-instance __dict__) and the publish date is kept as a
+UTC epoch (int).
 """
 
 
 class Link:
 
-    def __init__(self, _title, _link, _publish_date=None, _description=None):
+    __slots__ = ("title", "link", "publish_date", "description", "content")
+
+    def __init__(self, _title, _link, _publish_date=None, _description=None, _content=None):
         self.title = _title
         self.link = _link
         self.publish_date = _publish_date
         self.description = _description
+        self.content = _content  # full content embedded in the feed entry (HTML), if any
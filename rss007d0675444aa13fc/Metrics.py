@@ -0,0 +1,188 @@
+"""
+Instrumentation of the collector: counters and per-stage latency histograms, to find where a slow query() spends its
+time. Disabled by default; when disabled, every call returns right after checking `enabled`.
+
+Stages timed (seconds):
+- registry: loading FeedSources.json (see FeedRegistry),
+- feed_download, feed_parse, date_normalization: reading a feed in extract_latest_items (with feed_parser="lxml", the
+  chunks are parsed as they arrive: feed_download includes their parsing),
+- article_download, article_parse: extracting the content of an article,
+- sanitization: cleaning the content of an article in build_item.
+
+Counters: feeds_fetched, feeds_not_modified, feed_errors, feeds_oversized (truncated or aborted, see FeedReader),
+feeds_wrong_content_type, bytes_downloaded, entries_parsed, entries_too_old, articles_selected, content_cache_hits,
+content_cache_misses (see ContentCache), embedded_contents (articles whose content came with the feed, not downloaded),
+extraction_failures, articles_too_short (content below min_post_length),
+items_yielded, deadline_stops (stages stopped by the deadline of query(), see Deadline).
+
+The data is exposed by snapshot() (a plain dict), to_prometheus() (Prometheus text exposition format) and an optional
+hook, a callable receiving every event as (kind, name, value) with kind "counter" or "timing".
+"""
+import bisect
+import contextlib
+import logging
+import time
+
+# upper bounds (seconds) of the histogram buckets, the last bucket is +Inf
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNTERS = ("feeds_fetched", "feeds_not_modified", "feed_errors", "feeds_oversized", "feeds_wrong_content_type",
+            "bytes_downloaded", "entries_parsed", "entries_too_old", "articles_selected", "content_cache_hits",
+            "content_cache_misses", "embedded_contents", "extraction_failures", "articles_too_short", "items_yielded",
+            "deadline_stops")
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class Histogram:
+
+    def __init__(self, _buckets=DEFAULT_BUCKETS):
+        self.buckets = _buckets
+        self.counts = [0] * (len(_buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, _value):
+        self.counts[bisect.bisect_left(self.buckets, _value)] += 1
+        self.count += 1
+        self.sum += _value
+        if _value > self.max:
+            self.max = _value
+
+    def quantile(self, _q):
+        """
+        :return: The upper bound of the bucket holding the _q quantile (the max for the +Inf bucket), None if empty
+        """
+        if self.count == 0:
+            return None
+        rank = _q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_json(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts))
+        }
+
+
+class _Timer:
+
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, _metrics, _stage):
+        self.metrics = _metrics
+        self.stage = _stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class CollectorMetrics:
+
+    def __init__(self, _enabled=False, _hook=None, _buckets=DEFAULT_BUCKETS):
+        self.enabled = _enabled
+        self.hook = _hook
+        self.buckets = _buckets
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.stages = {}  # stage name -> Histogram
+
+    def increment(self, _name, _value=1):
+        if not self.enabled:
+            return
+        self.counters[_name] = self.counters.get(_name, 0) + _value
+        if self.hook is not None:
+            self.call_hook("counter", _name, _value)
+
+    def observe(self, _stage, _seconds):
+        if not self.enabled:
+            return
+        histogram = self.stages.get(_stage)
+        if histogram is None:
+            histogram = self.stages[_stage] = Histogram(self.buckets)
+        histogram.observe(_seconds)
+        if self.hook is not None:
+            self.call_hook("timing", _stage, _seconds)
+
+    def timer(self, _stage):
+        """
+        :return: A context manager timing its block as _stage (a shared no-op one when disabled)
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, _stage)
+
+    def call_hook(self, _kind, _name, _value):
+        try:
+            self.hook(_kind, _name, _value)
+        except Exception as e:  # a broken hook must not break the collection
+            logging.info(f"[RSS newsfeed] Metrics hook failed: {e!r}")
+
+    def reset(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.stages = {}
+
+    def snapshot(self):
+        """
+        :return: A dict {"counters": {name: value}, "stages": {stage: histogram summary}} of the values so far
+        """
+        return {
+            "counters": dict(self.counters),
+            "stages": {stage: histogram.to_json() for stage, histogram in self.stages.items()}
+        }
+
+    def to_prometheus(self, _prefix="rss_collector"):
+        """
+        :return: The counters and histograms in the Prometheus text exposition format
+        """
+        lines = []
+        for name, value in self.counters.items():
+            lines.append("# TYPE {}_{}_total counter".format(_prefix, name))
+            lines.append("{}_{}_total {}".format(_prefix, name, value))
+        if self.stages:
+            metric = "{}_stage_duration_seconds".format(_prefix)
+            lines.append("# TYPE {} histogram".format(metric))
+            for stage, histogram in self.stages.items():
+                cumulative = 0
+                for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append('{}_bucket{{stage="{}",le="{}"}} {}'.format(metric, stage, bound, cumulative))
+                lines.append('{}_sum{{stage="{}"}} {}'.format(metric, stage, histogram.sum))
+                lines.append('{}_count{{stage="{}"}} {}'.format(metric, stage, histogram.count))
+        return "\n".join(lines) + "\n"
+
+
+# module-level metrics used by the collector
+_metrics = CollectorMetrics()
+
+
+def get_metrics():
+    return _metrics
+
+
+def configure_metrics(_enabled=None, _hook=None):
+    """
+    Updates the module-level metrics, the values recorded so far are kept
+    :param _enabled: True to record, False to stop recording, None keeps the current setting
+    :param _hook: Optional callable receiving every event as (kind, name, value), None keeps the current hook
+    :return: The module-level metrics
+    """
+    if _enabled is not None:
+        _metrics.enabled = _enabled
+    if _hook is not None:
+        _metrics.hook = _hook
+    return _metrics
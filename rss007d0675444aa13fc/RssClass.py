@@ -5,6 +5,9 @@ The RSS Class defines all the parameters associated to an Rss Feed for future in
 
 class RSS:
 
+    __slots__ = ("rss_id", "link_array", "not_modified")
+
     def __init__(self, _rss_id):
         self.rss_id = _rss_id
         self.link_array = []
+        self.not_modified = False  # True on a 304, link_array holds the entries of the last poll then
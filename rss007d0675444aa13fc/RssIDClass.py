@@ -1,17 +1,26 @@
 import json
+import sys
 
 """
 The DocId class is used to describe an RSS Feed. This structure is a temporary class used to create
 Article classes.
+The source, description and language strings are interned: they repeat across the feeds of the registry and are copied
+into every Article.
 """
 
 
+def _intern(_value):
+    return sys.intern(_value) if type(_value) is str else _value
+
+
 class RssID:
 
+    __slots__ = ("source", "description", "language", "rss_url", "last_build_date")
+
     def __init__(self, _source, _description, _language, _rss_url, _last_build_date=None):
-        self.source = _source
-        self.description = _description
-        self.language = _language
+        self.source = _intern(_source)
+        self.description = _intern(_description)
+        self.language = _intern(_language)
         self.rss_url = _rss_url
         self.last_build_date = _last_build_date
 
@@ -26,8 +35,8 @@ class RssID:
 
     @classmethod
     def from_json(cls, json_data):
-        return cls(json_data["Source"], json_data["Category"], json_data["Language"], json_data["URL"],
-                   json_data["Las Build Date"])
+        return cls(json_data["Source"], json_data["Description"], json_data["Language"], json_data["URL"],
+                   json_data.get("Last Build Date"))
 
 
 # Define a custom JSONEncoder subclass
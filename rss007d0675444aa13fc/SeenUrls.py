@@ -0,0 +1,201 @@
+"""
+Deduplication of the article URLs across query() calls: an article already collected by a previous query is dropped
+before its content is extracted, which is the most expensive step of the collector. A URL is only added once its item
+is yielded, the articles whose extraction failed are selected again by the next query.
+
+Two stores are available, both with O(1) lookups:
+- SeenUrlStore (default): the exact URLs, evicted in LRU order above `capacity` entries and after `ttl` seconds,
+- BloomSeenUrlStore: two generations of Bloom filters sized for `capacity` URLs each, for a fixed memory budget at the
+  cost of rare false positives (an unseen article is skipped). The oldest generation is dropped when the current one
+  is full.
+
+Both can be persisted to a local file so that restarting the collector does not re-collect the same articles.
+"""
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+
+DEFAULT_SEEN_URLS_CAPACITY = 100000
+DEFAULT_SEEN_URLS_TTL = 48 * 3600  # seconds, older articles are filtered by their age anyway
+DEFAULT_BLOOM_ERROR_RATE = 0.001
+
+
+def _write_json_atomically(_path, _data):
+    tmp_path = _path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_data, f)
+        os.replace(tmp_path, _path)
+    except OSError as e:
+        logging.info(f"[RSS newsfeed] Could not save the seen urls to {_path}: {e}")
+
+
+def _read_json(_path):
+    try:
+        with open(_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.info(f"[RSS newsfeed] Could not load the seen urls from {_path}: {e}")
+        return None
+
+
+class SeenUrlStore:
+
+    def __init__(self, _capacity=DEFAULT_SEEN_URLS_CAPACITY, _ttl=DEFAULT_SEEN_URLS_TTL, _path=None):
+        self.capacity = _capacity
+        self.ttl = _ttl
+        self.path = _path
+        self.urls = OrderedDict()  # url -> time it was seen, oldest first
+        if self.path is not None:
+            self.load()
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __contains__(self, _url):
+        seen_at = self.urls.get(_url)
+        if seen_at is None:
+            return False
+        if time.time() - seen_at > self.ttl:
+            del self.urls[_url]
+            return False
+        return True
+
+    def add(self, _url):
+        self.urls[_url] = time.time()
+        self.urls.move_to_end(_url)
+        self.evict()
+
+    def clear(self):
+        self.urls.clear()
+
+    def evict(self):
+        while len(self.urls) > self.capacity:
+            self.urls.popitem(last=False)
+        expiry = time.time() - self.ttl
+        while self.urls:
+            url, seen_at = next(iter(self.urls.items()))
+            if seen_at >= expiry:
+                break
+            del self.urls[url]
+
+    def load(self):
+        data = _read_json(self.path)
+        if isinstance(data, list):
+            self.urls = OrderedDict((url, seen_at) for url, seen_at in data)
+            self.evict()
+
+    def save(self):
+        if self.path is not None:
+            _write_json_atomically(self.path, list(self.urls.items()))
+
+
+class BloomFilter:
+
+    def __init__(self, _capacity, _error_rate=DEFAULT_BLOOM_ERROR_RATE):
+        self.capacity = _capacity
+        self.n_bits = max(8, int(-_capacity * math.log(_error_rate) / math.log(2) ** 2))
+        self.n_hashes = max(1, round(self.n_bits / _capacity * math.log(2)))
+        self.bits = bytearray((self.n_bits + 7) // 8)
+        self.count = 0
+
+    def positions(self, _key):
+        # double hashing (Kirsch-Mitzenmacher) from a single digest
+        digest = hashlib.blake2b(_key.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def __contains__(self, _key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self.positions(_key))
+
+    def add(self, _key):
+        for p in self.positions(_key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def to_json(self):
+        return {"count": self.count, "bits": base64.b64encode(bytes(self.bits)).decode("ascii")}
+
+    def load_json(self, _data):
+        bits = base64.b64decode(_data["bits"])
+        if len(bits) == len(self.bits):  # ignore filters saved with another capacity
+            self.bits = bytearray(bits)
+            self.count = _data["count"]
+
+
+class BloomSeenUrlStore:
+
+    def __init__(self, _capacity=DEFAULT_SEEN_URLS_CAPACITY, _error_rate=DEFAULT_BLOOM_ERROR_RATE, _path=None):
+        self.capacity = _capacity
+        self.error_rate = _error_rate
+        self.path = _path
+        self.current = BloomFilter(_capacity, _error_rate)
+        self.previous = BloomFilter(_capacity, _error_rate)
+        if self.path is not None:
+            self.load()
+
+    def __len__(self):
+        return self.current.count + self.previous.count
+
+    def __contains__(self, _url):
+        return _url in self.current or _url in self.previous
+
+    def add(self, _url):
+        if self.current.count >= self.capacity:
+            self.previous, self.current = self.current, BloomFilter(self.capacity, self.error_rate)
+        self.current.add(_url)
+
+    def clear(self):
+        self.current = BloomFilter(self.capacity, self.error_rate)
+        self.previous = BloomFilter(self.capacity, self.error_rate)
+
+    def load(self):
+        data = _read_json(self.path)
+        if isinstance(data, dict) and "current" in data and "previous" in data:
+            self.current.load_json(data["current"])
+            self.previous.load_json(data["previous"])
+
+    def save(self):
+        if self.path is not None:
+            _write_json_atomically(self.path, {"current": self.current.to_json(), "previous": self.previous.to_json()})
+
+
+# module-level store used by find_random_articles_with_max_age
+_seen_urls = SeenUrlStore()
+_seen_urls_settings = ("lru", DEFAULT_SEEN_URLS_CAPACITY, DEFAULT_SEEN_URLS_TTL, None)
+
+
+def get_seen_urls():
+    return _seen_urls
+
+
+def configure_seen_urls(_kind="lru", _capacity=DEFAULT_SEEN_URLS_CAPACITY, _ttl=DEFAULT_SEEN_URLS_TTL, _path=None):
+    """
+    Replaces the module-level store if its settings changed (the URLs of the previous store are then forgotten, unless
+    they were persisted to _path)
+    :param _kind: "lru" for SeenUrlStore or "bloom" for BloomSeenUrlStore
+    :param _capacity: The maximum number of URLs remembered (per generation for "bloom")
+    :param _ttl: The number of seconds a URL is remembered ("lru" only)
+    :param _path: A local file persisting the store, None to keep it in memory only
+    :return: The module-level store
+    """
+    global _seen_urls, _seen_urls_settings
+    settings = (_kind, _capacity, _ttl, _path)
+    if settings != _seen_urls_settings:
+        _seen_urls.save()
+        if _kind == "bloom":
+            _seen_urls = BloomSeenUrlStore(_capacity, _path=_path)
+        elif _kind == "lru":
+            _seen_urls = SeenUrlStore(_capacity, _ttl, _path)
+        else:
+            raise ValueError("Unknown seen urls store: {}".format(_kind))
+        _seen_urls_settings = settings
+    return _seen_urls
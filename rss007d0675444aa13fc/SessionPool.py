@@ -0,0 +1,91 @@
+"""
+The SessionPool Class holds the aiohttp session shared by every HTTP request of the collector (feed registry, RSS feeds
+and later on articles). Reusing a single session across query() calls keeps the TCP/TLS connections alive, the DNS
+cache warm and lets many feeds hosted on the same server share their connections.
+
+The session is bound to the event loop that created it: when query() is driven by a new event loop (e.g. a new
+asyncio.run call), a fresh session is transparently opened. close_session() should be awaited on shutdown.
+"""
+import asyncio
+
+DEFAULT_CONNECTION_LIMIT = 100  # maximum number of simultaneous connections
+DEFAULT_CONNECTION_LIMIT_PER_HOST = 8  # maximum number of simultaneous connections to the same host
+DEFAULT_DNS_CACHE_TTL = 300  # seconds
+DEFAULT_KEEPALIVE_TIMEOUT = 30  # seconds an idle connection is kept open
+
+
+class SessionPool:
+
+    def __init__(self, _limit=DEFAULT_CONNECTION_LIMIT, _limit_per_host=DEFAULT_CONNECTION_LIMIT_PER_HOST,
+                 _dns_cache_ttl=DEFAULT_DNS_CACHE_TTL, _keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT):
+        self.limit = _limit
+        self.limit_per_host = _limit_per_host
+        self.dns_cache_ttl = _dns_cache_ttl
+        self.keepalive_timeout = _keepalive_timeout
+        self.session = None
+        self.loop = None
+
+    def settings(self):
+        return self.limit, self.limit_per_host, self.dns_cache_ttl, self.keepalive_timeout
+
+    async def configure(self, _limit=None, _limit_per_host=None, _dns_cache_ttl=None, _keepalive_timeout=None):
+        """
+        Updates the connector settings. The current session is closed only if a setting actually changed, the next
+        call to get_session will then open a session with the new settings.
+        """
+        previous_settings = self.settings()
+        if _limit is not None:
+            self.limit = _limit
+        if _limit_per_host is not None:
+            self.limit_per_host = _limit_per_host
+        if _dns_cache_ttl is not None:
+            self.dns_cache_ttl = _dns_cache_ttl
+        if _keepalive_timeout is not None:
+            self.keepalive_timeout = _keepalive_timeout
+        if self.settings() != previous_settings:
+            await self.close()
+
+    def get_session(self):
+        """
+        Returns the shared session, opening it on first use or when the running event loop changed.
+        Must be called from a coroutine.
+        """
+        import aiohttp  # imported on first use, it is heavy to import
+
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self.loop is not loop:
+            # a session opened on another (now finished) loop cannot be reused nor awaited for closing
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ttl_dns_cache=self.dns_cache_ttl,
+                                             keepalive_timeout=self.keepalive_timeout)
+            self.session = aiohttp.ClientSession(connector=connector)
+            self.loop = loop
+        return self.session
+
+    async def close(self):
+        """
+        Closes the shared session, if it was opened on the running loop.
+        """
+        if self.session is not None and not self.session.closed and self.loop is asyncio.get_running_loop():
+            await self.session.close()
+        self.session = None
+        self.loop = None
+
+
+# module-level pool used by the collector
+_session_pool = SessionPool()
+
+
+def get_session():
+    return _session_pool.get_session()
+
+
+async def configure_session(_limit=None, _limit_per_host=None, _dns_cache_ttl=None, _keepalive_timeout=None):
+    await _session_pool.configure(_limit, _limit_per_host, _dns_cache_ttl, _keepalive_timeout)
+
+
+async def close_session():
+    """
+    Shutdown hook: closes the shared session and its connections.
+    """
+    await _session_pool.close()
@@ -0,0 +1,178 @@
+"""
+The ShardRunner Class runs one collector per shard of the feeds (see FeedSharding), each in its own worker process,
+and merges the items they collect into a single async iterator. Collection then scales with the number of cores
+without two workers fetching the same feed.
+
+- The workers are spawned once and serve every query() of the runner, keeping their warm state (HTTP session, feed
+  statistics, caches...) between queries. A worker that died is respawned on the next query.
+- maximum_items_to_collect is split between the shards of the runner. The merged stream stops once it is reached or
+  every worker finished, the workers are then told to stop their current query.
+- Multi-node deployments give every node the same total number of shards and a disjoint subset of them to run.
+
+The state local to a process (seen URLs, per-domain limits, feed health) is per worker. So is the persisted state: every
+`*_path` setting, defaults included, is given a file per shard (see shard_parameters), except for the content cache
+whose SQLite file can be shared (see ContentCache).
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import queue
+
+POLL_INTERVAL = 0.5  # seconds between two checks that the workers are still alive
+STOP_TIMEOUT = 10  # seconds a worker is given to exit before it is terminated
+_NO_QUERY = 0
+SHARED_PATHS = ("content_cache_path",)  # files the workers can safely write at the same time
+
+
+def shard_path(_path, _shard):
+    """
+    :return: The file of _shard derived from _path, e.g. "stats.json" -> "stats.shard3.json"
+    """
+    root, extension = os.path.splitext(_path)
+    return "{}.shard{}{}".format(root, _shard, extension)
+
+
+def shard_parameters(_parameters, _shard, _n_shards):
+    """
+    The parameters of the query run by a shard: the files persisting state get a per-shard name (see shard_path), so
+    that two workers never write the same file
+    :param _parameters: The parameters given to ShardRunner.query
+    :return: A new parameters dict
+    """
+    from . import read_advanced_parameters
+
+    parameters = dict(_parameters or {}, shard=_shard, shard_count=_n_shards)
+    for key, path in read_advanced_parameters(_parameters).items():
+        if key.endswith("_path") and key not in SHARED_PATHS and path:
+            parameters[key] = shard_path(path, _shard)
+    return parameters
+
+
+def _run_worker(_shard, _commands, _results, _current_query):
+    """
+    Worker process: runs the queries received on _commands on its shard, and puts every item on _results as
+    (query id, shard, item), then (query id, shard, None) once the query is over
+    """
+    from . import query, close_session, shutdown_parser_executors
+
+    async def serve():
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                command = await loop.run_in_executor(None, _commands.get)
+                if command is None:
+                    return
+                query_id, parameters = command
+                items = query(parameters)  # see shard_parameters
+                try:
+                    async for item in items:
+                        if _current_query.value != query_id:  # the consumer has stopped reading
+                            break
+                        _results.put((query_id, _shard, item))
+                except Exception as e:
+                    logging.exception(f"[RSS newsfeed] Shard {_shard} failed: {e}")
+                finally:
+                    await items.aclose()
+                    _results.put((query_id, _shard, None))
+        finally:
+            await close_session()
+            shutdown_parser_executors()
+
+    asyncio.run(serve())
+
+
+class ShardRunner:
+
+    def __init__(self, _n_shards=None, _shards=None):
+        """
+        :param _n_shards: The total number of shards (across every node), defaults to the number of CPUs
+        :param _shards: The shards run by this runner, one worker process each, defaults to all of them
+        """
+        self.n_shards = _n_shards if _n_shards is not None else os.cpu_count() or 1
+        self.shards = list(_shards) if _shards is not None else list(range(self.n_shards))
+        if not self.shards or any(not 0 <= shard < self.n_shards for shard in self.shards):
+            raise ValueError("Shards {} out of [0, {})".format(self.shards, self.n_shards))
+        # spawned, not forked: a fork would copy the event loop, the HTTP session and the executors of the parent
+        self.context = multiprocessing.get_context("spawn")
+        self.results = self.context.Queue()
+        self.current_query = self.context.Value("q", _NO_QUERY)
+        self.workers = {}  # shard -> (process, commands queue)
+        self.query_id = _NO_QUERY
+
+    def start(self):
+        """
+        Starts the worker processes that are not running
+        """
+        for shard in self.shards:
+            worker = self.workers.get(shard)
+            if worker is not None and worker[0].is_alive():
+                continue
+            commands = self.context.Queue()
+            process = self.context.Process(target=_run_worker, name="rss-shard-{}".format(shard), daemon=True,
+                                           args=(shard, commands, self.results, self.current_query))
+            process.start()
+            self.workers[shard] = (process, commands)
+
+    async def query(self, parameters):
+        """
+        Runs query(parameters) on every shard of the runner
+        :return: An async iterator over the merged items
+        """
+        from . import read_parameters
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        maximum_items_to_collect = read_parameters(parameters)[1]
+        parameters = dict(parameters or {},
+                          maximum_items_to_collect=math.ceil(maximum_items_to_collect / len(self.shards)))
+        self.query_id += 1
+        self.current_query.value = self.query_id
+        for shard, (process, commands) in self.workers.items():
+            commands.put((self.query_id, shard_parameters(parameters, shard, self.n_shards)))
+        running = set(self.shards)
+        n_items = 0
+        try:
+            while running and n_items < maximum_items_to_collect:
+                try:
+                    query_id, shard, item = await loop.run_in_executor(None, self.results.get, True, POLL_INTERVAL)
+                except queue.Empty:
+                    running = {shard for shard in running if self.workers[shard][0].is_alive()}
+                    continue
+                if query_id != self.query_id:
+                    continue  # late item of a previous query
+                if item is None:
+                    running.discard(shard)
+                    continue
+                n_items += 1
+                yield item
+        finally:
+            self.current_query.value = _NO_QUERY
+
+    async def close(self):
+        """
+        Stops the worker processes
+        """
+        loop = asyncio.get_running_loop()
+        for process, commands in self.workers.values():
+            if process.is_alive():
+                commands.put(None)
+        for process, commands in self.workers.values():
+            await loop.run_in_executor(None, process.join, STOP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        self.workers = {}
+
+
+async def query_sharded(parameters, _n_shards=None, _shards=None):
+    """
+    One-off sharded query: starts a ShardRunner, merges the items of its shards and stops it.
+    Long-running collectors should keep a ShardRunner instead, to reuse its workers.
+    """
+    runner = ShardRunner(_n_shards, _shards)
+    try:
+        async for item in runner.query(parameters):
+            yield item
+    finally:
+        await runner.close()
@@ -1,17 +1,63 @@
 import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from typing import AsyncGenerator
 import logging
-import aiohttp
 import json
 import random
-import feedparser
-import tldextract
+import time
 import re
-import pytz
-from dateutil import parser
 from io import BytesIO
-from newspaper import Article as Newspaper
+from .ArticleClass import Article
+from .LinkClass import Link
+from .RssClass import RSS
+from .RssIDClass import RssID, RssEncoder
+from .SessionPool import get_session, configure_session, close_session
+from .FeedValidators import get_validator_store, configure_validator_store
+from .FeedRegistry import FeedRegistry, DEFAULT_REGISTRY_TTL, DEFAULT_SNAPSHOT_PATH
+from .FastFeedParser import IncrementalFeedParser, FeedFormatError
+from .ContentCache import (
+    get_content_cache,
+    configure_content_cache,
+    DEFAULT_CONTENT_CACHE_CAPACITY,
+    DEFAULT_CONTENT_CACHE_TTL
+)
+from .FeedReader import FeedTooLargeError, FeedContentTypeError, get_feed_reader, configure_feed_reader
+from .FeedSharding import select_shard
+from .ShardRunner import ShardRunner, query_sharded
+from .FeedScheduler import get_feed_scheduler, configure_feed_scheduler, DEFAULT_EXPLORATION
+from .FeedHealth import (
+    configure_feed_health,
+    DEFAULT_BASE_BACKOFF,
+    DEFAULT_MAX_BACKOFF
+)
+from .Deadline import Deadline
+from .Metrics import get_metrics, configure_metrics
+from .ContentSanitizer import sanitize_content, is_long_enough
+from .ContentExtractor import (
+    AUTO,
+    DEFAULT_EXTRACTION_ENGINE,
+    extract_text,
+    check_extraction_engine,
+    html_to_text
+)
+from .DomainLimiter import DomainLimiter, interleave_by_domain
+from .DomainResolver import get_domain_resolver
+from .SeenUrls import (
+    SeenUrlStore,
+    get_seen_urls,
+    configure_seen_urls,
+    DEFAULT_SEEN_URLS_CAPACITY,
+    DEFAULT_SEEN_URLS_TTL
+)
+from .DateNormalizer import (
+    parse_date_to_epoch,
+    to_epoch,
+    epoch_to_standard,
+    epoch_to_iso8601_utc,
+    cap_epoch_to_now
+)
 from exorde_data import (
     Item,
     Content,
@@ -22,6 +68,35 @@ from exorde_data import (
     Domain
 )
 
+__all__ = [
+    "query",
+    "Article",
+    "Link",
+    "RSS",
+    "RssID",
+    "RssEncoder",
+    "SeenUrlStore",
+    "ShardRunner",
+    "query_sharded",
+    "build_item",
+    "extract_latest_items",
+    "extract_content",
+    "extract_article_content",
+    "stream_random_content",
+    "find_random_articles_with_max_age",
+    "parse_reference_json_data",
+    "extract_domain_name",
+    "close_session",
+    "shutdown_parser_executors",
+    "get_feed_registry",
+    "get_feed_scheduler",
+    "get_validator_store",
+    "get_content_cache",
+    "get_seen_urls",
+    "get_metrics",
+    "configure_metrics"
+]
+
 USER_AGENT_LIST = [
     'Mozilla/5.0 (iPad; CPU OS 12_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148',
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36',
@@ -32,83 +107,6 @@ USER_AGENT_LIST = [
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Safari/605.1.15',
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 13_1) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.1 Safari/605.1.15'
 ]
-################################################################################################################.
-
-"""
-The Article Class is used to fully describe an article so it can be passed as a standalone element. This is used
-when extracting content from an article for example. Essentially, it combines the RSS ID class and the Link class together.
-"""
-class Article:
-
-    def __init__(self, _rss_source, _rss_description, _rss_language, _article_title, _article_url,
-                 _article_publish_date, _article_description):
-
-        self.rss_source = _rss_source
-        self.rss_description = _rss_description
-        self.language = _rss_language
-        self.title = _article_title
-        self.url = _article_url
-        self.publish_date = _article_publish_date
-        self.description = _article_description
-        self.content = None
-
-    def update_content(self, _content):
-        self.content = _content
-
-"""
-The Link Class defines all the underlying links' parameters within an RSS feed. This is used with RssID Class within the
-Rss Class to fully define articles within an existing RSS feed.
-"""
-class Link:
-    def __init__(self, _title, _link, _publish_date=None, _description=None):
-        self.title = _title
-        self.link = _link
-        self.publish_date = _publish_date
-        self.description = _description
-
-"""
-The RSS Class defines all the parameters associated to an Rss Feed for future integration.
-"""
-class RSS:
-    def __init__(self, _rss_id):
-        self.rss_id = _rss_id
-        self.link_array = []
-
-"""
-The DocId class is used to describe an RSS Feed. This structure is a temporary class used to create
-Article classes.
-"""
-class RssID:
-
-    def __init__(self, _source, _description, _language, _rss_url, _last_build_date=None):
-        self.source = _source
-        self.description = _description
-        self.language = _language
-        self.rss_url = _rss_url
-        self.last_build_date = _last_build_date
-
-    def to_json(self):
-        return {
-            "Source": self.source,
-            "Description": self.description,
-            "Language": self.language,
-            "URL": self.rss_url,
-            "Last Build Date": self.last_build_date
-        }
-
-    @classmethod
-    def from_json(cls, json_data):
-        return cls(json_data["Source"], json_data["Category"], json_data["Language"], json_data["URL"],
-                   json_data["Las Build Date"])
-
-
-# Define a custom JSONEncoder subclass
-class RssEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, RssID):
-            return obj.to_json()
-        return super().default(obj)
-
 ################################################################################################################
 
 def convert_to_standard_timezone(_date):
@@ -117,9 +115,7 @@ def convert_to_standard_timezone(_date):
     :param _date: Unparsed date that we need to convert to standard timezone format
     :return: Standardized date format
     """
-    dt = parser.parse(_date)  # parse date so we can exploit its data (can't use fuzzy param here to avoid false negatives)
-    dt = dt.astimezone(pytz.timezone('UTC'))  # convert to UTC timezone
-    return dt.strftime("%Y-%m-%d %H:%M:%S")
+    return epoch_to_standard(parse_date_to_epoch(_date))
 
 
 def parse_reference_json_data(_json_file_data):
@@ -146,51 +142,142 @@ def parse_reference_json_data(_json_file_data):
     return all_feeds
 
 
-async def extract_latest_items(_rss,
-                         _start_date=convert_to_standard_timezone("Wednesday, 01 Jan 1000 00:00:01 +0000"),
-                         _end_date=convert_to_standard_timezone("Friday, 01 Jan 2100 00:00:01 +0000")):
+async def extract_latest_items(_rss, _start_date=None, _end_date=None, _parser="feedparser"):
     """
     Extracts the latest items from the RSS feed within the time window specified
     :param _rss: the Rss feed from which we will be extracting the latest articles
-    :param _start_date: the start date from which we will collect data, if un-specified, all data will be collected
+    :param _start_date: the start date (epoch, datetime or date string) from which we will collect data, if un-specified,
+    all data will be collected
     :param _end_date: the end date to which we will collect data, if un-specified all data will be collected
-    :return: returns a list of elements that each have a title, a link and a publish date
+    :param _parser: "feedparser", or "lxml" for the incremental parser (see FastFeedParser) which stops reading the feed
+    once its entries are older than _start_date, and falls back to feedparser on feeds it cannot read
+    :return: returns a list of elements that each have a title, a link and a publish date (UTC epoch)
         """
+    start_date = to_epoch(_start_date) if _start_date is not None else None
+    end_date = to_epoch(_end_date) if _end_date is not None else None
+    import aiohttp
+
     logging.info(f"[RSS] Reading {_rss.rss_id.rss_url}")
     timeout=aiohttp.ClientTimeout(total=10)
     headers={'User-Agent': random.choice(USER_AGENT_LIST)}
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.get(_rss.rss_id.rss_url, headers=headers) as response:
-            data = await response.read()
+    validator_store = get_validator_store()
+    headers.update(validator_store.get_request_headers(_rss.rss_id.rss_url))  # conditional GET
+    metrics = get_metrics()
+    domain_limiter = get_domain_limiter()
+    feed_reader = get_feed_reader()
+    # the lxml parser reads the chunks as they are downloaded, and can stop the download early
+    parser = IncrementalFeedParser(start_date, end_date, _with_content=True) if _parser == "lxml" else None
+    session = get_session()
+    try:
+        async with domain_limiter.slot(_rss.rss_id.rss_url):
+            with metrics.timer("feed_download"):
+                async with session.get(_rss.rss_id.rss_url, headers=headers, timeout=timeout) as response:
+                    domain_limiter.record_response(_rss.rss_id.rss_url, response.status, response.headers)
+                    if response.status == 304:  # the feed did not change since the last poll, nothing new to parse
+                        logging.info(f"[RSS] Not modified {_rss.rss_id.rss_url}")
+                        metrics.increment("feeds_not_modified")
+                        _rss.not_modified = True
+                        # the entries of the last 200, the ones the previous queries did not use are still fresh
+                        _rss.link_array.extend(validator_store.get_links(_rss.rss_id.rss_url))
+                        return
+                    response.raise_for_status()  # 4xx / 5xx: a failed fetch, see FeedHealth
+                    data, truncated, parser_error = await feed_reader.read(
+                        response, parser.feed if parser is not None else None)
+                    # stored once the feed is parsed, along with its entries
+                    validator_headers = response.headers if response.status == 200 else None
+    except FeedContentTypeError:
+        metrics.increment("feed_errors")
+        metrics.increment("feeds_wrong_content_type")
+        raise
+    except FeedTooLargeError:
+        metrics.increment("feed_errors")
+        metrics.increment("feeds_oversized")
+        raise
+    except Exception:
+        metrics.increment("feed_errors")
+        raise
+    if truncated:
+        logging.info(f"[RSS] Truncated {_rss.rss_id.rss_url} to {len(data)} bytes")
+        metrics.increment("feeds_oversized")
+    metrics.increment("feeds_fetched")
+    metrics.increment("bytes_downloaded", len(data))
+
+    last_modified = validator_headers.get("Last-Modified") if validator_headers is not None \
+        else validator_store.get_last_modified(_rss.rss_id.rss_url)
+    if last_modified is not None:
+        try:
+            _rss.rss_id.last_build_date = convert_to_standard_timezone(last_modified)
+        except Exception:
+            pass
+
+    if parser is not None:
+        try:
+            if parser_error is not None:
+                raise parser_error
+            with metrics.timer("feed_parse"):
+                entries = parser.close(truncated)
+            for title, link, formatted_date, description, embedded_content in entries:
+                _rss.link_array.append(Link(title, link, formatted_date, description, embedded_content))
+            if validator_headers is not None:
+                validator_store.update(_rss.rss_id.rss_url, validator_headers, _rss.link_array)
+            return
+        except FeedFormatError as e:
+            logging.info(f"[RSS] Falling back to feedparser for {_rss.rss_id.rss_url}: {e}")
+            _rss.link_array.clear()
+        finally:
+            metrics.increment("entries_parsed", parser.n_entries)
+            metrics.increment("entries_too_old", parser.n_old_entries)
 
     # Put it to memory stream object universal feedparser
-    content = BytesIO(data)
+    import feedparser
+
+    content = BytesIO(data)  # shares the buffer of data, no copy
 
-    # Parse the XML feed
+    # Parse the XML feed, in a thread: feedparser is slow on large feeds, the other fetches go on meanwhile
     try:
-        feed = feedparser.parse(content)
+        with metrics.timer("feed_parse"):
+            feed = await asyncio.get_running_loop().run_in_executor(None, feedparser.parse, content)
     except Exception as e:
         print("Error: " + str(e))
-        return
-    
+        raise FeedFormatError(str(e)) from e
+    if feed.bozo and not feed.entries:  # not a feed (HTML error page, truncated document...)
+        raise FeedFormatError(str(feed.get("bozo_exception", "unreadable feed")))
+    metrics.increment("entries_parsed", len(feed.entries))
+
     # Extract data from each item
-    for item in feed.entries:
+    with metrics.timer("date_normalization"):
+        _read_feedparser_entries(_rss, feed.entries, start_date, end_date)
+    if validator_headers is not None:
+        validator_store.update(_rss.rss_id.rss_url, validator_headers, _rss.link_array)
+
+
+def _read_feedparser_entries(_rss, _entries, _start_date, _end_date):
+    """
+    Fills _rss.link_array with the feedparser entries published between _start_date and _end_date (epochs or None)
+    """
+    start_date, end_date = _start_date, _end_date
+    metrics = get_metrics()
+    for item in _entries:
 
         if hasattr(item, "published") or hasattr(item, "pubDate") or hasattr(item, "updated"):
             s_publish_date = item.get("published") or item.get("pubDate") or item.get("updated")
             if s_publish_date:
                 try:
-                    formatted_date = convert_to_standard_timezone(s_publish_date)
+                    formatted_date = parse_date_to_epoch(s_publish_date)
                 except Exception:
                     formatted_date = None
                     pass
             else:
                 formatted_date = None
 
+            if formatted_date is not None and start_date is not None and formatted_date < start_date:
+                metrics.increment("entries_too_old")
+
             # Skip dates that are defined and not within the established time window
             # Note that undefined dates won't be removed here
 
-            if formatted_date is not None and _start_date <= formatted_date <= _end_date:  # don't keep links with no associated date as we will not parse the article for a date
+            if formatted_date is not None and (start_date is None or start_date <= formatted_date) \
+                    and (end_date is None or formatted_date <= end_date):  # don't keep links with no associated date as we will not parse the article for a date
                 if hasattr(item, "title") and hasattr(item, "link"):
                     title = item.title
                     link = item.link
@@ -200,7 +287,10 @@ async def extract_latest_items(_rss,
                         description = None
                 else:
                     continue
-                _rss.link_array.append(Link(title, link, formatted_date, description))  # add the link to the RSS archive
+                # content:encoded / Atom <content>, the longest version when the entry has several
+                embedded_content = max((content.get("value") or "" for content in item.get("content") or ()),
+                                       key=len, default="") or None
+                _rss.link_array.append(Link(title, link, formatted_date, description, embedded_content))  # add the link to the RSS archive
 
 
 ################################################################################################################
@@ -234,31 +324,173 @@ Author: Térence Gras, CEO @ Exorde Labs
 """
 
 
-def extract_content(_dict):  # using Newspaper3k
+# Newspaper parsers are run in these executors, created on first use and keyed by (kind, max_workers)
+_parser_executors = {}
+_warmed_up_engines = set()  # (executor key, extraction engine) already submitted to import_article_parser
+
+
+def import_article_parser(_engine=DEFAULT_EXTRACTION_ENGINE):
+    """
+    Imports the parser of the extraction engine, submitted to the parser executor: the import (about half a second for
+    newspaper) then overlaps with the first feed fetches instead of delaying the first parsed article
+    """
+    if _engine == "newspaper":
+        import newspaper  # noqa: F401
+    elif _engine in ("fast", AUTO):  # "auto" only falls back to newspaper on short texts
+        from lxml import html  # noqa: F401
+
+
+def get_parser_executor(_kind="thread", _max_workers=None, _engine=DEFAULT_EXTRACTION_ENGINE):
+    """
+    Returns the executor in which the article HTML is parsed, so that parsing does not block the event loop
+    :param _kind: "thread" for a ThreadPoolExecutor or "process" for a ProcessPoolExecutor
+    :param _max_workers: The number of workers of the pool, None lets concurrent.futures decide
+    :param _engine: The extraction engine whose parser is imported in the background (see import_article_parser)
+    :return: A concurrent.futures executor
+    """
+    key = (_kind, _max_workers)
+    if key not in _parser_executors:
+        if _kind == "process":
+            from concurrent.futures import ProcessPoolExecutor
+
+            _parser_executors[key] = ProcessPoolExecutor(max_workers=_max_workers)
+        elif _kind == "thread":
+            _parser_executors[key] = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="rss-parser")
+        else:
+            raise ValueError("Unknown parser executor: {}".format(_kind))
+    if (key, _engine) not in _warmed_up_engines:
+        _warmed_up_engines.add((key, _engine))
+        _parser_executors[key].submit(import_article_parser, _engine)
+    return _parser_executors[key]
+
+
+def shutdown_parser_executors():
+    """
+    Shutdown hook: stops the parser executors created by get_parser_executor.
+    """
+    for executor in _parser_executors.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _parser_executors.clear()
+    _warmed_up_engines.clear()
+
+
+def parse_article_html(_url, _language, _html, _engine=DEFAULT_EXTRACTION_ENGINE, _min_length=0):
+    """
+    Extracts the text of an article from its already downloaded HTML. This is the CPU heavy part of the extraction, it
+    is kept at module level so that it can be sent to a process pool.
+    :param _url: The URL of the article
+    :param _language: The 2 letters language code of the article
+    :param _html: The HTML of the article
+    :param _engine: The extraction engine, "newspaper", "fast" or "auto" (see ContentExtractor)
+    :param _min_length: With "auto", the minimum length of the text of the fast engine before falling back to newspaper
+    :return: The text of the article
+    """
+    return extract_text(_engine, _url, _language, _html, _min_length)
+
+
+async def download_article_html(_url):
+    """
+    Downloads the HTML of an article with the shared HTTP session
+    :param _url: The URL of the article
+    :return: The HTML of the article
+    """
+    import aiohttp
+
+    timeout = aiohttp.ClientTimeout(total=10)
+    headers = {'User-Agent': random.choice(USER_AGENT_LIST)}
+    session = get_session()
+    async with session.get(_url, headers=headers, timeout=timeout) as response:
+        get_domain_limiter().record_response(_url, response.status, response.headers)
+        response.raise_for_status()
+        body = await response.read()
+        get_metrics().increment("bytes_downloaded", len(body))
+        return await response.text(errors="replace")  # decodes the body read above
+
+
+async def extract_article_content(_url, _language, _executor=None, _timeout=None, _download_semaphore=None,
+                                  _engine=DEFAULT_EXTRACTION_ENGINE, _min_length=0):
+    """
+    Extracts the content of one article: its HTML is downloaded asynchronously and parsed in _executor, outside of the
+    event loop. The download waits for a slot of the domain of the article first (see DomainLimiter), then for
+    _download_semaphore, so that articles waiting for a busy domain do not hold a download slot. _timeout only starts
+    once both are acquired: the time an article spends queued is not held against it.
+    Articles already extracted are read from the content cache instead (see ContentCache).
+    :param _url: The URL of the article
+    :param _language: The 2 letters language code of the article
+    :param _executor: The executor used to parse the article, defaults to the shared thread pool
+    :param _timeout: The maximum number of seconds spent on the article (download + parse, not counting the wait for
+    the download slots), None for no limit
+    :param _download_semaphore: Optional semaphore bounding the number of simultaneous downloads
+    :param _engine: The extraction engine, see parse_article_html
+    :param _min_length: The minimum post length, see parse_article_html
+    :return: The content of the article, "" if the extraction failed
+    """
+    metrics = get_metrics()
+    content_cache = get_content_cache()
+    cached = await content_cache.lookup(_url)
+    if cached is not None:
+        metrics.increment("content_cache_hits")
+        return cached[0]
+    metrics.increment("content_cache_misses")
+    executor = _executor if _executor is not None else get_parser_executor(_engine=_engine)
+    loop = asyncio.get_running_loop()
+
+    try:
+        async with get_domain_limiter().slot(_url), _download_semaphore or contextlib.nullcontext():
+            started = loop.time()
+            with metrics.timer("article_download"):
+                html = await asyncio.wait_for(download_article_html(_url), _timeout)
+        remaining = None if _timeout is None else max(0.0, _timeout - (loop.time() - started))
+        with metrics.timer("article_parse"):
+            content = await asyncio.wait_for(loop.run_in_executor(executor, parse_article_html, _url, _language, html,
+                                                                  _engine, _min_length), remaining)
+        content_cache.store(_url, content, _language)
+        return content
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logging.info(f"[RSS newsfeed] Could not extract the content of {_url}: {e!r}")
+        metrics.increment("extraction_failures")
+        return ""
 
-    content = [[] for i in range(len(_dict))]
-    for i in range(0, len(_dict)):
-        a = Newspaper(_dict[i][0], language=_dict[i][1])
-        a.download()
-        try:
-            a.parse()
-            content[i].append(a.text)
-        except:
-            content[i].append("")
-    return content
+
+async def extract_content(_dict, _max_concurrent_downloads=1, _executor=None, _timeout=None,
+                          _engine=DEFAULT_EXTRACTION_ENGINE):
+    """
+    Extracts the content of the articles, at most _max_concurrent_downloads being downloaded at the same time
+    (see extract_article_content).
+    :param _dict: A list of (url, language) tuples
+    :param _max_concurrent_downloads: The maximum number of articles downloaded at the same time
+    :param _executor: The executor used to parse the articles, defaults to the shared thread pool
+    :param _timeout: The maximum number of seconds spent on one article once it can be downloaded (download + parse),
+    None for no limit
+    :param _engine: The extraction engine, see parse_article_html
+    :return: A list holding, for each article, a list with its content ("" if the extraction failed)
+    """
+    semaphore = asyncio.Semaphore(_max_concurrent_downloads)
+    contents = await asyncio.gather(*(extract_article_content(url, language, _executor, _timeout, semaphore, _engine)
+                                      for url, language in _dict))
+    return [[content] for content in contents]
 
 
-async def request_random_content(_n_articles, _max_age, _json_data, _max_number_of_tries):
+async def request_random_content(_n_articles, _max_age, _rss_ids, _max_number_of_tries, _max_concurrent_feeds=1,
+                                 _max_concurrent_downloads=1, _executor=None, _extraction_timeout=None,
+                                 _extraction_engine=DEFAULT_EXTRACTION_ENGINE):
     """
     Requests random articles from the database that fit the entry params.
     :param _n_articles: The random number of articles we wish to extract from the RSS feeds.
     :param _max_age: The max age in seconds of these articles in comparison to now.
+    :param _rss_ids: The list of RssID (see FeedRegistry) we will be selecting random articles from
+    :param _max_concurrent_feeds: The number of RSS feeds that can be fetched at the same time (1 = serial)
+    :param _max_concurrent_downloads: The number of articles that can be downloaded at the same time
+    :param _executor: The executor parsing the articles (see get_parser_executor)
+    :param _extraction_timeout: The maximum number of seconds spent extracting one article
+    :param _extraction_engine: The engine extracting the content of the articles, see parse_article_html
     :return: A list of articles composed of [source, language, description, url, content, publish date]
     """
 
-    rss_ids = parse_reference_json_data(_json_data)
     articles = await find_random_articles_with_max_age(
-        _n_articles, rss_ids, _max_age, _max_number_of_tries
+        _n_articles, _rss_ids, _max_age, _max_number_of_tries, _max_concurrent_feeds
     )
 
     dict = []
@@ -266,7 +498,8 @@ async def request_random_content(_n_articles, _max_age, _json_data, _max_number_
     for article in articles:
         dict.append((article.url, article.language[:2]))
 
-    raw_content = extract_content(dict)
+    raw_content = await extract_content(dict, _max_concurrent_downloads, _executor, _extraction_timeout,
+                                        _extraction_engine)
 
     for i in range(0, len(raw_content)):
         for article in articles:
@@ -274,22 +507,189 @@ async def request_random_content(_n_articles, _max_age, _json_data, _max_number_
                 article.update_content(raw_content[i])
                 break  # move to next content
 
+    seen_urls = get_seen_urls()
+    for article in articles:
+        if article.content and article.content[0]:  # the failed extractions can be selected again
+            seen_urls.add(article.url)
     return articles
 
 
-async def find_random_articles_with_max_age(_n_articles, _rss_id_list, _max_age, _max_number_of_tries):
+async def stream_random_content(_n_articles, _max_age, _rss_ids, _max_number_of_tries, _max_concurrent_feeds=1,
+                                _max_concurrent_downloads=1, _executor=None, _extraction_timeout=None,
+                                _queue_size=None, _scheduler=None, _feed_parser="feedparser", _min_post_length=0,
+                                _health=None, _feed_quota=None, _deadline=None,
+                                _extraction_engine=DEFAULT_EXTRACTION_ENGINE, _embedded_min_length=None):
+    """
+    Streaming version of request_random_content: an async generator yielding every article as soon as its content is
+    extracted. The stages run concurrently and are connected by bounded queues, so that a slow consumer also slows
+    down the feed fetches (backpressure) and the memory used stays bounded:
+        feed fetch + entry filter -> (article queue) -> content extraction -> (extracted queue) -> consumer
+    :param _n_articles: The number of articles we wish to extract from the RSS feeds.
+    :param _max_age: The max age in seconds of these articles in comparison to now.
+    :param _rss_ids: The list of RssID we will be selecting random articles from
+    :param _max_concurrent_feeds: The number of RSS feeds that can be fetched at the same time (1 = serial)
+    :param _max_concurrent_downloads: The number of articles that are extracted at the same time
+    :param _executor: The executor parsing the articles (see get_parser_executor)
+    :param _extraction_timeout: The maximum number of seconds spent extracting one article
+    :param _queue_size: The size of the queues between the stages, defaults to _max_concurrent_downloads
+    :param _scheduler: Optional FeedScheduler choosing the feeds, they are picked uniformly otherwise
+    :param _feed_parser: The parser used on the feeds, see extract_latest_items
+    :param _min_post_length: Articles whose extracted content is shorter are dropped right after the extraction
+    :param _health: Optional FeedHealthTracker keeping the failing feeds out of the selection
+    :param _feed_quota: Bulk mode, see find_random_articles_with_max_age
+    :param _deadline: Optional Deadline: the feed discovery stops at its "discovery" stage deadline, the extraction at
+    its "extraction" one. The work in flight is then cancelled, the articles already extracted are still yielded
+    :param _extraction_engine: The engine extracting the content of the articles, "auto" falls back to newspaper below
+    _min_post_length (see parse_article_html)
+    :param _embedded_min_length: The articles whose feed entry embeds a full content (see Article.embedded_content)
+    at least this long once turned into text are not downloaded, this text is their content. None to always download
+    :return: An async generator of Article, with their content
+    """
+    queue_size = _queue_size if _queue_size is not None else _max_concurrent_downloads
+    article_queue = asyncio.Queue(queue_size)
+    extracted_queue = asyncio.Queue(queue_size)
+    deadline = _deadline if _deadline is not None else Deadline()
+    discovery_deadline = deadline.stage("discovery")
+    extraction_deadline = deadline.stage("extraction")  # nothing is yielded after it
+
+    async def find_stage():
+        try:
+            await discovery_deadline.run(find_random_articles_with_max_age(
+                _n_articles, _rss_ids, _max_age, _max_number_of_tries, _max_concurrent_feeds,
+                _on_article=article_queue.put, _scheduler=_scheduler, _feed_parser=_feed_parser, _health=_health,
+                _feed_quota=_feed_quota))
+        except asyncio.TimeoutError:
+            logging.info("[RSS newsfeed] Feed discovery stopped by the deadline")
+            get_metrics().increment("deadline_stops")
+        except Exception as e:
+            logging.exception(f"[RSS newsfeed] Error when finding articles: {e}")
+        await article_queue.put(None)  # end marker
+
+    async def extract(_article, _download_semaphore):
+        try:
+            content = None
+            if _embedded_min_length is not None and _article.embedded_content:
+                # parsed in the executor as the downloaded articles, the embedded content can be large
+                executor = _executor if _executor is not None else get_parser_executor(_engine=_extraction_engine)
+                content = await asyncio.get_running_loop().run_in_executor(executor, html_to_text,
+                                                                           _article.embedded_content)
+                if content and is_long_enough(content, _embedded_min_length):
+                    get_metrics().increment("embedded_contents")
+                else:
+                    content = None  # a teaser, the article is downloaded
+            if content is None:
+                content = await extract_article_content(_article.url, _article.language[:2], _executor,
+                                                        _extraction_timeout, _download_semaphore, _extraction_engine,
+                                                        _min_post_length)
+            if not is_long_enough(content, _min_post_length):
+                get_metrics().increment("articles_too_short")
+                return
+            _article.update_content([content])
+        except Exception as e:  # one broken article (or feed entry) must not stop the pipeline
+            logging.info(f"[RSS newsfeed] Could not extract the content of {_article.url}: {e!r}")
+            get_metrics().increment("extraction_failures")
+            return
+        await extracted_queue.put(_article)
+
+    async def extraction_stage():
+        # one task per article, at most _max_concurrent_downloads downloading: the articles waiting for a busy domain
+        # (see DomainLimiter) do not hold a download slot, the articles of the other domains go first
+        download_semaphore = asyncio.Semaphore(_max_concurrent_downloads)
+        pending = asyncio.Semaphore(2 * _max_concurrent_downloads)  # bounds the articles taken from the queue
+        tasks = set()
+        cancelled = False
+
+        def on_done(_task):
+            tasks.discard(_task)
+            pending.release()
+
+        try:
+            while True:
+                await pending.acquire()
+                article = await article_queue.get()
+                if article is None:
+                    break
+                task = asyncio.ensure_future(extract(article, download_semaphore))
+                tasks.add(task)
+                task.add_done_callback(on_done)
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            cancelled = True  # torn down by the consumer, which no longer reads the queue
+            raise
+        except Exception as e:
+            logging.exception(f"[RSS newsfeed] Error when extracting articles: {e}")
+        finally:
+            remaining = list(tasks)
+            for task in remaining:
+                task.cancel()
+            await asyncio.gather(*remaining, return_exceptions=True)
+            if not cancelled:
+                await extracted_queue.put(None)  # end marker, the consumer waits for it
+
+    stages = [asyncio.ensure_future(find_stage()), asyncio.ensure_future(extraction_stage())]
+    try:
+        while True:
+            try:
+                article = await extraction_deadline.run(extracted_queue.get())
+            except asyncio.TimeoutError:
+                logging.info("[RSS newsfeed] Content extraction stopped by the deadline")
+                get_metrics().increment("deadline_stops")
+                # hand over the articles already extracted, the extractions in flight are cancelled below
+                while not extracted_queue.empty():
+                    article = extracted_queue.get_nowait()
+                    if article is not None:
+                        yield article
+                break
+            if article is None:
+                break
+            yield article
+    finally:
+        # the consumer may stop early: tear down the stages still running
+        for stage in stages:
+            stage.cancel()
+        await asyncio.gather(*stages, return_exceptions=True)
+
+
+async def find_random_articles_with_max_age(_n_articles, _rss_id_list, _max_age, _max_number_of_tries,
+                                            _max_concurrent_feeds=1, _seen_urls=None, _on_article=None,
+                                            _scheduler=None, _feed_parser="feedparser", _health=None,
+                                            _feed_quota=None):
     """
     Finds a random number of article urls within the reference JSON feed.
     :param _max_age:
     :param _n_articles:
     :param _rss_id_list: The Rss ID list we will be selecting a random article from
+    :param _max_concurrent_feeds: If above 1, feeds are fetched concurrently (see find_random_articles_concurrently)
+    :param _seen_urls: The store of the URLs already collected by previous queries, defaults to the module-level one
+    (see SeenUrls). They are not selected, but the selected ones are not added to it: query() marks a URL as seen once
+    its item is yielded, so that an article that failed (download error, content too short, deadline...) can be
+    selected again by the next query
+    :param _on_article: Optional coroutine function awaited with every article as soon as it is selected
+    :param _scheduler: Optional FeedScheduler choosing the feeds from their freshness statistics (and learning from
+    every fetch), the feeds are picked uniformly otherwise
+    :param _feed_parser: The parser used on the feeds, see extract_latest_items. With "lxml", only the links within
+    _max_age are read from the feeds
+    :param _health: Optional FeedHealthTracker: the feeds whose circuit is open are not selected, and every fetch
+    reports its outcome to it
+    :param _feed_quota: Bulk mode, to get the most articles out of every feed fetch: every fetched feed is visited once
+    and gives all its fresh entries not seen yet, newest first, up to _feed_quota (see select_feed_entries). Only the
+    rejected entries count as trials. None picks a few entries per fetch, and gives up a feed after 5 unfit entries
     :return: A random article's rss_id & Link info
     """
 
+    if _seen_urls is None:
+        _seen_urls = get_seen_urls()
+    selected_urls = set()  # by this search, an URL found in several feeds is selected once
+    if _max_concurrent_feeds > 1:
+        return await find_random_articles_concurrently(_n_articles, _rss_id_list, _max_age, _max_number_of_tries,
+                                                       _max_concurrent_feeds, _seen_urls, _on_article, _scheduler,
+                                                       _feed_parser, _health, _feed_quota, selected_urls)
+    # feeds that can be selected, a feed is dropped from the list as soon as its fetch fails
+    candidates = _health.available(_rss_id_list) if _health is not None else list(_rss_id_list)
+
     articles = []
-    appended_urls = []
-    now_time = datetime.now()
-    now_time = now_time.strftime("%Y-%m-%d %H:%M:%S")  # format correctly
+    now_time = int(time.time())  # UTC epoch, as the publish dates
+    window_start = feed_window_start(now_time, _max_age, _feed_parser)
     cumulative_tries = 0
     current_try_count = 0
     print("n_articles is {}".format(_n_articles))
@@ -297,16 +697,39 @@ async def find_random_articles_with_max_age(_n_articles, _rss_id_list, _max_age,
         print("looping")
         if current_try_count > _max_number_of_tries:  # stop here
             return articles
+        if not candidates:  # every feed failed or is resting
+            return articles
 
-        rss_id = random.choice(_rss_id_list)
+        if _scheduler is not None:
+            rss_id = _scheduler.choose(candidates, _max_age)
+        else:
+            rss_id = random.choice(candidates)
 
         rss = RSS(rss_id)
-        try:
-            await extract_latest_items(rss)
-        except:
-            print("Could not extract latest items")
+        if not await fetch_feed(rss, window_start, _feed_parser, _health):
+            candidates.remove(rss_id)
+            continue
+        if _scheduler is not None and not rss.not_modified:  # a 304 is no new observation, see record_feed_fetch
+            record_feed_fetch(_scheduler, rss, now_time, _max_age, window_start is not None)
+        if not has_fresh_entries(rss, now_time, _max_age):
+            # the fetch is a trial, even when the lxml parser kept no entry, and fetching the feed again is useless
+            candidates.remove(rss_id)
+            current_try_count += 1
+            get_metrics().increment("entries_too_old", len(rss.link_array))
             continue
 
+        if _feed_quota is not None:
+            candidates.remove(rss_id)  # harvested, up to its quota
+            selected, rejected = select_feed_entries(rss, now_time, _max_age, _seen_urls,
+                                                     min(_feed_quota, _n_articles - len(articles)), selected_urls)
+            current_try_count += rejected
+            for article in selected:
+                articles.append(article)
+                if _on_article is not None:
+                    await _on_article(article)
+            continue
+
+        n_selected = len(articles)
         for link in rss.link_array:
             print(link.link)
             current_try_count += 1
@@ -315,73 +738,369 @@ async def find_random_articles_with_max_age(_n_articles, _rss_id_list, _max_age,
                 print("break bc of cumulative_tries")
                 cumulative_tries = 0
                 break # break out of this for loop and move on to the next one
-            if is_within_max_age(now_time, link.publish_date, _max_age) and link.link not in appended_urls:
+            if not is_within_max_age(now_time, link.publish_date, _max_age):
+                print("Not within max age, max age is {}".format(_max_age))
+                get_metrics().increment("entries_too_old")
+            elif link.link not in _seen_urls and link.link not in selected_urls:
                 cumulative_tries = 0  # reset this parameter to zero as we have selected an article
-                appended_urls.append(link.link)
-                articles.append(Article(rss_id.source, rss_id.description, rss_id.language, link.title, link.link, link.publish_date, link.description))
+                selected_urls.add(link.link)
+                articles.append(Article(rss_id.source, rss_id.description, rss_id.language, link.title, link.link, link.publish_date, link.description, link.content))
+                get_metrics().increment("articles_selected")
+                if _on_article is not None:
+                    await _on_article(articles[-1])
                 if len(articles) == _n_articles:
                     break
-            else:
-                print("Not within max age, max age is {}".format(_max_age))
+        if len(articles) == n_selected:
+            # nothing taken: its entries are old or seen, the feed would give the same ones (304) until it changes
+            candidates.remove(rss_id)
     return articles
 
 
+async def find_random_articles_concurrently(_n_articles, _rss_id_list, _max_age, _max_number_of_tries,
+                                            _max_concurrent_feeds, _seen_urls, _on_article=None, _scheduler=None,
+                                            _feed_parser="feedparser", _health=None, _feed_quota=None,
+                                            _selected_urls=None):
+    """
+    Concurrent version of find_random_articles_with_max_age. The feeds are visited in a random order (each feed at most
+    once) by _max_concurrent_feeds workers, so that several feeds are downloaded and parsed at the same time. As soon as
+    _n_articles fresh articles are found (or the trials are exhausted), the fetches still in flight are cancelled.
+    :param _n_articles: The number of articles we wish to find
+    :param _rss_id_list: The Rss ID list we will be selecting random articles from
+    :param _max_age: The max age in seconds of these articles in comparison to now
+    :param _max_number_of_tries: The maximum number of links examined overall, a fetched feed with no fresh link
+    counts as one
+    :param _max_concurrent_feeds: The maximum number of feeds fetched at the same time
+    :param _seen_urls: The store of the URLs already collected, see find_random_articles_with_max_age
+    :param _on_article: Optional coroutine function awaited with every article as soon as it is selected
+    :param _scheduler: Optional FeedScheduler ordering the feeds, they are visited in a uniformly random order otherwise
+    :param _feed_parser: The parser used on the feeds, see find_random_articles_with_max_age
+    :param _health: Optional FeedHealthTracker, see find_random_articles_with_max_age
+    :param _feed_quota: Bulk mode, see find_random_articles_with_max_age
+    :param _selected_urls: The set of the URLs selected by this search, filled as they are
+    :return: A list of Article
+    """
+    if _selected_urls is None:
+        _selected_urls = set()
+    if _health is not None:
+        _rss_id_list = _health.available(_rss_id_list)
+
+    articles = []
+    now_time = int(time.time())  # UTC epoch, as the publish dates
+    if _scheduler is not None:
+        pending_feeds = iter(_scheduler.order(_rss_id_list, _max_age))  # shared by all the workers
+    else:
+        pending_feeds = iter(random.sample(_rss_id_list, len(_rss_id_list)))
+    # consecutive feeds on different domains, so that the workers are not all waiting for the same one
+    domain_limiter = get_domain_limiter()
+    pending_feeds = iter(interleave_by_domain(pending_feeds, lambda rss_id: domain_limiter.key(rss_id.rss_url)))
+    window_start = feed_window_start(now_time, _max_age, _feed_parser)
+    done = asyncio.Event()
+    current_try_count = 0
+    metrics = get_metrics()
+
+    emitting = set()  # workers handing an article over to _on_article, they are not cancelled
+
+    async def emit(_article):
+        task = asyncio.current_task()
+        emitting.add(task)
+        try:
+            await _on_article(_article)
+        finally:
+            emitting.discard(task)
+
+    async def worker():
+        nonlocal current_try_count
+        for rss_id in pending_feeds:
+            if done.is_set():
+                return
+            if _health is not None and not _health.allow(rss_id.rss_url):
+                continue  # opened by another query since the selection, or already probed
+            rss = RSS(rss_id)
+            if not await fetch_feed(rss, window_start, _feed_parser, _health):
+                continue
+            if _scheduler is not None and not rss.not_modified:
+                record_feed_fetch(_scheduler, rss, now_time, _max_age, window_start is not None)
+            if not has_fresh_entries(rss, now_time, _max_age):
+                current_try_count += 1  # see find_random_articles_with_max_age
+                metrics.increment("entries_too_old", len(rss.link_array))
+                if current_try_count > _max_number_of_tries:
+                    done.set()
+                    return
+                continue
+
+            if _feed_quota is not None:
+                if done.is_set():
+                    return
+                # selected at once (no await), the other workers cannot exceed _n_articles meanwhile
+                selected, rejected = select_feed_entries(rss, now_time, _max_age, _seen_urls,
+                                                         min(_feed_quota, _n_articles - len(articles)),
+                                                         _selected_urls)
+                current_try_count += rejected
+                articles.extend(selected)
+                if len(articles) >= _n_articles or current_try_count > _max_number_of_tries:
+                    done.set()
+                if _on_article is not None:
+                    for article in selected:
+                        await emit(article)
+                if done.is_set():
+                    return
+                continue
+
+            cumulative_tries = 0
+            for link in rss.link_array:
+                if done.is_set():
+                    return
+                if current_try_count > _max_number_of_tries:  # stop here
+                    done.set()
+                    return
+                current_try_count += 1
+                cumulative_tries += 1
+                if cumulative_tries > 5:
+                    break  # move on to the next feed
+                if not is_within_max_age(now_time, link.publish_date, _max_age):
+                    metrics.increment("entries_too_old")
+                elif link.link not in _seen_urls and link.link not in _selected_urls:
+                    cumulative_tries = 0
+                    _selected_urls.add(link.link)
+                    articles.append(Article(rss_id.source, rss_id.description, rss_id.language, link.title,
+                                            link.link, link.publish_date, link.description, link.content))
+                    metrics.increment("articles_selected")
+                    if len(articles) >= _n_articles:
+                        done.set()  # before handing the article over, so that no other worker selects one more
+                    if _on_article is not None:
+                        await emit(articles[-1])
+                    if done.is_set():
+                        return
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(_max_concurrent_feeds, len(_rss_id_list)))]
+    all_workers = asyncio.gather(*workers)
+    stop = asyncio.ensure_future(done.wait())
+    try:
+        await asyncio.wait([stop, all_workers], return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        emitting.clear()  # we are torn down ourselves, nobody will receive the articles anymore
+        raise
+    finally:
+        # cancel the fetches that are still in flight, but let the selected articles be handed over
+        for task in workers + [stop]:
+            if task not in emitting:
+                task.cancel()
+        await asyncio.gather(all_workers, stop, return_exceptions=True)
+
+    return articles[:_n_articles]
+
+
+def select_feed_entries(_rss, _now_time, _max_age, _seen_urls, _limit, _selected_urls=None):
+    """
+    Bulk mode selection: the entries of a fetched feed within _max_age and not seen yet, newest first
+    :param _rss: The fetched RSS
+    :param _now_time: The time of here and now, as a UTC epoch
+    :param _max_age: The max age in seconds of the articles
+    :param _seen_urls: The store of the URLs already collected, skipped
+    :param _limit: The maximum number of articles selected
+    :param _selected_urls: Optional set of the URLs already selected by this search, skipped too, the selected ones
+    are added to it
+    :return: A (list of Article, number of entries rejected) tuple
+    """
+    rss_id = _rss.rss_id
+    metrics = get_metrics()
+    articles = []
+    rejected = 0
+    for link in sorted(_rss.link_array, key=lambda link: link.publish_date, reverse=True):
+        if len(articles) >= _limit:
+            break
+        if not is_within_max_age(_now_time, link.publish_date, _max_age):
+            metrics.increment("entries_too_old")
+            rejected += 1
+            break  # the next ones are older still
+        if link.link in _seen_urls or (_selected_urls is not None and link.link in _selected_urls):
+            rejected += 1
+            continue
+        if _selected_urls is not None:
+            _selected_urls.add(link.link)
+        articles.append(Article(rss_id.source, rss_id.description, rss_id.language, link.title, link.link,
+                                link.publish_date, link.description, link.content))
+    metrics.increment("articles_selected", len(articles))
+    return articles, rejected
+
+
+async def fetch_feed(_rss, _window_start=None, _feed_parser="feedparser", _health=None):
+    """
+    Fetches a feed with extract_latest_items and reports the outcome to _health
+    :param _rss: The RSS to fill
+    :param _window_start: The start date given to extract_latest_items
+    :param _feed_parser: The parser used on the feed, see extract_latest_items
+    :param _health: Optional FeedHealthTracker
+    :return: True if the feed was fetched, False if it failed
+    """
+    start = time.monotonic()
+    try:
+        await extract_latest_items(_rss, _window_start, None, _feed_parser)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logging.info(f"[RSS newsfeed] Could not extract latest items from {_rss.rss_id.rss_url}: {e!r}")
+        if _health is not None:
+            _health.record_failure(_rss.rss_id.rss_url, e, time.monotonic() - start)
+        return False
+    if _health is not None:
+        _health.record_success(_rss.rss_id.rss_url, time.monotonic() - start)
+    return True
+
+
+def feed_window_start(_now_time, _max_age, _feed_parser):
+    """
+    :return: The start date to give to extract_latest_items: the incremental parser can stop reading the feed there
+    """
+    return _now_time - _max_age if _feed_parser == "lxml" else None
+
+
+def record_feed_fetch(_scheduler, _rss, _now_time, _max_age, _windowed=False):
+    """
+    Feeds the statistics of the scheduler with the links of a freshly fetched feed. Not called for a feed that did not
+    change (304): its link_array is the one of the last poll (see FeedValidators), already observed
+    :param _scheduler: The FeedScheduler
+    :param _rss: The RSS whose link_array was just filled by extract_latest_items
+    :param _now_time: The current time (UTC epoch)
+    :param _max_age: The max age in seconds of the articles we are looking for
+    :param _windowed: True if only the links within _max_age were read from the feed
+    """
+    publish_dates = [link.publish_date for link in _rss.link_array]
+    fresh_count = sum(1 for publish_date in publish_dates if _now_time - publish_date <= _max_age)
+    _scheduler.record_fetch(_rss.rss_id.rss_url, publish_dates, fresh_count, _now_time,
+                            _max_age if _windowed else None)
+
+
+def has_fresh_entries(_rss, _now_time, _max_age):
+    """
+    :return: True if a link of _rss is within _max_age, the feed is worth visiting
+    """
+    return any(is_within_max_age(_now_time, link.publish_date, _max_age) for link in _rss.link_array)
+
+
 def is_within_max_age(_now_time, _date, _max_age):
     """
     Finds the difference in seconds between a present date and time and the date and time of the _date variable
-    :param _now_time: The time of here and now under this format "2023-06-08 19:30:00"
-    :param _date: The time we wish to compare now to
+    :param _now_time: The time of here and now, as a UTC epoch or under this format "2023-06-08 19:30:00" (UTC)
+    :param _date: The time we wish to compare now to (same formats)
     :param _max_age: The threshold in seconds that we are not allowed to cross
     :return: True if _now_time - _date <= _max_age, False otherwise
     """
 
-    # Convert date strings to datetime objects
-    d1 = datetime.strptime(_now_time, "%Y-%m-%d %H:%M:%S")
-    d2 = datetime.strptime(_date, "%Y-%m-%d %H:%M:%S")
-    time_diff = d1 - d2
-    if time_diff.total_seconds()<= _max_age:
-        return True
-    else:
-        return False
+    return to_epoch(_now_time) - to_epoch(_date) <= _max_age
 
 ################################################################################################################
 ################################################################################################################
 
-async def get_json_dict():
-    url = "https://raw.githubusercontent.com/exorde-labs/TestnetProtocol/main/targets/FeedSources.json"
-    
+FEED_SOURCES_URL = "https://raw.githubusercontent.com/exorde-labs/TestnetProtocol/main/targets/FeedSources.json"
+
+
+async def get_json_dict(_url=FEED_SOURCES_URL):
+    import aiohttp
+
     timeout=aiohttp.ClientTimeout(total=25)
     headers={'User-Agent': random.choice(USER_AGENT_LIST)}
     
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.get(url, headers=headers) as response:
-            data = await response.json(content_type=None)
+    session = get_session()
+    async with session.get(_url, headers=headers, timeout=timeout) as response:
+        data = await response.json(content_type=None)
 
     return data
 
 def extract_domain_name(url):
+    # offline and memoized by hostname, see DomainResolver
     try:
-        domain_parts = tldextract.extract(url)
-        domain = domain_parts.domain + '.' + domain_parts.suffix
-        # domain = re.sub(r"[^a-zA-Z0-9.-]", "", domain)
-        return domain
+        return get_domain_resolver().domain_of(url)
     except Exception:
         pass
 
-def convert_to_iso8601_utc(datetime_str: str) -> str:
-    # Convert the input string to a datetime object
-    dt = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M:%S")
 
-    # Convert the datetime object to the desired format
-    iso8601_utc = dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+# cached registry of the RSS feeds, see FeedRegistry
+_feed_registry = FeedRegistry(FEED_SOURCES_URL, get_json_dict, parse_reference_json_data, extract_domain_name)
+
+
+def get_feed_registry():
+    return _feed_registry
+
+
+# per-domain rate limits shared by the feed fetches and the article downloads, see DomainLimiter
+_domain_limiter = DomainLimiter(extract_domain_name)
 
-    return iso8601_utc
+
+def get_domain_limiter():
+    return _domain_limiter
+
+def convert_to_iso8601_utc(datetime_str) -> str:
+    # Accepts a UTC epoch or a "%Y-%m-%d %H:%M:%S" UTC string
+    return epoch_to_iso8601_utc(to_epoch(datetime_str))
 
 # default values
 DEFAULT_OLDNESS_SECONDS = 360
 DEFAULT_MAXIMUM_ITEMS = 25
 DEFAULT_MIN_POST_LENGTH = 10
 DEFAULT_MAX_TRIALS = 10
+DEFAULT_MAX_CONCURRENT_FEEDS = 8
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = 8
+DEFAULT_EXTRACTION_TIMEOUT = 30  # seconds, per article
+DEFAULT_PARSER_EXECUTOR = "thread"
+DEFAULT_EMBEDDED_MIN_LENGTH = 400  # characters, below the embedded content is most likely a teaser
+DEFAULT_EMBEDDED_RATIO = 2.0
+
+# optional tuning parameters, read with read_advanced_parameters
+DEFAULT_ADVANCED_PARAMETERS = {
+    "max_concurrent_feeds": DEFAULT_MAX_CONCURRENT_FEEDS,
+    "max_concurrent_downloads": DEFAULT_MAX_CONCURRENT_DOWNLOADS,
+    "extraction_timeout": DEFAULT_EXTRACTION_TIMEOUT,
+    "parser_executor": DEFAULT_PARSER_EXECUTOR,  # "thread" or "process"
+    "parser_workers": None,  # None lets concurrent.futures pick the pool size
+    "extraction_engine": DEFAULT_EXTRACTION_ENGINE,  # "newspaper", "fast" (lxml) or "auto" (see ContentExtractor)
+    # the full content embedded in a feed entry is used instead of downloading the article when its text is at least
+    # max(embedded_content_min_length, embedded_content_ratio * min_post_length) characters long
+    "embedded_content": True,  # False to always download the articles
+    "embedded_content_min_length": DEFAULT_EMBEDDED_MIN_LENGTH,
+    "embedded_content_ratio": DEFAULT_EMBEDDED_RATIO,
+    "feed_selection": "adaptive",  # "adaptive" (see FeedScheduler) or "uniform"
+    "feed_exploration": DEFAULT_EXPLORATION,  # share of the feed selection spread uniformly
+    "feed_stats_path": None,  # local file persisting the feed statistics, None = memory only
+    "collapse_whitespace": False,  # True to collapse the runs of whitespace of the contents, see ContentSanitizer
+    "feed_backoff": DEFAULT_BASE_BACKOFF,  # seconds a failing feed is left out, doubled on every consecutive failure
+    "feed_max_backoff": DEFAULT_MAX_BACKOFF,
+    "feed_health_path": None,  # local file persisting the health of the feeds (see FeedHealth), None = memory only
+    "feed_quota": None,  # bulk mode: articles taken from each fetched feed, see find_random_articles_with_max_age
+    "feed_parser": "feedparser",  # "feedparser" or "lxml" (incremental, stops at max_oldness_seconds, see FastFeedParser)
+    "pipeline_queue_size": None,  # size of the queues between the stages of query(), None = max_concurrent_downloads
+    # wall-clock limits of query() in seconds, None for no limit (see Deadline)
+    "deadline_seconds": None,  # the whole query, the items complete when it expires are still yielded
+    "registry_budget": None,  # stage budgets within the deadline: loading the registry,
+    "discovery_budget": None,  # fetching the feeds,
+    "extraction_budget": None,  # extracting the articles
+    "feed_sources_url": FEED_SOURCES_URL,
+    # consistent-hash sharding of the feeds between collectors, see FeedSharding and ShardRunner
+    "shard": 0,  # the shard collected, in [0, shard_count)
+    "shard_count": 1,  # 1 collects every feed
+    "registry_ttl": DEFAULT_REGISTRY_TTL,  # seconds before the cached FeedSources.json is refreshed in the background
+    "registry_snapshot_path": DEFAULT_SNAPSHOT_PATH,  # last known good FeedSources.json, "" to disable
+    "validator_store_path": None,  # local file persisting the ETag / Last-Modified of the feeds, None = memory only
+    "seen_urls_filter": "lru",  # "lru" (exact URLs) or "bloom" (fixed memory budget), see SeenUrls
+    "seen_urls_capacity": DEFAULT_SEEN_URLS_CAPACITY,
+    "seen_urls_ttl": DEFAULT_SEEN_URLS_TTL,
+    "seen_urls_path": None,  # local file persisting the seen URLs across restarts, None = memory only
+    "content_cache_capacity": DEFAULT_CONTENT_CACHE_CAPACITY,  # extracted contents kept in memory, 0 for none
+    "content_cache_ttl": DEFAULT_CONTENT_CACHE_TTL,
+    "content_cache_path": None,  # SQLite file caching the contents, shared by worker processes, None = memory only
+    "metrics": None,  # True to record the per-stage timings and counters (see Metrics), None keeps the current setting
+    # per-domain limits of the feed fetches and article downloads, None keeps the current value (see DomainLimiter)
+    "domain_rate": None,  # requests per second and per domain, 0 for no limit
+    "domain_burst": None,
+    "domain_max_in_flight": None,  # simultaneous requests per domain, 0 for no limit
+    # size cap of the feed bodies, None keeps the current value (see FeedReader)
+    "feed_max_size": None,  # bytes, 0 for no limit
+    "feed_oversize": None,  # "truncate" (keep the entries read so far) or "abort" (the fetch fails)
+    # connector settings of the shared HTTP session, None keeps the current value (see SessionPool)
+    "connection_limit": None,
+    "connection_limit_per_host": None,
+    "dns_cache_ttl": None,
+}
 
 def read_parameters(parameters):
     # Check if parameters is not empty or None
@@ -414,6 +1133,20 @@ def read_parameters(parameters):
 
     return max_oldness_seconds, maximum_items_to_collect, min_post_length, max_extraction_trials
 
+
+def read_advanced_parameters(parameters):
+    """
+    Reads the optional tuning parameters of the collector, see DEFAULT_ADVANCED_PARAMETERS for the list
+    :param parameters: The parameters dict given to query(), can be empty or None
+    :return: A dict holding every advanced parameter, with its default value when it was not specified
+    """
+    advanced_parameters = dict(DEFAULT_ADVANCED_PARAMETERS)
+    if parameters and isinstance(parameters, dict):
+        for key in advanced_parameters:
+            if parameters.get(key) is not None:
+                advanced_parameters[key] = parameters[key]
+    return advanced_parameters
+
 ### TEMPORARY SOLUTION
 # TO SOME RSS FEEDS BEING IN THE FUTURE (MANY DAYS AHEAD)
 # Lacking any other solution, we can cap the date to now if it's ahead
@@ -437,19 +1170,80 @@ def cap_date_to_now(datetime_str):
     return capped_datetime_str
 
 
+def build_item(_article, _min_post_length=0, _collapse_whitespace=False):
+    """
+    Sanitizes the content of an article and builds the corresponding Item
+    :param _article: An Article with its content
+    :param _min_post_length: The minimum length of the sanitized content
+    :param _collapse_whitespace: True to collapse the runs of whitespace of the content (see sanitize_content)
+    :return: An Item, None if the sanitized content is shorter than _min_post_length
+    """
+    # CONTENT SANITIZATION
+    with get_metrics().timer("sanitization"):
+        processed_content = sanitize_content(_article.content, _collapse_whitespace)
+    if not is_long_enough(processed_content, _min_post_length):
+        return None
+
+    logging.info(f"[RSS newsfeed] FOUND ARTICLE: ")
+    source_domain = extract_domain_name(_article.url)
+    logging.info(f"[RSS newsfeed]\tSource = {source_domain}")
+    logging.info(f"[RSS newsfeed]\tURL = {_article.url}")
+    created_at_formatted = epoch_to_iso8601_utc(_article.publish_date)
+    created_at_formatted_capped = epoch_to_iso8601_utc(cap_epoch_to_now(_article.publish_date))
+    logging.info(f"[RSS newsfeed]\tDate = {created_at_formatted}")
+    logging.info(f"[RSS newsfeed]\tTitle = {_article.title}")
+    logging.info(f"[RSS newsfeed]\tArticle content = {str(processed_content)}")
+
+    return Item(
+        content=Content(str(processed_content)),
+        # author=Author(str(source_domain)),
+        created_at=CreatedAt(created_at_formatted_capped),
+        title=Title(_article.title),
+        domain=Domain(str(source_domain)),
+        url=Url(_article.url)
+    )
+
+
 async def query(parameters: dict) -> AsyncGenerator[Item, None]:
     # read parameters dict
     max_oldness_seconds, maximum_items_to_collect, min_post_length, max_extraction_trials = read_parameters(parameters)
+    advanced_parameters = read_advanced_parameters(parameters)
+    deadline = Deadline(advanced_parameters["deadline_seconds"], {
+        "registry": advanced_parameters["registry_budget"],
+        "discovery": advanced_parameters["discovery_budget"],
+        "extraction": advanced_parameters["extraction_budget"]
+    })
+    await configure_session(advanced_parameters["connection_limit"], advanced_parameters["connection_limit_per_host"],
+                            advanced_parameters["dns_cache_ttl"])
+    validator_store = configure_validator_store(advanced_parameters["validator_store_path"])
+    metrics = configure_metrics(advanced_parameters["metrics"])
+    get_domain_limiter().configure(advanced_parameters["domain_rate"], advanced_parameters["domain_burst"],
+                                   advanced_parameters["domain_max_in_flight"])
+    configure_feed_reader(advanced_parameters["feed_max_size"], advanced_parameters["feed_oversize"])
+    seen_urls = configure_seen_urls(advanced_parameters["seen_urls_filter"], advanced_parameters["seen_urls_capacity"],
+                                    advanced_parameters["seen_urls_ttl"], advanced_parameters["seen_urls_path"])
+    configure_content_cache(advanced_parameters["content_cache_capacity"], advanced_parameters["content_cache_ttl"],
+                            advanced_parameters["content_cache_path"])
 
     number_of_articles = maximum_items_to_collect
     max_number_of_tries = max_extraction_trials
     max_age_of_article_in_seconds = max_oldness_seconds
     logging.info(f"[RSS newsfeed] Trying to find {number_of_articles} article(s) under {max_age_of_article_in_seconds} in {max_number_of_tries} max trials...")    
+    feed_registry = get_feed_registry()
+    feed_registry.configure(advanced_parameters["feed_sources_url"], advanced_parameters["registry_ttl"],
+                            advanced_parameters["registry_snapshot_path"])
     try:
-        data = await get_json_dict()
+        with metrics.timer("registry"):
+            rss_ids = await deadline.stage("registry").run(feed_registry.get_rss_ids())
+    except asyncio.TimeoutError:
+        logging.info("[RSS newsfeed] The FeedSource.json could not be loaded before the deadline")
+        metrics.increment("deadline_stops")
+        return
     except Exception as e:
         logging.info(f"[RSS newsfeed] Error when fetching the FeedSource.json: {e}")
-    print("has `data`")
+        return
+    rss_ids = select_shard(rss_ids, advanced_parameters["shard"], advanced_parameters["shard_count"])
+    print("has `rss_ids`")
     """
     Article data is accessible following this structure:
         self.rss_source // the RSS feed name that we are collecting from
@@ -460,51 +1254,62 @@ async def query(parameters: dict) -> AsyncGenerator[Item, None]:
         self.publish_date // the publish date of the article
         self.description // the description (summary) of the article
         self.content // the content of the article that was collected
+        self.embedded_content // the full content (HTML) embedded in the feed entry, if any
     """
+    check_extraction_engine(advanced_parameters["extraction_engine"])
+    executor = get_parser_executor(advanced_parameters["parser_executor"], advanced_parameters["parser_workers"],
+                                   advanced_parameters["extraction_engine"])
+    feed_health = configure_feed_health(advanced_parameters["feed_backoff"], advanced_parameters["feed_max_backoff"],
+                                        advanced_parameters["feed_health_path"])
+    embedded_min_length = None
+    if advanced_parameters["embedded_content"]:
+        embedded_min_length = max(advanced_parameters["embedded_content_min_length"],
+                                  advanced_parameters["embedded_content_ratio"] * min_post_length)
+    scheduler = None
+    if advanced_parameters["feed_selection"] == "adaptive":
+        scheduler = configure_feed_scheduler(advanced_parameters["feed_exploration"],
+                                             advanced_parameters["feed_stats_path"])
+    articles = stream_random_content(number_of_articles, max_age_of_article_in_seconds, rss_ids, max_number_of_tries,
+                                     advanced_parameters["max_concurrent_feeds"],
+                                     advanced_parameters["max_concurrent_downloads"], executor,
+                                     advanced_parameters["extraction_timeout"],
+                                     advanced_parameters["pipeline_queue_size"], scheduler,
+                                     advanced_parameters["feed_parser"], min_post_length, feed_health,
+                                     advanced_parameters["feed_quota"], deadline,
+                                     advanced_parameters["extraction_engine"], embedded_min_length)
     try:
-        articles = await request_random_content(number_of_articles, max_age_of_article_in_seconds, data, max_number_of_tries)
+        async for article in articles:
+            try:
+                new_item = build_item(article, min_post_length, advanced_parameters["collapse_whitespace"])
+            except Exception as e:
+                logging.info(f"[RSS newsfeed] Error during article yield: {e}")
+                continue
+            if new_item is None:
+                get_metrics().increment("articles_too_short")
+                continue
+            metrics.increment("items_yielded")
+            seen_urls.add(article.url)  # only now: the articles that failed can be selected by the next query
+            yield new_item
     except Exception as e:
         logging.exception(f"[RSS newsfeed] Error when requesting content: {e}")
-        articles = []
-    print("Got `articles`")
-    print("len of articles is {}".format(len(articles)))
-    for article in articles:
-        try:
-            logging.info(f"[RSS newsfeed] FOUND ARTICLE: ")    
-            source_domain = extract_domain_name(article.url)
-            logging.info(f"[RSS newsfeed]\tSource = {source_domain}")
-            logging.info(f"[RSS newsfeed]\tURL = {article.url}")
-            created_at_formatted = convert_to_iso8601_utc(article.publish_date)
-            created_at_formatted_capped = cap_date_to_now(created_at_formatted)
-            logging.info(f"[RSS newsfeed]\tDate = {created_at_formatted}")
-            logging.info(f"[RSS newsfeed]\tTitle = {article.title}")    
-
-            # CONTENT SANITIZATION
-            # replace also quotes and double quotes
-            processed_content = str(article.content).replace("\"", " ").replace("\'", " ")
-            processed_content = processed_content.replace("\\", " ").replace("/", " ")
-            # remove ALL occurences of \n or \r
-            processed_content = processed_content.replace("\n", " ").replace("\r", " ")
-            logging.info(f"[RSS newsfeed]\tArticle content = {str(processed_content)}")    
-
-            new_item = Item(
-                content=Content(str(processed_content)),
-                # author=Author(str(source_domain)),
-                created_at=CreatedAt(created_at_formatted_capped),
-                title=Title(article.title),
-                domain=Domain(str(source_domain)),
-                url=Url(article.url)
-            )
-            yield new_item
-        except Exception as e:
-            logging.info(f"[RSS newsfeed] Error during article yield: {e}")
+    finally:
+        await articles.aclose()
+        validator_store.save()
+        seen_urls.save()
+        feed_health.save()
+        if scheduler is not None:
+            scheduler.save()
 
 
 async def main():
     print("starting")
-    while True:
-        async for result in query({}):
-            print(result)
+    try:
+        while True:
+            async for result in query({}):
+                print(result)
+    finally:
+        await close_session()
+        shutdown_parser_executors()
 
 if __name__ == '__main__':
     asyncio.run(main())
@@ -0,0 +1,93 @@
+import asyncio
+import contextlib
+import time
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import extract_content, extract_domain_name
+from rss007d0675444aa13fc.ContentCache import ContentCache
+from rss007d0675444aa13fc.DomainLimiter import DomainLimiter
+
+PAGE = ("<html><body><div class='story'><p>The city council approved the new transit plan on Tuesday, after months "
+        "of heated debate.</p><p>Officials said the first trains would run before the end of next year.</p>"
+        "</div></body></html>")
+
+
+@pytest.fixture(autouse=True)
+def isolated_collector(monkeypatch):
+    # every article is on the same host: no per-domain limit, and nothing cached from another test
+    limiter = DomainLimiter(extract_domain_name, 0, 10, 0)
+    cache = ContentCache()
+    monkeypatch.setattr(rss_module, "get_domain_limiter", lambda: limiter)
+    monkeypatch.setattr(rss_module, "get_content_cache", lambda: cache)
+
+
+@contextlib.asynccontextmanager
+async def article_server():
+    """
+    Local server of articles counting the requests in flight, /article/slow is slow and /article/missing is a 404
+    """
+    from aiohttp import web
+
+    state = {"in_flight": 0, "peak": 0, "requests": 0}
+
+    async def serve_article(_request):
+        name = _request.match_info["name"]
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            await asyncio.sleep(2 if name == "slow" else 0.1)
+            if name == "missing":
+                return web.Response(status=404)
+            return web.Response(text=PAGE, content_type="text/html")
+        finally:
+            state["in_flight"] -= 1
+
+    app = web.Application()
+    app.router.add_get("/article/{name}", serve_article)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    state["base_url"] = "http://127.0.0.1:{}/article/".format(runner.addresses[0][1])
+    try:
+        yield state
+    finally:
+        await rss_module.close_session()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_downloads_are_bounded():
+    async with article_server() as server:
+        articles = [(server["base_url"] + str(i), "en") for i in range(8)]
+        contents = await extract_content(articles, 3, _engine="fast")
+
+    assert server["peak"] == 3
+    assert all(content[0].startswith("The city council approved") for content in contents)
+
+
+@pytest.mark.asyncio
+async def test_timeouts_and_errors_give_empty_contents():
+    async with article_server() as server:
+        articles = [(server["base_url"] + name, "en") for name in ("slow", "missing", "ok")]
+        start = time.monotonic()
+        contents = await extract_content(articles, 3, _timeout=0.5, _engine="fast")
+        assert time.monotonic() - start < 1.5  # the slow article was given up after its timeout
+
+    assert contents[0] == [""] and contents[1] == [""]
+    assert contents[2][0].startswith("The city council approved")
+    assert server["requests"] == 3
+
+
+@pytest.mark.asyncio
+async def test_timeout_does_not_count_the_time_spent_queued():
+    async with article_server() as server:
+        articles = [(server["base_url"] + str(i), "en") for i in range(8)]
+        # one download at a time: the last article is queued for 0.7 s, longer than its timeout
+        contents = await extract_content(articles, 1, _timeout=0.5, _engine="fast")
+
+    assert all(content[0].startswith("The city council approved") for content in contents)
+    assert server["peak"] == 1
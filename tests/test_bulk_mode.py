@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import RssID, Link, SeenUrlStore, find_random_articles_with_max_age
+
+
+@pytest.fixture
+def newsy_feeds(monkeypatch):
+    now = int(time.time())
+    fetched = []
+
+    async def fake_extract_latest_items(_rss, *args, **kwargs):
+        source = _rss.rss_id.source
+        fetched.append(source)
+        for i in range(40):  # 40 fresh entries, oldest first, then 5 old ones
+            _rss.link_array.append(Link("title", "https://{}.example/{}".format(source, i), now - 1000 + i, None))
+        for i in range(5):
+            _rss.link_array.append(Link("title", "https://{}.example/old{}".format(source, i), now - 10000, None))
+
+    monkeypatch.setattr(rss_module, "extract_latest_items", fake_extract_latest_items)
+    return [RssID("feed{}".format(i), "description", "en", "https://feed{}.example/rss".format(i))
+            for i in range(5)], fetched
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_concurrent_feeds", [1, 3])
+async def test_every_fresh_entry_up_to_the_quota(newsy_feeds, max_concurrent_feeds):
+    feeds, fetched = newsy_feeds
+    seen_urls = SeenUrlStore()
+    seen_urls.add("https://feed0.example/39")
+
+    articles = await find_random_articles_with_max_age(50, feeds, 3600, 10, max_concurrent_feeds, seen_urls,
+                                                       _feed_quota=20)
+
+    assert len(articles) == 50
+    assert len(fetched) == 3  # 20 + 20 + 10 articles: a quota per feed, each feed fetched once
+    by_feed = {}
+    for article in articles:
+        by_feed.setdefault(article.rss_source, []).append(article.url)
+    for source, urls in by_feed.items():
+        assert len(urls) <= 20 and len(set(urls)) == len(urls)
+        assert "https://feed0.example/39" not in urls
+        # newest first
+        assert urls[0] == "https://{}.example/{}".format(source, 38 if source == "feed0" else 39)
+
+
+@pytest.mark.asyncio
+async def test_only_rejected_entries_are_trials(newsy_feeds):
+    feeds, fetched = newsy_feeds
+
+    articles = await find_random_articles_with_max_age(500, feeds, 3600, 3, _seen_urls=SeenUrlStore(),
+                                                       _feed_quota=100)
+
+    # each feed gives its 40 fresh entries, then one old entry is rejected: the 4th rejection stops the search
+    assert len(fetched) == 4 and len(articles) == 160
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import RssID, Link, SeenUrlStore, find_random_articles_with_max_age
+
+
+def make_feeds(count):
+    return [RssID("source{}".format(i), "description", "en", "https://feed{}.example/rss".format(i))
+            for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetch_stops_early_and_cancels(monkeypatch):
+    now = int(time.time())
+    cancelled = []
+
+    async def fake_extract_latest_items(_rss, *args, **kwargs):
+        if _rss.rss_id.source == "source0":
+            await asyncio.sleep(0.05)
+            _rss.link_array.append(Link("title", "https://feed0.example/a", now, None))
+            return
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(_rss.rss_id.source)
+            raise
+
+    monkeypatch.setattr(rss_module, "extract_latest_items", fake_extract_latest_items)
+    monkeypatch.setattr(rss_module.random, "sample", lambda population, k: list(population))
+
+    articles = await asyncio.wait_for(
+        find_random_articles_with_max_age(1, make_feeds(4), 3600, 10, _max_concurrent_feeds=4,
+                                          _seen_urls=SeenUrlStore()), 2)
+
+    assert [article.url for article in articles] == ["https://feed0.example/a"]
+    assert sorted(cancelled) == ["source1", "source2", "source3"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetch_visits_each_feed_once(monkeypatch):
+    visited = []
+
+    async def fake_extract_latest_items(_rss, *args, **kwargs):
+        visited.append(_rss.rss_id.source)
+        raise ValueError("broken feed")
+
+    monkeypatch.setattr(rss_module, "extract_latest_items", fake_extract_latest_items)
+
+    articles = await find_random_articles_with_max_age(5, make_feeds(6), 3600, 10, _max_concurrent_feeds=3,
+                                                     _seen_urls=SeenUrlStore())
+
+    assert articles == []
+    assert sorted(visited) == ["source{}".format(i) for i in range(6)]
+
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>Entry</title><link>https://news.example/1</link><pubDate>Wed, 07 Jun 2023 19:30:00 +0000</pubDate></item>
+</channel></rss>"""
+
+
+@pytest.mark.asyncio
+async def test_feeds_are_parsed_off_the_event_loop(monkeypatch):
+    from aiohttp import web
+    import feedparser
+
+    parse = feedparser.parse
+    threads = []
+
+    def slow_parse(*args, **kwargs):
+        threads.append(threading.current_thread())
+        time.sleep(0.2)  # a large feed
+        return parse(*args, **kwargs)
+
+    async def serve_feed(_request):
+        return web.Response(body=FEED, content_type="application/rss+xml")
+
+    monkeypatch.setattr(feedparser, "parse", slow_parse)
+    app = web.Application()
+    app.router.add_get("/rss/{feed}", serve_feed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        feeds = [rss_module.RSS(RssID("source", "description", "en", "http://127.0.0.1:{}/rss/{}".format(port, i)))
+                 for i in range(3)]
+        start = time.monotonic()
+        await asyncio.gather(*(rss_module.extract_latest_items(rss) for rss in feeds))
+        assert time.monotonic() - start < 0.5  # the 3 parses overlap
+        assert all(len(rss.link_array) == 1 for rss in feeds)
+        assert len(threads) == 3 and threading.main_thread() not in threads
+    finally:
+        await rss_module.close_session()
+        await runner.cleanup()
@@ -0,0 +1,92 @@
+import multiprocessing
+import threading
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import extract_article_content
+from rss007d0675444aa13fc.ContentCache import ContentCache, canonicalize_url
+
+URL = "https://News.Example:443/world/article?b=2&utm_source=rss&a=1#comments"
+
+
+def test_canonical_url():
+    assert canonicalize_url(URL) == "https://news.example/world/article?a=1&b=2"
+    assert canonicalize_url("http://news.example:8080") == "http://news.example:8080/"
+
+
+def test_memory_tier_is_an_lru_with_a_ttl():
+    cache = ContentCache(_capacity=2, _ttl=100)
+    cache.put("https://a.example/1", "one", "en", _now=1000)
+    cache.put("https://a.example/2", "two", "en", _now=1000)
+    assert cache.get("https://a.example/1", _now=1050) == ("one", "en", 1000)
+    cache.put("https://a.example/3", "three", "en", _now=1050)  # evicts /2, the least recently used
+    assert cache.get("https://a.example/2", _now=1050) is None
+    assert cache.get("https://a.example/1", _now=1101) is None  # expired
+    cache.put("https://a.example/4", "", "en")  # failed extractions are not cached
+    assert cache.get("https://a.example/4") is None
+
+
+def write_entries(_path, _start):
+    cache = ContentCache(_path=_path)
+    for i in range(_start, _start + 50):
+        cache.put("https://a.example/{}".format(i), "content {}".format(i), "fr")
+    cache.close()
+
+
+def test_disk_tier_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "contents.sqlite")
+    processes = [multiprocessing.get_context("spawn").Process(target=write_entries, args=(path, start))
+                 for start in (0, 50)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    cache = ContentCache(_capacity=0, _path=path)
+    for i in range(100):
+        assert cache.get("https://a.example/{}#top".format(i))[:2] == ("content {}".format(i), "fr")
+    cache.purge(_now=10 ** 12)  # everything expired
+    assert cache.get("https://a.example/1") is None
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_cached_article_is_not_downloaded(monkeypatch):
+    downloads = []
+
+    async def fake_download_article_html(_url):
+        downloads.append(_url)
+        return "<html></html>"
+
+    monkeypatch.setattr(rss_module, "download_article_html", fake_download_article_html)
+    monkeypatch.setattr(rss_module, "parse_article_html", lambda _url, _language, _html, *args: "the content")
+    monkeypatch.setattr(rss_module, "get_content_cache", lambda: cache)
+    cache = ContentCache()
+
+    assert await extract_article_content("https://a.example/1?utm_medium=feed", "en") == "the content"
+    assert await extract_article_content("https://a.example/1", "en") == "the content"
+    assert downloads == ["https://a.example/1?utm_medium=feed"]
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_runs_off_the_event_loop(tmp_path, monkeypatch):
+    path = str(tmp_path / "contents.sqlite")
+    threads = []
+    read_disk = ContentCache.read_disk
+
+    def recording_read_disk(self, *args):
+        threads.append(threading.current_thread())
+        return read_disk(self, *args)
+
+    monkeypatch.setattr(ContentCache, "read_disk", recording_read_disk)
+    cache = ContentCache(_path=path)
+    cache.store("https://a.example/1", "one", "en").result()
+    cache.close()
+
+    cache = ContentCache(_capacity=0, _path=path)
+    assert (await cache.lookup("https://a.example/1"))[:2] == ("one", "en")
+    assert await cache.lookup("https://a.example/2") is None
+    assert threads and all(thread is not threading.main_thread() for thread in threads)
+    cache.close()
@@ -0,0 +1,67 @@
+import pytest
+
+from rss007d0675444aa13fc import ContentExtractor
+from rss007d0675444aa13fc.ContentExtractor import extract_text, extract_with_lxml
+
+PARAGRAPHS = [
+    "The city council approved the new transit plan on Tuesday, after months of heated debate.",
+    "Officials said the first trains would run before the end of next year, pending the final budget vote.",
+    "Critics argued that the project was too expensive, and that the money should go to road repairs instead.",
+]
+PAGE = """<html><head><script>track();</script></head><body>
+<nav><a href="/">Home</a> <a href="/world">World</a></nav>
+<div class="cookie-banner"><p>We use cookies to improve your experience, by browsing you accept them.</p></div>
+<div class="story"><h1>Transit</h1><div class="story-body">
+<p>{0}</p><div class="ad"><p>Advertisement</p></div><p>{1}</p><p>{2}</p>
+</div></div>
+<div class="more"><ul><li><a href="/1">Another story about the city and its transit plan</a></li>
+<li><a href="/2">Yet another story about the council and the vote</a></li></ul></div>
+<div id="comments"><p>Great article, thanks for sharing, I have been waiting for this line for a long time.</p></div>
+<footer><p>Copyright 2024, all rights reserved, powered by a publishing engine.</p></footer>
+</body></html>""".format(PARAGRAPHS[0], PARAGRAPHS[1].replace("budget", '<a href="/budget">budget</a>'), PARAGRAPHS[2])
+
+
+def test_fast_engine_keeps_the_main_text():
+    assert extract_with_lxml("https://news.example/a", "en", PAGE) == "\n\n".join(PARAGRAPHS)
+    assert extract_with_lxml("https://news.example/a", "en", "") == ""
+
+
+def test_div_paragraphs():
+    page = "<html><body><div class='text'>{}</div></body></html>".format(
+        "".join("<div>{}</div>".format(paragraph) for paragraph in PARAGRAPHS))
+    assert extract_with_lxml("https://news.example/a", "en", page) == "\n\n".join(PARAGRAPHS)
+
+
+def test_auto_falls_back_below_the_min_length(monkeypatch):
+    monkeypatch.setattr(ContentExtractor, "extract_with_newspaper", lambda _url, _language, _html: "newspaper text")
+    text = "\n\n".join(PARAGRAPHS)
+    assert extract_text("auto", "https://news.example/a", "en", PAGE, len(text)) == text
+    assert extract_text("auto", "https://news.example/a", "en", PAGE, len(text) + 1) == "newspaper text"
+    with pytest.raises(ValueError):
+        extract_text("readability", "https://news.example/a", "en", PAGE)
+
+
+def test_only_the_selected_engine_is_warmed_up(monkeypatch):
+    import rss007d0675444aa13fc as rss_module
+
+    submitted = []
+
+    class RecordingExecutor:
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def submit(self, _function, *args):
+            submitted.append((_function.__name__,) + args)
+
+        def shutdown(self, *args, **kwargs):
+            pass
+
+    monkeypatch.setattr(rss_module, "ThreadPoolExecutor", RecordingExecutor)
+    rss_module.shutdown_parser_executors()
+    try:
+        executor = rss_module.get_parser_executor("thread", 2, "fast")
+        assert rss_module.get_parser_executor("thread", 2, "fast") is executor
+        assert submitted == [("import_article_parser", "fast")]
+    finally:
+        rss_module.shutdown_parser_executors()
@@ -0,0 +1,36 @@
+import rss007d0675444aa13fc as collector
+from rss007d0675444aa13fc.ContentSanitizer import sanitize_content, is_long_enough
+
+
+def legacy_sanitize(_text):
+    processed_content = _text.replace("\"", " ").replace("\'", " ")
+    processed_content = processed_content.replace("\\", " ").replace("/", " ")
+    return processed_content.replace("\n", " ").replace("\r", " ")
+
+
+def test_same_output_as_the_replace_chain():
+    text = "He said \"it's 50/50\"\r\nC:\\path\tand\n\nmore"
+    assert sanitize_content(text) == legacy_sanitize(text)
+    assert sanitize_content([text]) == legacy_sanitize(text)
+    assert sanitize_content(None) == ""
+
+
+def test_whitespace_collapse():
+    assert sanitize_content(["  first line\r\n\n second\t'line'  "], _collapse_whitespace=True) == \
+        "first line second line"
+
+
+def test_min_post_length():
+    assert is_long_enough("long enough", 10)
+    assert not is_long_enough("   short    ", 10)
+    assert not is_long_enough(None, 1)
+    assert is_long_enough("", 0)
+
+
+def test_build_item_drops_short_contents():
+    article = collector.Article("Source", "news", "en", "Title", "https://news.example/1", 1686166200, None)
+    article.update_content(["Too short"])
+    assert collector.build_item(article, _min_post_length=10) is None
+    article.update_content(["Long enough\ncontent"])
+    item = collector.build_item(article, _min_post_length=10)
+    assert item.content == "Long enough content"
@@ -0,0 +1,31 @@
+import json
+
+import rss007d0675444aa13fc as collector
+from rss007d0675444aa13fc.ArticleClass import Article
+from rss007d0675444aa13fc.LinkClass import Link
+from rss007d0675444aa13fc.RssIDClass import RssID, RssEncoder
+
+
+def test_single_slotted_data_model():
+    assert collector.Article is Article and collector.Link is Link and collector.RssID is RssID
+    assert collector.RssEncoder is RssEncoder and "RssEncoder" in collector.__all__
+    link = Link("Title", "https://news.example/1", 1686166200, "Summary")
+    assert not hasattr(link, "__dict__")
+    assert not hasattr(collector.RSS(None), "__dict__")
+
+
+def test_feed_strings_are_interned():
+    first = RssID("".join(["Sou", "rce"]), "news", "".join(["e", "n"]), "https://news.example/feed")
+    second = RssID("".join(["Sour", "ce"]), "news", "".join(["e", "n"]), "https://news.example/other")
+    assert first.source is second.source and first.language is second.language
+    article = Article("".join(["Sou", "rce"]), "news", "".join(["e", "n"]), "Title", "https://news.example/1",
+                      1686166200, None)
+    assert article.rss_source is first.source and article.language is first.language
+
+
+def test_rss_id_json_round_trip():
+    rss_id = RssID("Source", "news", "en", "https://news.example/feed", "2023-06-07 19:30:00")
+    data = json.loads(json.dumps([rss_id], cls=RssEncoder))
+    assert data == [{"Source": "Source", "Description": "news", "Language": "en",
+                     "URL": "https://news.example/feed", "Last Build Date": "2023-06-07 19:30:00"}]
+    assert RssID.from_json(data[0]).to_json() == rss_id.to_json()
@@ -0,0 +1,44 @@
+from datetime import timezone
+
+import pytest
+from dateutil import parser
+
+from rss007d0675444aa13fc.DateNormalizer import (
+    parse_date_to_epoch,
+    to_epoch,
+    epoch_to_standard,
+    epoch_to_iso8601_utc,
+    cap_epoch_to_now
+)
+
+
+@pytest.mark.parametrize("date", [
+    "Wed, 07 Jun 2023 19:30:00 +0200",
+    "Wed, 7 Jun 2023 19:30:00 GMT",
+    "7 Jun 23 19:30 +0000",
+    "Wednesday, 07 June 2023 19:30:00 -0530",
+    "2023-06-07T19:30:00Z",
+    "2023-06-07T19:30:00.123+02:00",
+    "2023-06-07 19:30:00+00:00",
+    "June 7, 2023 7:30 PM UTC",  # dateutil fallback
+])
+def test_parse_matches_dateutil(date):
+    expected = int(parser.parse(date).astimezone(timezone.utc).timestamp())
+    assert parse_date_to_epoch(date) == expected
+
+
+def test_rfc822_zone_names():
+    assert epoch_to_standard(parse_date_to_epoch("7 Jun 2023 19:30 EDT")) == "2023-06-07 23:30:00"
+
+
+def test_conversions():
+    epoch = parse_date_to_epoch("Wed, 07 Jun 2023 19:30:00 +0200")
+    assert epoch_to_standard(epoch) == "2023-06-07 17:30:00"
+    assert epoch_to_iso8601_utc(epoch) == "2023-06-07T17:30:00.000000Z"
+    assert to_epoch("2023-06-07 17:30:00") == epoch
+    assert to_epoch(epoch_to_standard(-30610224000)) == -30610224000
+
+
+def test_cap_epoch_to_now():
+    assert cap_epoch_to_now(1000, _now=1000 - 3600) == 1000
+    assert cap_epoch_to_now(1000 + 13 * 3600, _now=1000) == 1000
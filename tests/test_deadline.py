@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import RssID, Link, SeenUrlStore, stream_random_content
+from rss007d0675444aa13fc.Deadline import Deadline
+
+FEEDS = [RssID("source", "description", "en", "https://feed{}.example/rss".format(i)) for i in range(3)]
+
+
+def test_stage_budgets_stay_within_the_deadline():
+    deadline = Deadline(100, {"discovery": 10, "extraction": 1000}, _now=0)
+    assert deadline.remaining(_now=0) == 99  # 1 s of margin
+    assert deadline.stage("discovery", _now=50).remaining(_now=50) == 10
+    assert deadline.stage("extraction", _now=50).remaining(_now=50) == 49
+    assert deadline.stage("registry", _now=50).expires_at == deadline.expires_at
+    assert deadline.expired(_now=99) and not deadline.expired(_now=98)
+    assert Deadline().remaining() is None and not Deadline().expired()
+
+
+HANGING = 60  # seconds, far beyond every budget below: only a cancellation ends a hanging feed or download
+
+
+@pytest.fixture
+def slow_sources(monkeypatch):
+    now = int(time.time())
+    cancellations = []  # ("feed" or "download", URL), in the order of the cancellations
+
+    async def fake_extract_latest_items(_rss, *args, **kwargs):
+        if _rss.rss_id.rss_url != FEEDS[0].rss_url:
+            try:
+                await asyncio.sleep(HANGING)  # a feed that hangs
+            except asyncio.CancelledError:
+                cancellations.append(("feed", _rss.rss_id.rss_url))
+                raise
+        for i in range(3):
+            _rss.link_array.append(Link("title", "{}/{}".format(_rss.rss_id.rss_url, i), now, None))
+
+    async def fake_extract_article_content(_url, _language, *args, **kwargs):
+        try:
+            await asyncio.sleep(0.01 if _url.endswith("/0") else HANGING)
+        except asyncio.CancelledError:
+            cancellations.append(("download", _url))
+            raise
+        return "content of " + _url
+
+    monkeypatch.setattr(rss_module, "extract_latest_items", fake_extract_latest_items)
+    monkeypatch.setattr(rss_module, "extract_article_content", fake_extract_article_content)
+    monkeypatch.setattr(rss_module, "get_seen_urls", SeenUrlStore)
+    monkeypatch.setattr(rss_module.random, "sample", lambda population, k: list(population))
+    return cancellations
+
+
+async def collect(_deadline):
+    return [article async for article in stream_random_content(
+        10, 3600, FEEDS, 100, _max_concurrent_feeds=3, _max_concurrent_downloads=3, _deadline=_deadline)]
+
+
+@pytest.mark.asyncio
+async def test_deadline_yields_the_complete_articles(slow_sources):
+    articles = await asyncio.wait_for(collect(Deadline(0.5)), HANGING / 2)  # the hanging tasks were cancelled
+
+    assert sorted(kind for kind, _ in slow_sources) == ["download", "download", "feed", "feed"]
+    assert [article.url for article in articles] == ["https://feed0.example/rss/0"]
+
+
+@pytest.mark.asyncio
+async def test_stage_budgets(slow_sources):
+    deadline = Deadline(HANGING, {"discovery": 0.2, "extraction": 0.4})
+    # ended by the extraction budget, long before the whole deadline
+    articles = await asyncio.wait_for(collect(deadline), HANGING / 2)
+
+    # the hanging feeds were given up at the end of the discovery budget, then the downloads at the end of extraction
+    assert [kind for kind, _ in slow_sources] == ["feed", "feed", "download", "download"]
+    assert [article.url for article in articles] == ["https://feed0.example/rss/0"]
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+from rss007d0675444aa13fc.DomainLimiter import DomainLimiter, interleave_by_domain, parse_retry_after
+
+
+def domain_of(_url):
+    return _url.split("/")[2]
+
+
+async def run_requests(_limiter, _urls, _duration=0.02):
+    running = {}
+    peaks = {}
+    started = []
+
+    async def request(_url):
+        async with _limiter.slot(_url):
+            domain = domain_of(_url)
+            started.append((domain, time.monotonic()))
+            running[domain] = running.get(domain, 0) + 1
+            peaks[domain] = max(peaks.get(domain, 0), running[domain])
+            await asyncio.sleep(_duration)
+            running[domain] -= 1
+
+    await asyncio.gather(*(request(url) for url in _urls))
+    return peaks, started
+
+
+@pytest.mark.asyncio
+async def test_in_flight_cap_per_domain():
+    limiter = DomainLimiter(domain_of, _rate=0, _max_in_flight=2)
+    urls = ["https://a.example/{}".format(i) for i in range(6)] + ["https://b.example/{}".format(i) for i in range(3)]
+    peaks, _ = await run_requests(limiter, urls)
+    assert peaks == {"a.example": 2, "b.example": 2}
+    assert limiter.domains["a.example"].in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_rate():
+    limiter = DomainLimiter(domain_of, _rate=50, _burst=2, _max_in_flight=0)
+    start = time.monotonic()
+    _, started = await run_requests(limiter, ["https://a.example/{}".format(i) for i in range(5)], _duration=0)
+    # 2 requests from the burst, then one every 20 ms
+    assert started[-1][1] - start >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_backoff_blocks_only_the_domain():
+    limiter = DomainLimiter(domain_of, _rate=0, _max_in_flight=0)
+    limiter.record_response("https://a.example/feed", 429, {"Retry-After": "1"})
+    limiter.record_response("https://c.example/feed", 503, {})  # no Retry-After: not a request to slow down
+    start = time.monotonic()
+    await asyncio.gather(limiter.acquire("https://b.example/1"), limiter.acquire("https://c.example/1"))
+    assert time.monotonic() - start < 0.1
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(limiter.acquire("https://a.example/1"), 0.1)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_passes_its_turn():
+    limiter = DomainLimiter(domain_of, _rate=0, _max_in_flight=1)
+    domain = await limiter.acquire("https://a.example/1")
+    first = asyncio.ensure_future(limiter.acquire("https://a.example/2"))
+    second = asyncio.ensure_future(limiter.acquire("https://a.example/3"))
+    await asyncio.sleep(0)
+    limiter.release(domain)  # wakes first, which is cancelled before it runs
+    first.cancel()
+    assert await asyncio.wait_for(second, 1) == "a.example"
+
+
+def test_interleave_by_domain():
+    urls = ["https://a.example/1", "https://a.example/2", "https://a.example/3", "https://b.example/1",
+            "https://c.example/1", "https://b.example/2"]
+    assert interleave_by_domain(urls, domain_of) == [
+        "https://a.example/1", "https://b.example/1", "https://c.example/1",
+        "https://a.example/2", "https://b.example/2", "https://a.example/3"]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 07 Jun 2023 19:31:00 GMT", _now=1686166200) == 60
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,77 @@
+import time
+
+import feedparser
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import RSS, RssID, Link, SeenUrlStore, stream_random_content
+from rss007d0675444aa13fc.ContentExtractor import html_to_text
+from rss007d0675444aa13fc.FastFeedParser import IncrementalFeedParser
+
+FULL_TEXT = "<p>The council approved the plan on Tuesday, after months of debate.</p><p>Trains run next year.</p>"
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel><title>Feed</title>
+<item><title>Full</title><link>https://news.example/full</link><pubDate>Wed, 07 Jun 2023 19:30:00 +0000</pubDate>
+<description>Teaser</description><content:encoded><![CDATA[{}]]></content:encoded></item>
+<item><title>Teaser</title><link>https://news.example/teaser</link><pubDate>Wed, 07 Jun 2023 19:00:00 +0000</pubDate>
+<description>Teaser</description></item>
+</channel></rss>""".format(FULL_TEXT).encode()
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Feed</title>
+<entry><title>Atom entry</title><link href="https://news.example/atom"/><updated>2023-06-07T19:30:00Z</updated>
+<content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>First.</p><p>Second.</p></div></content></entry>
+</feed>"""
+
+
+def test_html_to_text():
+    assert html_to_text(FULL_TEXT) == ("The council approved the plan on Tuesday, after months of debate.\n\n"
+                                       "Trains run next year.")
+    assert html_to_text("Intro<br>next <script>track();</script><ul><li>a</li><li>b</li></ul>") == \
+        "Intro\n\nnext\n\na\n\nb"
+    assert html_to_text("") == ""
+    assert html_to_text("<p>Page\x0cbreak</p>\x00") == "Page break"  # kept by feedparser, refused by lxml
+
+
+def test_feed_parsers_capture_the_embedded_content():
+    parser = IncrementalFeedParser(_with_content=True)
+    parser.feed(FEED)
+    assert [(link, content) for _, link, _, _, content in parser.close()] == [
+        ("https://news.example/full", FULL_TEXT), ("https://news.example/teaser", None)]
+    parser = IncrementalFeedParser(_with_content=True)
+    parser.feed(ATOM)
+    assert html_to_text(parser.close()[0][4]) == "First.\n\nSecond."
+
+    rss = RSS(RssID("source", "description", "en", "https://news.example/rss"))
+    rss_module._read_feedparser_entries(rss, feedparser.parse(FEED).entries, None, None)
+    assert html_to_text(rss.link_array[0].content) == html_to_text(FULL_TEXT)
+    assert rss.link_array[1].content is None
+
+
+@pytest.mark.asyncio
+async def test_embedded_content_skips_the_download(monkeypatch):
+    now = int(time.time())
+    downloads = []
+
+    async def fake_extract_latest_items(_rss, *args, **kwargs):
+        _rss.link_array.append(Link("full", "https://news.example/full", now, None, FULL_TEXT))
+        _rss.link_array.append(Link("teaser", "https://news.example/teaser", now, None, "<p>Read more</p>"))
+        _rss.link_array.append(Link("none", "https://news.example/none", now, None))
+
+    async def fake_extract_article_content(_url, _language, *args, **kwargs):
+        downloads.append(_url)
+        return "downloaded content of " + _url
+
+    monkeypatch.setattr(rss_module, "extract_latest_items", fake_extract_latest_items)
+    monkeypatch.setattr(rss_module, "extract_article_content", fake_extract_article_content)
+    monkeypatch.setattr(rss_module, "get_seen_urls", SeenUrlStore)
+    feeds = [RssID("source", "description", "en", "https://news.example/rss")]
+
+    articles = [article async for article in stream_random_content(3, 3600, feeds, 10, _feed_quota=3,
+                                                                   _embedded_min_length=50)]
+    contents = {article.url: article.content for article in articles}
+    assert contents["https://news.example/full"] == [html_to_text(FULL_TEXT)]
+    assert sorted(downloads) == ["https://news.example/none", "https://news.example/teaser"]
+
+    downloads.clear()
+    articles = [article async for article in stream_random_content(3, 3600, feeds, 10, _feed_quota=3)]
+    assert len(articles) == 3 and len(downloads) == 3  # disabled by default
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import RssID, SeenUrlStore, extract_domain_name, find_random_articles_with_max_age
+from rss007d0675444aa13fc.DateNormalizer import parse_date_to_epoch
+from rss007d0675444aa13fc.DomainLimiter import DomainLimiter
+from rss007d0675444aa13fc.FastFeedParser import parse_feed, FeedFormatError
+from rss007d0675444aa13fc.FeedValidators import FeedValidatorStore
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>Newest</title><link>https://news.example/3</link><pubDate>Wed, 07 Jun 2023 19:30:00 +0000</pubDate>
+<description><![CDATA[<p>Third</p>]]></description></item>
+<item><title>No date</title><link>https://news.example/nodate</link></item>
+<item><title>Middle</title><link>https://news.example/2</link><pubDate>Wed, 07 Jun 2023 18:30:00 +0000</pubDate></item>
+<item><title>Old</title><link>https://news.example/1</link><pubDate>Wed, 07 Jun 2023 10:30:00 +0000</pubDate></item>
+<item><title>Older</title><link>https://news.example/0</link><pubDate>Tue, 06 Jun 2023 10:30:00 +0000</pubDate></item>
+<item><title>Oldest</title><link>https://news.example/-1</link><pubDate>Mon, 05 Jun 2023 10:30:00 +0000</pubDate></item>
+<item><title>Out of order</title><link>https://news.example/4</link><pubDate>Wed, 07 Jun 2023 19:35:00 +0000</pubDate></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Feed</title>
+<entry><title>Atom entry</title><link rel="self" href="https://news.example/self"/>
+<link href="https://news.example/atom"/><updated>2023-06-07T19:30:00Z</updated><summary>Summary</summary></entry>
+</feed>"""
+
+
+def test_rss_entries_within_the_window():
+    entries = parse_feed(RSS, _start_date=parse_date_to_epoch("2023-06-07T18:00:00Z"))
+    assert [(title, link) for title, link, _, _ in entries] == [
+        ("Newest", "https://news.example/3"),
+        ("Middle", "https://news.example/2"),
+    ]  # the 3 consecutive old entries stop the parsing before the out of order one
+    assert entries[0][2] == parse_date_to_epoch("2023-06-07T19:30:00Z")
+    assert entries[0][3] == "<p>Third</p>"
+    assert len(parse_feed(RSS)) == 6
+
+
+def test_atom_entries():
+    assert parse_feed(ATOM) == [("Atom entry", "https://news.example/atom",
+                                 parse_date_to_epoch("2023-06-07T19:30:00Z"), "Summary")]
+
+
+@pytest.mark.parametrize("document", [
+    b"<rss><channel><item><title>&nbsp;</title></item></channel></rss>",
+    b"<html><body>Not a feed</body></html>",
+    b"",
+])
+def test_unreadable_feeds_raise(document):
+    with pytest.raises(FeedFormatError):
+        parse_feed(document)
+
+
+OLD_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>Old</title><link>https://news.example/old</link><pubDate>Wed, 07 Jun 2023 10:30:00 +0000</pubDate></item>
+</channel></rss>"""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_concurrent_feeds", [1, 3])
+async def test_feeds_without_fresh_entries_end_the_search(monkeypatch, max_concurrent_feeds):
+    from aiohttp import web
+
+    fetches = []
+
+    async def serve_feed(_request):
+        fetches.append(_request.path)
+        return web.Response(body=OLD_FEED, content_type="application/rss+xml")
+
+    limiter = DomainLimiter(extract_domain_name, 0, 10, 0)
+    store = FeedValidatorStore()
+    monkeypatch.setattr(rss_module, "get_domain_limiter", lambda: limiter)
+    monkeypatch.setattr(rss_module, "get_validator_store", lambda: store)
+    app = web.Application()
+    app.router.add_get("/rss/{feed}", serve_feed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    feeds = [RssID("source", "description", "en", "http://127.0.0.1:{}/rss/{}".format(runner.addresses[0][1], i))
+             for i in range(6)]
+    try:
+        # the lxml parser keeps no entry at all: every fetch is a trial, and a feed is not fetched twice
+        articles = await asyncio.wait_for(find_random_articles_with_max_age(
+            5, feeds, 3600, 100, max_concurrent_feeds, _seen_urls=SeenUrlStore(), _feed_parser="lxml"), 5)
+        assert articles == [] and sorted(fetches) == sorted("/rss/{}".format(i) for i in range(6))
+
+        fetches.clear()
+        articles = await asyncio.wait_for(find_random_articles_with_max_age(
+            5, feeds, 3600, 1, max_concurrent_feeds, _seen_urls=SeenUrlStore(), _feed_parser="lxml"), 5)
+        assert articles == [] and len(fetches) < len(feeds)  # the trials ran out before the feeds
+    finally:
+        await rss_module.close_session()
+        await runner.cleanup()
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import RssID, Link, SeenUrlStore, find_random_articles_with_max_age
+from rss007d0675444aa13fc.FeedHealth import FeedHealthTracker, PROBE_TIMEOUT
+
+URL = "https://feed.example/rss"
+
+
+def test_circuit_breaker_lifecycle():
+    health = FeedHealthTracker(_base_backoff=60, _max_backoff=200)
+    now = 1000000
+    health.record_failure(URL, TimeoutError("slow"), _latency=10, _now=now)
+    assert not health.is_available(URL, now + 59)
+    assert health.stats()[URL]["last_error"] == "TimeoutError('slow')"
+
+    # half-open: a single probe goes through
+    assert health.allow(URL, now + 60)
+    assert not health.allow(URL, now + 61)
+    assert health.allow(URL, now + 61 + PROBE_TIMEOUT)  # the first probe never reported back
+
+    health.record_failure(URL, "HTTP 500", _now=now + 100)  # backoff doubled
+    assert not health.is_available(URL, now + 219)
+    assert health.is_available(URL, now + 220)
+    health.record_failure(URL, "HTTP 500", _now=now + 300)  # capped
+    assert health.feeds[URL].open_until == now + 500
+
+    health.record_success(URL, _latency=2)
+    assert health.is_available(URL, now + 301)
+    assert health.feeds[URL].consecutive_failures == 0
+    assert health.feeds[URL].latency == pytest.approx(10 + 0.3 * (2 - 10))
+    assert health.summary() == {"closed": 1, "open": 0, "half_open": 0}
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "health.json")
+    health = FeedHealthTracker(_path=path)
+    health.record_failure(URL, "HTTP 404")
+    health.save()
+    reloaded = FeedHealthTracker(_path=path)
+    assert not reloaded.is_available(URL)
+    assert reloaded.feeds[URL].to_json() == health.feeds[URL].to_json()
+
+
+@pytest.mark.asyncio
+async def test_dead_feed_is_not_picked_again(monkeypatch):
+    now = int(time.time())
+    fetched = []
+
+    async def fake_extract_latest_items(_rss, *args, **kwargs):
+        fetched.append(_rss.rss_id.source)
+        if _rss.rss_id.source == "dead":
+            raise TimeoutError()
+        _rss.link_array.append(Link("title", "https://live.example/{}".format(len(fetched)), now, None))
+
+    monkeypatch.setattr(rss_module, "extract_latest_items", fake_extract_latest_items)
+    feeds = [RssID("dead", "description", "en", "https://dead.example/rss"),
+             RssID("live", "description", "en", "https://live.example/rss")]
+    health = FeedHealthTracker()
+
+    articles = await find_random_articles_with_max_age(10, feeds, 3600, 100, _seen_urls=SeenUrlStore(),
+                                                       _health=health)
+
+    assert len(articles) == 10
+    assert fetched.count("dead") <= 1
+    assert health.summary()["closed"] == 1
@@ -0,0 +1,83 @@
+import pytest
+
+from rss007d0675444aa13fc.FastFeedParser import IncrementalFeedParser
+from rss007d0675444aa13fc.FeedReader import FeedReader, FeedTooLargeError, FeedContentTypeError
+
+
+class FakeContent:
+
+    def __init__(self, _body, _chunks_read):
+        self.body = _body
+        self.chunks_read = _chunks_read
+
+    async def iter_chunked(self, _size):
+        for offset in range(0, len(self.body), _size):
+            self.chunks_read.append(offset)
+            yield self.body[offset:offset + _size]
+
+
+class FakeResponse:
+
+    def __init__(self, _body, _content_type="application/rss+xml", _content_length=None):
+        self.chunks_read = []
+        self.content = FakeContent(_body, self.chunks_read)
+        self.headers = {"Content-Type": _content_type}
+        self.content_length = _content_length
+
+
+def rss(_n_items):
+    items = "".join("<item><title>Title {0}</title><link>https://site.example/{0}</link>"
+                    "<pubDate>Wed, 07 Jun 2023 19:{0:02d}:00 GMT</pubDate></item>".format(59 - i)
+                    for i in range(_n_items))
+    return '<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{}</channel></rss>'.format(items).encode()
+
+
+@pytest.mark.asyncio
+async def test_body_is_read_by_chunks():
+    body = rss(20)
+    data, truncated, error = await FeedReader(_chunk_size=100).read(FakeResponse(body))
+    assert (data, truncated, error) == (body, False, None)
+
+
+@pytest.mark.asyncio
+async def test_oversized_body_is_truncated_or_aborted():
+    body = rss(50)
+    reader = FeedReader(_max_size=1000, _chunk_size=300)
+    parser = IncrementalFeedParser()
+    data, truncated, error = await reader.read(FakeResponse(body), parser.feed)
+    assert truncated and data == body[:1000] and error is None
+    entries = parser.close(truncated)
+    assert 0 < len(entries) < 50  # the entries complete before the cut
+
+    reader.configure(_on_oversize="abort")
+    with pytest.raises(FeedTooLargeError):
+        await reader.read(FakeResponse(body))
+    response = FakeResponse(body, _content_length=len(body))
+    with pytest.raises(FeedTooLargeError):
+        await reader.read(response)
+    assert response.chunks_read == []  # rejected on its Content-Length
+
+
+@pytest.mark.asyncio
+async def test_content_type_is_checked():
+    with pytest.raises(FeedContentTypeError):
+        await FeedReader().read(FakeResponse(rss(1), _content_type="image/png"))
+    data, _, _ = await FeedReader().read(FakeResponse(rss(1), _content_type="text/html; charset=utf-8"))
+    assert data == rss(1)
+
+
+@pytest.mark.asyncio
+async def test_consumer_stops_the_download():
+    body = rss(200)
+    parser = IncrementalFeedParser(_start_date=2 ** 40)  # every entry is too old: it stops after a few of them
+    response = FakeResponse(body)
+    data, truncated, error = await FeedReader(_chunk_size=500).read(response, parser.feed)
+    assert parser.done and not truncated and error is None
+    assert len(data) < len(body) and len(response.chunks_read) < len(body) // 500
+
+
+@pytest.mark.asyncio
+async def test_consumer_error_keeps_reading():
+    body = b"<html><body>" + b"<p>not a feed</p>" * 100 + b"</body></html>"
+    data, truncated, error = await FeedReader(_chunk_size=64).read(FakeResponse(body), IncrementalFeedParser().feed)
+    assert data == body and error is not None  # the whole body, for the fallback parser
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import tempfile
+
+import pytest
+
+from rss007d0675444aa13fc import parse_reference_json_data, extract_domain_name
+from rss007d0675444aa13fc.FeedRegistry import FeedRegistry, DEFAULT_SNAPSHOT_PATH
+
+REGISTRY_URL = "https://registry.example/FeedSources.json"
+FEED_SOURCES = [
+    {"Source": "One", "Description": "news", "Language": "en", "URL": "https://www.one.com/rss"},
+    {"Source": "Two", "Description": "news", "Language": "fr", "URL": "https://feeds.one.com/fr.xml"},
+]
+
+
+def make_registry(fetch_json, snapshot_path, ttl=3600):
+    return FeedRegistry(REGISTRY_URL, fetch_json, parse_reference_json_data,
+                        extract_domain_name, ttl, snapshot_path)
+
+
+@pytest.mark.asyncio
+async def test_registry_is_cached_and_indexed(tmp_path):
+    calls = []
+
+    async def fetch_json(_url):
+        calls.append(_url)
+        return FEED_SOURCES
+
+    registry = make_registry(fetch_json, str(tmp_path / "snapshot.json"))
+    assert len(await registry.get_rss_ids()) == 2
+    assert len(await registry.get_rss_ids()) == 2
+    assert len(calls) == 1
+    assert [rss_id.source for rss_id in registry.get_feeds_by_language("fr")] == ["Two"]
+    assert len(registry.get_feeds_by_domain("one.com")) == 2
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_used_when_offline(tmp_path):
+    async def fetch_json(_url):
+        return FEED_SOURCES
+
+    async def offline(_url):
+        raise OSError("network is unreachable")
+
+    snapshot_path = str(tmp_path / "snapshot.json")
+    await make_registry(fetch_json, snapshot_path).get_rss_ids()
+
+    registry = make_registry(offline, snapshot_path, ttl=0)
+    assert [rss_id.source for rss_id in await registry.get_rss_ids()] == ["One", "Two"]
+    await asyncio.sleep(0)  # let the background refresh fail
+    assert len(await registry.get_rss_ids()) == 2
+
+    with pytest.raises(OSError):
+        await make_registry(offline, "").get_rss_ids()
+
+
+@pytest.mark.asyncio
+async def test_invalid_snapshot_is_ignored(tmp_path):
+    calls = []
+
+    async def fetch_json(_url):
+        calls.append(_url)
+        return FEED_SOURCES
+
+    snapshot_path = tmp_path / "snapshot.json"
+    evil = {"Source": "Evil", "Description": "news", "Language": "en", "URL": "file:///etc/passwd"}
+    for planted in (FEED_SOURCES, {"url": REGISTRY_URL, "registry": {"Source": "One"}},
+                    {"url": REGISTRY_URL, "registry": [evil]}, {"url": REGISTRY_URL, "registry": []}):
+        snapshot_path.write_text(json.dumps(planted))
+        calls.clear()
+        registry = make_registry(fetch_json, str(snapshot_path))
+        assert [rss_id.source for rss_id in await registry.get_rss_ids()] == ["One", "Two"]
+        assert len(calls) == 1  # downloaded, the snapshot was rejected
+
+
+@pytest.mark.asyncio
+async def test_snapshot_of_another_registry_is_ignored(tmp_path):
+    async def fetch_json(_url):
+        return FEED_SOURCES if _url == REGISTRY_URL else FEED_SOURCES[:1]
+
+    snapshot_path = str(tmp_path / "snapshot.json")
+    await make_registry(fetch_json, snapshot_path).get_rss_ids()
+
+    registry = make_registry(fetch_json, snapshot_path)
+    registry.configure(_url="https://other.example/FeedSources.json")
+    assert [rss_id.source for rss_id in await registry.get_rss_ids()] == ["One"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_feeds_are_skipped(tmp_path):
+    async def fetch_json(_url):
+        return [{"Source": "Broken"}, "not a feed"] + FEED_SOURCES
+
+    snapshot_path = str(tmp_path / "snapshot.json")
+    assert [rss_id.source for rss_id in await make_registry(fetch_json, snapshot_path).get_rss_ids()] == ["One", "Two"]
+    with open(snapshot_path, encoding="utf-8") as f:
+        assert json.load(f) == {"url": REGISTRY_URL, "registry": FEED_SOURCES}
+
+
+@pytest.mark.asyncio
+async def test_invalid_download_is_rejected(tmp_path):
+    async def fetch_json(_url):
+        return {"error": "rate limited"}
+
+    with pytest.raises(ValueError):
+        await make_registry(fetch_json, str(tmp_path / "snapshot.json")).get_rss_ids()
+    assert not (tmp_path / "snapshot.json").exists()
+
+
+def test_default_snapshot_is_private():
+    assert not DEFAULT_SNAPSHOT_PATH.startswith(tempfile.gettempdir())
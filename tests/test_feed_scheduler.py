@@ -0,0 +1,36 @@
+import random
+from collections import Counter
+
+from rss007d0675444aa13fc import RssID
+from rss007d0675444aa13fc.FeedScheduler import FeedScheduler
+
+NOW = 1700000000
+
+
+def make_feeds():
+    return [RssID(name, "description", "en", "https://{}.example/rss".format(name)) for name in ("busy", "dead")]
+
+
+def test_busy_feeds_are_preferred(tmp_path):
+    path = str(tmp_path / "stats.json")
+    scheduler = FeedScheduler(_exploration=0.1, _path=path)
+    busy, dead = make_feeds()
+    scheduler.record_fetch(busy.rss_url, [NOW - 60 * i for i in range(30)], 6, NOW)
+    scheduler.record_fetch(dead.rss_url, [NOW - 86400 * i for i in range(1, 30)], 0, NOW)
+
+    random.seed(0)
+    picks = Counter(scheduler.choose([busy, dead], 360).source for _ in range(1000))
+    assert picks["busy"] > 900
+    assert picks["dead"] > 0  # still explored
+
+    scheduler.save()
+    reloaded = FeedScheduler(_path=path)
+    assert reloaded.stats[busy.rss_url].hit_ratio == 1.0
+    assert reloaded.stats[dead.rss_url].last_item_time == NOW - 86400
+
+
+def test_unknown_feeds_are_explored_first():
+    scheduler = FeedScheduler(_exploration=0.0)
+    busy, dead = make_feeds()
+    scheduler.record_fetch(dead.rss_url, [], 0, NOW)
+    assert scheduler.order([dead, busy], 360) == [busy, dead]
@@ -0,0 +1,107 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from rss007d0675444aa13fc import RssID, ShardRunner
+from rss007d0675444aa13fc.FeedSharding import shard_of, select_shard
+from rss007d0675444aa13fc.ShardRunner import shard_parameters
+
+URLS = ["https://feed{}.example/rss".format(i) for i in range(5000)]
+
+
+def test_shards_are_balanced():
+    counts = [0] * 8
+    for url in URLS:
+        counts[shard_of(url, 8)] += 1
+    assert min(counts) > 0.85 * len(URLS) / 8 and max(counts) < 1.15 * len(URLS) / 8
+
+
+def test_resizing_moves_few_feeds():
+    moved = [url for url in URLS if shard_of(url, 8) != shard_of(url, 9)]
+    assert all(shard_of(url, 9) == 8 for url in moved)  # only to the new shard
+    assert len(moved) < 1.2 * len(URLS) / 9
+
+
+def test_select_shard_partitions_the_feeds():
+    rss_ids = [RssID("source", "description", "en", url) for url in URLS[:100]]
+    shards = [select_shard(rss_ids, shard, 3) for shard in range(3)]
+    assert sorted(rss_id.rss_url for shard in shards for rss_id in shard) == sorted(URLS[:100])
+    assert select_shard(rss_ids, 0, 1) is rss_ids
+    with pytest.raises(ValueError):
+        select_shard(rss_ids, 3, 3)
+
+
+@pytest.mark.asyncio
+async def test_runner_ends_when_every_worker_is_done():
+    runner = ShardRunner(_n_shards=4, _shards=[1])
+    # no registry to read from: the worker ends its query right away, without items
+    parameters = {"feed_sources_url": "http://127.0.0.1:9/FeedSources.json", "registry_snapshot_path": ""}
+    try:
+        assert [item async for item in runner.query(parameters)] == []
+        assert [item async for item in runner.query(parameters)] == []  # the worker serves the next query
+    finally:
+        await runner.close()
+    assert runner.workers == {}
+
+
+def test_every_shard_gets_its_own_files():
+    parameters = shard_parameters({"feed_stats_path": "/data/stats.json", "content_cache_path": "/data/cache.db"}, 3, 4)
+    assert (parameters["shard"], parameters["shard_count"]) == (3, 4)
+    assert parameters["feed_stats_path"] == "/data/stats.shard3.json"
+    assert parameters["content_cache_path"] == "/data/cache.db"  # shared by design
+    assert parameters["registry_snapshot_path"].endswith("FeedSources.shard3.json")  # the default too
+    assert shard_parameters({"registry_snapshot_path": ""}, 0, 4)["registry_snapshot_path"] == ""
+
+
+PARAGRAPH = "The council approved the new transit plan after months of heated debate in the city. "
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel><title>Feed</title>{}</channel>
+</rss>"""
+ITEM = """<item><title>Entry {entry}</title><link>{base_url}/article/{feed}/{entry}</link><pubDate>{date}</pubDate>
+<content:encoded><![CDATA[<p>{text}</p>]]></content:encoded></item>"""
+
+
+@pytest.mark.asyncio
+async def test_runner_merges_the_items_of_its_shards(tmp_path):
+    from aiohttp import web
+
+    n_feeds = 8
+    base_url = None
+
+    async def serve_registry(_request):
+        return web.json_response([{"Source": "Source {}".format(feed), "Description": "news", "Language": "en",
+                                   "URL": "{}/feed/{}".format(base_url, feed)} for feed in range(n_feeds)])
+
+    async def serve_feed(_request):
+        feed = _request.match_info["feed"]
+        # the full text is embedded in the feed: no article to download
+        items = "".join(ITEM.format(base_url=base_url, feed=feed, entry=entry, date=formatdate(time.time() - 60),
+                                    text=PARAGRAPH * 10) for entry in range(2))
+        return web.Response(text=FEED.format(items), content_type="application/rss+xml")
+
+    app = web.Application()
+    app.router.add_get("/FeedSources.json", serve_registry)
+    app.router.add_get("/feed/{feed}", serve_feed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = "http://127.0.0.1:{}".format(runner.addresses[0][1])
+    feed_urls = ["{}/feed/{}".format(base_url, feed) for feed in range(n_feeds)]
+    assert len({shard_of(url, 2) for url in feed_urls}) == 2
+
+    shard_runner = ShardRunner(_n_shards=2)
+    parameters = {"feed_sources_url": base_url + "/FeedSources.json", "maximum_items_to_collect": 6,
+                  "max_oldness_seconds": 3600, "max_extraction_trials": 100, "domain_rate": 0,
+                  "domain_max_in_flight": 0, "registry_snapshot_path": str(tmp_path / "FeedSources.json")}
+    try:
+        items = [item async for item in shard_runner.query(parameters)]
+    finally:
+        await shard_runner.close()
+        await runner.cleanup()
+
+    assert len(items) == 6 and len({str(item.url) for item in items}) == 6
+    shards = {shard_of(str(item.url).replace("/article/", "/feed/").rsplit("/", 1)[0], 2) for item in items}
+    assert shards == {0, 1}
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["FeedSources.shard0.json", "FeedSources.shard1.json"]
@@ -0,0 +1,114 @@
+import asyncio
+import contextlib
+import time
+from email.utils import formatdate
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import RSS, RssID, SeenUrlStore, find_random_articles_with_max_age
+from rss007d0675444aa13fc.FeedScheduler import FeedScheduler
+from rss007d0675444aa13fc.FeedValidators import FeedValidatorStore
+
+FEED_URL = "https://feed.example/rss"
+
+
+def test_conditional_headers_follow_the_last_response():
+    store = FeedValidatorStore()
+    assert store.get_request_headers(FEED_URL) == {}
+
+    store.update(FEED_URL, {"ETag": '"abc"', "Last-Modified": "Wed, 01 May 2024 10:00:00 GMT"})
+    assert store.get_request_headers(FEED_URL) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 01 May 2024 10:00:00 GMT",
+    }
+
+    store.update(FEED_URL, {})
+    assert store.get_request_headers(FEED_URL) == {}
+
+
+def test_validators_are_persisted(tmp_path):
+    path = str(tmp_path / "validators.json")
+    store = FeedValidatorStore(path)
+    store.update(FEED_URL, {"ETag": '"abc"'})
+    store.save()
+
+    assert FeedValidatorStore(path).get_request_headers(FEED_URL) == {"If-None-Match": '"abc"'}
+
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed</title>{}</channel></rss>"""
+ITEM = "<item><title>Entry</title><link>https://news.example/{}</link><pubDate>{}</pubDate></item>"
+
+
+@contextlib.asynccontextmanager
+async def feed_server(_n_items, _validator_store):
+    """
+    Local feed of _n_items fresh entries, answering 304 to the requests with its ETag. Yields the list of the statuses
+    of the responses, and the feed
+    """
+    from aiohttp import web
+
+    statuses = []
+    items = "".join(ITEM.format(i, formatdate(time.time() - 60 * i)) for i in range(_n_items))
+
+    async def serve_feed(_request):
+        if _request.headers.get("If-None-Match") == '"v1"':
+            statuses.append(304)
+            return web.Response(status=304)
+        statuses.append(200)
+        return web.Response(body=FEED.replace(b"{}", items.encode()), content_type="application/rss+xml",
+                            headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/rss", serve_feed)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(rss_module, "get_validator_store", lambda: _validator_store)
+        try:
+            yield statuses, RssID("source", "description", "en",
+                                  "http://127.0.0.1:{}/rss".format(runner.addresses[0][1]))
+        finally:
+            await rss_module.close_session()
+            await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_not_modified_feeds_keep_their_statistics():
+    scheduler = FeedScheduler(_exploration=0.0)
+    async with feed_server(1, FeedValidatorStore()) as (statuses, feed):
+        articles = await find_random_articles_with_max_age(1, [feed], 3600, 10, _seen_urls=SeenUrlStore(),
+                                                           _scheduler=scheduler)
+        assert len(articles) == 1
+        stats = scheduler.stats[feed.rss_url]
+        hit_ratio, publish_rate = stats.hit_ratio, stats.publish_rate
+
+        rss = RSS(feed)
+        await rss_module.extract_latest_items(rss)
+        assert rss.not_modified and [link.link for link in rss.link_array] == ["https://news.example/0"]
+        seen_urls = SeenUrlStore()
+        seen_urls.add("https://news.example/0")
+        assert await asyncio.wait_for(find_random_articles_with_max_age(
+            1, [feed], 3600, 10, _seen_urls=seen_urls, _scheduler=scheduler), 2) == []
+        assert (stats.fetches, stats.hit_ratio, stats.publish_rate) == (1, hit_ratio, publish_rate)
+        assert statuses == [200, 304, 304]
+
+
+@pytest.mark.asyncio
+async def test_not_modified_feeds_serve_their_remaining_entries():
+    seen_urls = SeenUrlStore()
+    polls = []
+    async with feed_server(5, FeedValidatorStore()) as (statuses, feed):
+        for _ in range(4):
+            articles = await asyncio.wait_for(find_random_articles_with_max_age(
+                2, [feed], 3600, 20, _seen_urls=seen_urls), 2)
+            polls.append([article.url for article in articles])
+            for url in polls[-1]:
+                seen_urls.add(url)  # as query() does with the items it yields
+
+    assert polls == [["https://news.example/0", "https://news.example/1"],
+                     ["https://news.example/2", "https://news.example/3"], ["https://news.example/4"], []]
+    assert statuses[0] == 200 and set(statuses[1:]) == {304}  # downloaded once
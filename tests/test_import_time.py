@@ -0,0 +1,25 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ("newspaper", "feedparser", "tldextract", "aiohttp", "dateutil", "pytz", "lxml", "nltk")
+
+PROBE = """
+import json, sys
+import exorde_data  # not ours: imported before the probe
+before = set(sys.modules)
+import rss007d0675444aa13fc
+print(json.dumps(sorted(set(sys.modules) - before)))
+"""
+
+
+def probe_import():
+    # a fresh interpreter, the modules imported by the other tests would hide the imports of the package
+    output = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_heavy_dependencies_are_imported_lazily():
+    imported = probe_import()
+    assert [module for module in imported if module.split(".")[0] in HEAVY_MODULES] == []
+
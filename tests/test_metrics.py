@@ -0,0 +1,59 @@
+from rss007d0675444aa13fc.FastFeedParser import parse_feed
+from rss007d0675444aa13fc.Metrics import CollectorMetrics
+
+
+def test_disabled_metrics_record_nothing():
+    events = []
+    metrics = CollectorMetrics(_hook=lambda *event: events.append(event))
+    metrics.increment("feeds_fetched")
+    with metrics.timer("feed_parse"):
+        pass
+    assert metrics.snapshot() == {"counters": CollectorMetrics().counters, "stages": {}}
+    assert events == []
+
+
+def test_counters_histograms_and_hook():
+    events = []
+    metrics = CollectorMetrics(_enabled=True, _hook=lambda *event: events.append(event))
+    metrics.increment("feeds_fetched")
+    metrics.increment("bytes_downloaded", 2048)
+    for seconds in (0.002, 0.003, 0.2, 3.0):
+        metrics.observe("feed_download", seconds)
+    with metrics.timer("feed_parse"):
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["feeds_fetched"] == 1
+    assert snapshot["counters"]["bytes_downloaded"] == 2048
+    download = snapshot["stages"]["feed_download"]
+    assert download["count"] == 4 and download["max"] == 3.0
+    assert download["p50"] == 0.005 and download["p99"] == 5.0
+    assert snapshot["stages"]["feed_parse"]["count"] == 1
+    assert events[:2] == [("counter", "feeds_fetched", 1), ("counter", "bytes_downloaded", 2048)]
+    assert events[-1][:2] == ("timing", "feed_parse")
+
+    text = metrics.to_prometheus()
+    assert "rss_collector_bytes_downloaded_total 2048\n" in text
+    assert 'rss_collector_stage_duration_seconds_bucket{stage="feed_download",le="0.005"} 2\n' in text
+    assert 'rss_collector_stage_duration_seconds_bucket{stage="feed_download",le="+Inf"} 4\n' in text
+    assert 'rss_collector_stage_duration_seconds_count{stage="feed_download"} 4\n' in text
+
+
+def test_failing_hook_is_ignored():
+    def hook(*_):
+        raise RuntimeError("broken")
+
+    metrics = CollectorMetrics(_enabled=True, _hook=hook)
+    metrics.increment("items_yielded")
+    assert metrics.counters["items_yielded"] == 1
+
+
+def test_parse_feed_counts_entries():
+    document = (b"<rss><channel>"
+                b"<item><title>New</title><link>https://news.example/2</link><pubDate>2023-06-07T19:30:00Z</pubDate></item>"
+                b"<item><title>Old</title><link>https://news.example/1</link><pubDate>2023-06-01T19:30:00Z</pubDate></item>"
+                b"</channel></rss>")
+    counts = {}
+    entries = parse_feed(document, _start_date=1686000000, _counts=counts)
+    assert len(entries) == 1
+    assert counts == {"entries": 2, "old_entries": 1}
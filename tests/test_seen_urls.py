@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import RssID, Link
+from rss007d0675444aa13fc.SeenUrls import SeenUrlStore, BloomSeenUrlStore
+
+
+def test_lru_store_capacity_and_ttl(monkeypatch):
+    store = SeenUrlStore(_capacity=2, _ttl=60)
+    for url in ("a", "b", "c"):
+        store.add(url)
+    assert "a" not in store
+    assert "b" in store and "c" in store
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert "c" not in store
+
+
+def test_lru_store_is_persisted(tmp_path):
+    path = str(tmp_path / "seen.json")
+    store = SeenUrlStore(_path=path)
+    store.add("https://news.example/a")
+    store.save()
+    assert "https://news.example/a" in SeenUrlStore(_path=path)
+
+
+def test_bloom_store_rotates_generations(tmp_path):
+    path = str(tmp_path / "seen.json")
+    store = BloomSeenUrlStore(_capacity=100, _path=path)
+    urls = ["https://news.example/{}".format(i) for i in range(250)]
+    for url in urls:
+        store.add(url)
+    assert all(url in store for url in urls[200:])
+    assert sum(url in store for url in urls[:100]) < 10  # first generation dropped, only false positives remain
+
+    store.save()
+    assert all(url in BloomSeenUrlStore(_capacity=100, _path=path) for url in urls[200:])
+
+
+class FakeRegistry:
+
+    def __init__(self, _rss_ids):
+        self.rss_ids = _rss_ids
+
+    def configure(self, *args):
+        pass
+
+    async def get_rss_ids(self):
+        return self.rss_ids
+
+
+@pytest.mark.asyncio
+async def test_failed_articles_are_selected_again(monkeypatch):
+    now = int(time.time())
+    failing = {"https://news.example/1"}
+    extracted = []
+
+    async def fake_extract_latest_items(_rss, *args, **kwargs):
+        for i in range(2):
+            _rss.link_array.append(Link("title", "https://news.example/{}".format(i), now, None))
+
+    async def fake_extract_article_content(_url, _language, *args, **kwargs):
+        extracted.append(_url)
+        return "" if _url in failing else "the content of the article, long enough to be kept"
+
+    store = SeenUrlStore()
+    monkeypatch.setattr(rss_module, "extract_latest_items", fake_extract_latest_items)
+    monkeypatch.setattr(rss_module, "extract_article_content", fake_extract_article_content)
+    monkeypatch.setattr(rss_module, "configure_seen_urls", lambda *args: store)
+    monkeypatch.setattr(rss_module, "get_seen_urls", lambda: store)
+    monkeypatch.setattr(rss_module, "get_feed_registry", lambda: FakeRegistry(
+        [RssID("source", "description", "en", "https://news.example/rss")]))
+    parameters = {"max_oldness_seconds": 3600, "maximum_items_to_collect": 2, "min_post_length": 10,
+                  "feed_selection": "uniform"}
+
+    items = [item async for item in rss_module.query(parameters)]
+    assert len(items) == 1 and "https://news.example/1" not in store and "https://news.example/0" in store
+
+    failing.clear()
+    extracted.clear()
+    items = [item async for item in rss_module.query(parameters)]
+    assert len(items) == 1 and extracted == ["https://news.example/1"]
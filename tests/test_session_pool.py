@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from rss007d0675444aa13fc.SessionPool import SessionPool
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused():
+    pool = SessionPool()
+    session = pool.get_session()
+    assert pool.get_session() is session
+    await pool.configure(_limit=pool.limit)  # same settings: the session is kept
+    assert pool.get_session() is session and not session.closed
+    await pool.close()
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_new_settings_replace_the_session():
+    pool = SessionPool()
+    session = pool.get_session()
+    await pool.configure(_limit_per_host=2)
+    assert session.closed
+    replacement = pool.get_session()
+    assert replacement is not session and replacement.connector.limit_per_host == 2
+    await pool.close()
+
+
+def test_every_event_loop_gets_its_own_session():
+    pool = SessionPool()
+
+    async def open_session():
+        return pool.get_session()
+
+    first = asyncio.run(open_session())
+    second = asyncio.run(open_session())
+    assert second is not first
+    asyncio.run(pool.close())  # opened on another loop: forgotten, not awaited
+    assert pool.session is None
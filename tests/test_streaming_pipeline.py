@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+
+import rss007d0675444aa13fc as rss_module
+from rss007d0675444aa13fc import RssID, Link, SeenUrlStore, stream_random_content
+
+
+@pytest.fixture
+def fake_feed(monkeypatch):
+    now = int(time.time())
+
+    async def fake_extract_latest_items(_rss, *args, **kwargs):
+        for i in range(3):
+            _rss.link_array.append(Link("title", "{}/{}".format(_rss.rss_id.rss_url, i), now, None))
+
+    async def fake_extract_article_content(_url, _language, *args, **kwargs):
+        await asyncio.sleep(0.01 if _url.endswith("/0") else 0.3)
+        return "content of " + _url
+
+    monkeypatch.setattr(rss_module, "extract_latest_items", fake_extract_latest_items)
+    monkeypatch.setattr(rss_module, "extract_article_content", fake_extract_article_content)
+    monkeypatch.setattr(rss_module, "get_seen_urls", SeenUrlStore)
+    return [RssID("source", "description", "en", "https://feed.example/rss")]
+
+
+@pytest.mark.asyncio
+async def test_articles_are_streamed_as_soon_as_extracted(fake_feed):
+    start = time.monotonic()
+    received = []
+    async for article in stream_random_content(3, 3600, fake_feed, 10, _max_concurrent_downloads=3):
+        received.append((article.url, time.monotonic() - start))
+
+    assert received[0] == ("https://feed.example/rss/0", pytest.approx(0.01, abs=0.1))
+    assert sorted(url for url, _ in received) == ["https://feed.example/rss/{}".format(i) for i in range(3)]
+    assert all(article_time < 0.6 for _, article_time in received)  # extracted concurrently
+
+
+@pytest.mark.asyncio
+async def test_consumer_can_stop_early(fake_feed):
+    articles = stream_random_content(3, 3600, fake_feed, 10, _max_concurrent_downloads=3)
+    first = await asyncio.wait_for(articles.__anext__(), 1)
+    await asyncio.wait_for(articles.aclose(), 1)
+    assert first.content == ["content of https://feed.example/rss/0"]
+
+
+@pytest.mark.asyncio
+async def test_a_failing_article_does_not_stop_the_stream(fake_feed, monkeypatch):
+    async def failing_extract_article_content(_url, _language, *args, **kwargs):
+        await asyncio.sleep(0.05)
+        if _url.endswith("/1"):
+            raise ValueError("broken article")
+        return "content of " + _url
+
+    monkeypatch.setattr(rss_module, "extract_article_content", failing_extract_article_content)
+    articles = stream_random_content(3, 3600, fake_feed, 10, _max_concurrent_downloads=3)
+    urls = await asyncio.wait_for(asyncio.ensure_future(collect(articles)), 2)
+    assert sorted(urls) == ["https://feed.example/rss/0", "https://feed.example/rss/2"]
+
+
+async def collect(_articles):
+    return [article.url async for article in _articles]